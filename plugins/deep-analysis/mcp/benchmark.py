@@ -0,0 +1,486 @@
+"""
+Deep Analysis Benchmark
+
+Measures retrieval quality and speed of the MCP server's search and
+indexing on synthetic analysis corpora.
+
+Each run generates a corpus of analysis documents with the frontmatter
+schema that index_single_file reads, plus a labeled query set where every
+query has exactly one relevant document. For each configuration it
+reports build time, index size on disk, recall@k, MRR, and p50/p95
+latency of search_analyses and index_analysis. With filter=status, each
+query is restricted by a where clause to documents sharing its target's
+status, measuring filtered search instead of search_analyses.
+
+Usage:
+    uv run python benchmark.py --docs 1000 --queries 200
+    uv run python benchmark.py --docs 5000 \\
+        --config chunking=on --config chunking=off \\
+        --config aggregate=sum --json results.json
+    uv run python benchmark.py --docs 5000 --config filter=none --config filter=status
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import functools
+import json
+import logging
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Iterator
+
+import server
+
+logger = logging.getLogger("deep-analysis-benchmark")
+
+TOPICS = [
+    ("caching", ["redis", "memcached", "cache invalidation", "ttl", "hit rate"]),
+    ("authentication", ["oauth", "sessions", "jwt", "sso", "password reset"]),
+    ("database", ["postgres", "sharding", "replication", "indexes", "migrations"]),
+    ("messaging", ["kafka", "queues", "backpressure", "consumers", "ordering"]),
+    ("deployment", ["kubernetes", "blue-green", "canary", "rollbacks", "helm"]),
+    ("observability", ["tracing", "metrics", "alerting", "log retention", "slos"]),
+    ("frontend", ["react", "bundle size", "hydration", "state management", "ssr"]),
+    ("api design", ["graphql", "rest", "versioning", "pagination", "rate limits"]),
+    ("storage", ["s3", "object lifecycle", "encryption", "backups", "tiering"]),
+    ("search", ["elasticsearch", "relevance", "embeddings", "reindexing", "facets"]),
+    ("testing", ["flaky tests", "contract tests", "fixtures", "coverage", "mocks"]),
+    ("security", ["secrets", "threat model", "audit logs", "rbac", "sandboxing"]),
+]
+
+DECISIONS = ["adopt", "defer", "reject", "pilot", "migrate", "keep-current"]
+STATUSES = ["accepted", "proposed", "superseded", "rejected"]
+
+COMPONENTS = ["gateway", "scheduler", "ledger", "importer", "billing", "router"]
+
+FILLER = (
+    "The team weighed operational cost against delivery speed and noted that "
+    "ownership boundaries matter more than the tooling itself. Several "
+    "stakeholders raised concerns about on-call load, onboarding time and the "
+    "long tail of edge cases that only appear under production traffic. "
+    "Historical incidents suggest that partial rollouts reduce blast radius but "
+    "increase coordination overhead across services."
+).split(". ")
+
+SYLLABLES = ["ka", "ro", "mi", "zu", "te", "vo", "shi", "lan", "dor", "pex", "qui", "bra"]
+
+DEFAULT_CONFIG = {
+    "chunking": "on",
+    "chunk_max_chars": server.CHUNK_MAX_CHARS,
+    "aggregate": "max",
+    "diversity": 0.0,
+    "model": server.MODEL_PATH,
+    "vectors": server.VECTOR_STORAGE,
+    "filter": "none",
+}
+
+# Metadata filters: the indexed column matched against the same-named
+# LabeledQuery attribute in a where clause added to the passage search
+FILTERS: dict[str, str | None] = {
+    "none": None,
+    "status": "status",
+}
+
+
+@dataclass
+class LabeledQuery:
+    """A search query with the one document it should retrieve."""
+
+    text: str
+    relevant: str  # file name of the target document
+    status: str = ""  # status of the target document, for filter=status
+
+
+@dataclass
+class BenchmarkResult:
+    """Measurements for one configuration over one corpus."""
+
+    config: dict[str, Any]
+    documents: int
+    passages: int
+    build_seconds: float
+    index_bytes: int
+    recall_at_k: dict[int, float] = field(default_factory=dict)
+    mrr: float = 0.0
+    search_p50_ms: float = 0.0
+    search_p95_ms: float = 0.0
+    index_p50_ms: float = 0.0
+    index_p95_ms: float = 0.0
+
+
+def codename(rng: random.Random) -> str:
+    """Make a pronounceable nonsense word that identifies one document."""
+    return "".join(rng.choice(SYLLABLES) for _ in range(3))
+
+
+def generate_corpus(
+    directory: Path,
+    count: int,
+    queries: int,
+    seed: int = 0,
+) -> list[LabeledQuery]:
+    """
+    Write count synthetic analyses to directory and label a query set.
+
+    Every document gets a topic, frontmatter matching the analysis document
+    spec, and a unique codename mentioned only in its last section, far
+    past the first 256 tokens. Queries alternate between asking for the
+    codename detail and for the problem statement; each is labeled with
+    the single document it targets.
+    """
+    rng = random.Random(seed)
+    directory.mkdir(parents=True, exist_ok=True)
+    labeled: list[LabeledQuery] = []
+    targets = set(rng.sample(range(count), min(queries, count)))
+    used_names: set[str] = set()
+
+    for i in range(count):
+        topic, terms = TOPICS[i % len(TOPICS)]
+        term = rng.choice(terms)
+        component = rng.choice(COMPONENTS)
+        name = codename(rng)
+        while name in used_names:
+            name = codename(rng) + str(i)
+        used_names.add(name)
+
+        problem = f"{topic}-{term.replace(' ', '-')}-{i}"
+        path = directory / f"2025-01-01-{problem}.md"
+        filler = " ".join(rng.choice(FILLER) + "." for _ in range(12))
+        decision = rng.choice(DECISIONS)
+        status = rng.choice(STATUSES)
+
+        path.write_text(
+            f"---\n"
+            f"type: deep-analysis\n"
+            f"date: 2025-{1 + i % 12:02d}-{1 + i % 28:02d}\n"
+            f"problem: {problem}\n"
+            f"decision: {decision}-{term.replace(' ', '-')}\n"
+            f"status: {status}\n"
+            f"domain: [{topic}]\n"
+            f"keywords: [{topic}, {term}, {component}]\n"
+            f"---\n\n"
+            f"# Problem\n> Should we change our approach to {term} for {topic}?\n\n"
+            f"# Context\n{filler}\n\n"
+            f"# Analysis\n{filler}\n\n"
+            f"# Options Considered\n{filler}\n\n"
+            f"# Decision\nWe chose to {rng.choice(DECISIONS)} {term}.\n\n"
+            f"# Risks Accepted\nThe {name} {component} cutover could stall "
+            f"if the {term} rollout slips.\n",
+            encoding="utf-8",
+        )
+
+        if i in targets:
+            if len(labeled) % 2 == 0:
+                text = f"risk of the {name} {component} cutover"
+            else:
+                text = f"should we change our approach to {term} for {topic} {i}"
+            labeled.append(LabeledQuery(text=text, relevant=path.name, status=status))
+
+    return labeled
+
+
+@contextmanager
+def configured(root: Path, config: dict[str, Any]) -> Iterator[server.Shard]:
+    """
+    Point the server at an isolated index under root with config applied.
+
+    Yields the global shard, whose analysis directory is root/analyses.
+    Module state is restored on exit.
+    """
+    saved = {
+        name: getattr(server, name)
+        for name in (
+            "INDEX_DIR",
+            "SHARDS_DIR",
+            "PROJECTS_FILE",
+            "GLOBAL_ANALYSES_DIR",
+            "MODEL_PATH",
+            "VECTOR_STORAGE",
+            "chunk_markdown",
+        )
+    }
+
+    try:
+        server.INDEX_DIR = root / "index"
+        server.SHARDS_DIR = server.INDEX_DIR / "shards"
+        server.PROJECTS_FILE = server.INDEX_DIR / "projects.json"
+        server.GLOBAL_ANALYSES_DIR = root / "analyses"
+        server.MODEL_PATH = config["model"]
+        server.VECTOR_STORAGE = config["vectors"]
+
+        if config["chunking"] == "off":
+            server.chunk_markdown = lambda body, max_chars=None: [("", body)]
+        else:
+            server.chunk_markdown = functools.partial(
+                saved["chunk_markdown"], max_chars=int(config["chunk_max_chars"])
+            )
+
+        server._shards.clear()
+        server._search_results.clear()
+        server._query_vectors.clear()
+        yield server.global_shard()
+
+    finally:
+        for name, value in saved.items():
+            setattr(server, name, value)
+        server._shards.clear()
+        server._search_results.clear()
+        server._query_vectors.clear()
+
+
+def directory_size(path: Path) -> int:
+    """Total size in bytes of all files under path."""
+    if path.is_file():
+        return path.stat().st_size
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of values (0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def ranked_names(output: str) -> list[str]:
+    """Extract result file names, in rank order, from search_analyses output."""
+    return [
+        Path(line.split("Path:", 1)[1].strip()).name
+        for line in output.splitlines()
+        if line.strip().startswith("Path:")
+    ]
+
+
+def search_filtered(
+    shard: server.Shard,
+    query: LabeledQuery,
+    config: dict[str, Any],
+    depth: int,
+) -> list[str]:
+    """
+    Run the server's passage search with the config's where clause added.
+
+    txtai applies the clause to the nearest passages it fetches, so
+    selective filters can cost recall as well as latency. Returns result
+    file names in rank order.
+    """
+    column = FILTERS[config["filter"]]
+    with server.shard_lock(shard):
+        hits = server.get_embeddings(shard).search(
+            f"{server.SEARCH_QUERY} and {column} = :{column}",
+            limit=depth * server.CHUNK_OVERSAMPLE,
+            parameters={"query": query.text, column: getattr(query, column)},
+        )
+    results = server.aggregate_chunk_hits(hits, config["aggregate"])[:depth]
+    return [Path(result["id"]).name for result in results]
+
+
+async def measure_search(
+    queries: list[LabeledQuery],
+    config: dict[str, Any],
+    depth: int,
+    shard: server.Shard,
+) -> tuple[list[int | None], list[float]]:
+    """
+    Run every query through search_analyses, or the filtered search.
+
+    Returns (rank of the relevant document or None, latency in ms) per query.
+    """
+    ranks: list[int | None] = []
+    latencies = []
+    for query in queries:
+        # Measure the uncached path
+        server._search_results.clear()
+        started = time.perf_counter()
+        if FILTERS[config["filter"]] is None:
+            result = await server.handle_search_analyses(
+                query.text,
+                limit=depth,
+                aggregate=config["aggregate"],
+                diversity=float(config["diversity"]),
+            )
+            names = ranked_names(result[0].text)
+        else:
+            names = await asyncio.to_thread(search_filtered, shard, query, config, depth)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+        ranks.append(names.index(query.relevant) + 1 if query.relevant in names else None)
+
+    return ranks, latencies
+
+
+async def measure_index(paths: list[Path]) -> list[float]:
+    """Touch and re-index each path through index_analysis; returns latencies in ms."""
+    latencies = []
+    for path in paths:
+        with path.open("a", encoding="utf-8") as f:
+            f.write("\nRevisited during benchmark.\n")
+        started = time.perf_counter()
+        await server.handle_index_analysis(str(path))
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def run_config(
+    corpus_dir: Path,
+    queries: list[LabeledQuery],
+    config: dict[str, Any],
+    ks: list[int],
+    index_samples: int,
+) -> BenchmarkResult:
+    """Build an index over the corpus with config and measure it."""
+    with tempfile.TemporaryDirectory(prefix="deep-analysis-bench-") as tmp:
+        # Resolved so paths match validate_path (e.g. /tmp -> /private/tmp)
+        root = Path(tmp).resolve()
+        shutil.copytree(corpus_dir, root / "analyses")
+
+        with configured(root, config) as shard:
+            started = time.perf_counter()
+            scanned, documents, passages = server.rebuild_index(shard)
+            build_seconds = time.perf_counter() - started
+            logger.info(
+                f"Built {documents}/{scanned} documents ({passages} passages) "
+                f"in {build_seconds:.1f}s"
+            )
+            index_bytes = directory_size(shard.index_path)
+
+            # Retrieval quality and search latency
+            ranks, search_ms = asyncio.run(measure_search(queries, config, max(ks), shard))
+
+            # Single-document upsert latency
+            sample = sorted((root / "analyses").glob("*.md"))[:index_samples]
+            index_ms = asyncio.run(measure_index(sample))
+
+    total = len(queries) or 1
+    return BenchmarkResult(
+        config=config,
+        documents=documents,
+        passages=passages,
+        build_seconds=build_seconds,
+        index_bytes=index_bytes,
+        recall_at_k={
+            k: sum(1 for rank in ranks if rank and rank <= k) / total for k in ks
+        },
+        mrr=sum(1 / rank for rank in ranks if rank) / total,
+        search_p50_ms=statistics.median(search_ms) if search_ms else 0.0,
+        search_p95_ms=percentile(search_ms, 95),
+        index_p50_ms=statistics.median(index_ms) if index_ms else 0.0,
+        index_p95_ms=percentile(index_ms, 95),
+    )
+
+
+def parse_config(spec: str) -> dict[str, Any]:
+    """Parse "key=value,key=value" into a config over DEFAULT_CONFIG."""
+    config = dict(DEFAULT_CONFIG)
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        key, sep, value = item.partition("=")
+        if not sep or key not in DEFAULT_CONFIG:
+            raise argparse.ArgumentTypeError(
+                f"Invalid config item {item!r}; keys: {', '.join(DEFAULT_CONFIG)}"
+            )
+        config[key] = value
+    if config["filter"] not in FILTERS:
+        raise argparse.ArgumentTypeError(
+            f"Unknown filter {config['filter']!r}; expected {', '.join(FILTERS)}"
+        )
+    if config["filter"] != "none" and float(config["diversity"]):
+        raise argparse.ArgumentTypeError("filter cannot be combined with diversity")
+    return config
+
+
+def format_results(results: list[BenchmarkResult], ks: list[int]) -> str:
+    """Render results as a markdown table."""
+    header = (
+        ["config", "docs", "passages", "build s", "index MB"]
+        + [f"R@{k}" for k in ks]
+        + ["MRR", "search p50 ms", "search p95 ms", "index p95 ms"]
+    )
+    lines = ["| " + " | ".join(header) + " |", "|" + "---|" * len(header)]
+
+    for result in results:
+        changed = {
+            key: value
+            for key, value in result.config.items()
+            if str(value) != str(DEFAULT_CONFIG[key])
+        }
+        label = ",".join(f"{k}={v}" for k, v in changed.items()) or "default"
+        row = (
+            [
+                label,
+                str(result.documents),
+                str(result.passages),
+                f"{result.build_seconds:.1f}",
+                f"{result.index_bytes / 1_000_000:.1f}",
+            ]
+            + [f"{result.recall_at_k[k]:.3f}" for k in ks]
+            + [
+                f"{result.mrr:.3f}",
+                f"{result.search_p50_ms:.1f}",
+                f"{result.search_p95_ms:.1f}",
+                f"{result.index_p95_ms:.1f}",
+            ]
+        )
+        lines.append("| " + " | ".join(row) + " |")
+
+    return "\n".join(lines)
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--docs", type=int, default=1000, help="Corpus size (100 to 50000)")
+    parser.add_argument("--queries", type=int, default=200, help="Labeled queries")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus random seed")
+    parser.add_argument(
+        "--k", type=int, action="append", help="Recall cutoffs (default 1, 5, 10)"
+    )
+    parser.add_argument(
+        "--index-samples", type=int, default=20, help="Files re-indexed to time index_analysis"
+    )
+    parser.add_argument(
+        "--config",
+        type=parse_config,
+        action="append",
+        help="Configuration to compare, e.g. chunking=off,aggregate=sum "
+        f"(keys: {', '.join(DEFAULT_CONFIG)}). Repeatable",
+    )
+    parser.add_argument("--json", type=Path, help="Also write results as JSON")
+    args = parser.parse_args()
+
+    if not 100 <= args.docs <= 50000:
+        parser.error("--docs must be between 100 and 50000")
+
+    ks = sorted(set(args.k or [1, 5, 10]))
+    configs = args.config or [dict(DEFAULT_CONFIG)]
+
+    with tempfile.TemporaryDirectory(prefix="deep-analysis-corpus-") as tmp:
+        corpus_dir = Path(tmp) / "corpus"
+        queries = generate_corpus(corpus_dir, args.docs, args.queries, args.seed)
+        logger.info(f"Generated {args.docs} documents and {len(queries)} queries")
+
+        results = [
+            run_config(corpus_dir, queries, config, ks, args.index_samples)
+            for config in configs
+        ]
+
+    print(format_results(results, ks))
+
+    if args.json:
+        args.json.write_text(
+            json.dumps([asdict(result) for result in results], indent=2),
+            encoding="utf-8",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -7,10 +7,20 @@ Uses txtai for embeddings and SQLite storage.
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
+import itertools
 import json
 import logging
+import os
 import re
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterator, Hashable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 from typing import Any
@@ -19,6 +29,14 @@ import mcp.server.stdio
 import mcp.types as types
 from mcp.server import Server
 
+try:
+    import yaml
+
+    # libyaml-backed loader when available, pure Python otherwise
+    YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+except ImportError:
+    yaml = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("deep-analysis-mcp")
@@ -27,47 +45,392 @@ logger = logging.getLogger("deep-analysis-mcp")
 INDEX_DIR = Path.home() / ".claude" / "deep-analysis" / "index"
 GLOBAL_ANALYSES_DIR = Path.home() / ".claude" / "analyses"
 
-# Lazy-loaded txtai embeddings
-_embeddings = None
+# One index shard per analysis directory: the global shard plus one per project
+SHARDS_DIR = INDEX_DIR / "shards"
+GLOBAL_SHARD = "global"
+
+# Projects whose docs/analysis/ directories have been seen by the server
+PROJECTS_FILE = INDEX_DIR / "projects.json"
+
+# Filesystem watcher: "" or "0" disables it, "poll" forces mtime polling,
+# anything else uses watchdog when installed and falls back to polling.
+WATCH_MODE = os.environ.get("DEEP_ANALYSIS_WATCH", "").strip().lower()
+
+# Seconds without new events before a burst of changes is applied
+WATCH_DEBOUNCE_SECONDS = 2.0
+
+# Seconds between polling scans (and registry checks with watchdog)
+WATCH_POLL_SECONDS = 5.0
+
+# Embedding model
+MODEL_PATH = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Vector storage: "full" keeps float32 vectors, read into RAM on load, in the
+# faiss index txtai picks by size (flat up to 5,000 passages, IVF above).
+# "float16" and "int8" scalar-quantize vectors (2x and 4x smaller) in an IVF
+# index that is memory-mapped on load, so server RSS and startup time stay
+# flat as the corpus grows. faiss maps IVF indexes read-only, so a mapped
+# shard is read into RAM before its first upsert or delete. Applies to shards
+# built after the setting changes; txtai keeps the settings a shard was built
+# with.
+VECTOR_STORAGE = os.environ.get("DEEP_ANALYSIS_VECTORS", "full").strip().lower()
+
+VECTOR_STORAGE_CONFIGS: dict[str, dict[str, Any]] = {
+    "full": {},
+    "float16": {"backend": "faiss", "faiss": {"components": "IVF,SQfp16", "mmap": True}},
+    "int8": {"backend": "faiss", "faiss": {"components": "IVF,SQ8", "mmap": True}},
+}
+
+# Chunking: MiniLM truncates input at 256 word pieces, so long analyses are
+# split into heading-driven passages that each fit in one embedding.
+CHUNK_MAX_CHARS = 1000
+
+# Chunk hits fetched per requested document before aggregating by parent
+CHUNK_OVERSAMPLE = 4
+
+# Maximum length of the passage snippet shown with a search result
+SNIPPET_CHARS = 240
+
+# Upper bound on chunks per document when looking up a document's chunk ids
+MAX_CHUNKS_PER_DOCUMENT = 10000
+
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+
+SEARCH_QUERY = (
+    "select id, text, parent, section, problem, date, decision, status, score "
+    "from txtai where similar(:query)"
+)
+
+# Similarity: documents at or above this cosine similarity are flagged as
+# near-duplicates, and clustering links documents at or above its threshold
+DUPLICATE_THRESHOLD = 0.9
+CLUSTER_THRESHOLD = 0.85
+
+# Candidates fetched per requested result when MMR diversification is on
+MMR_OVERSAMPLE = 4
+
+# Cache sizes: query text -> embedding vector, search request -> output, and
+# analysis file -> parsed frontmatter
+QUERY_CACHE_SIZE = 1024
+RESULT_CACHE_SIZE = 256
+FRONTMATTER_CACHE_SIZE = 4096
+
+# Rebuild: files are read, hashed and parsed on a thread pool and streamed
+# into txtai one batch at a time so memory stays bounded
+REBUILD_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+REBUILD_BATCH_SIZE = 256
+
+# Lazy-loaded txtai embeddings, keyed by shard name
+_shards: dict[str, Any] = {}
+
+# Per-shard locks serialize index access between request handlers, fan-out
+# search threads and the watcher thread
+_shard_locks: dict[str, threading.RLock] = {}
+_shard_locks_guard = threading.Lock()
+
+# One rebuild at a time per shard; the shard lock is only held to swap it in
+_rebuild_locks: dict[str, threading.Lock] = {}
+
+# Files changed while a shard is being rebuilt, keyed by shard name and
+# guarded by the shard lock; replayed onto the new index before the swap
+_rebuild_changes: dict[str, dict[Path, str]] = {}
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache with hit/miss counters."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any | None:
+        """Get a cached value, or None on a miss."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Cache a value, evicting the least recently used entry when full."""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all entries; counters are kept."""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Get size and hit-rate counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Shared by every shard: all shards use the same model
+_query_vectors = LRUCache(QUERY_CACHE_SIZE)
+
+# Formatted search output keyed by request and shard generations
+_search_results = LRUCache(RESULT_CACHE_SIZE)
+
+# Parsed frontmatter keyed by path, as ((mtime_ns, size), frontmatter); an
+# entry is valid while the file's signature is unchanged
+_frontmatter_cache = LRUCache(FRONTMATTER_CACHE_SIZE)
+
+# Index generation per shard, bumped whenever a shard's index is saved
+_generations: dict[str, int] = {}
+
+
+def memoize_query_vectors(embeddings) -> None:
+    """
+    Route an embeddings instance's batchtransform through the query cache.
+
+    txtai encodes search queries with batchtransform, so repeated queries
+    skip the model. Only texts missing from the cache are encoded.
+    """
+    transform = embeddings.batchtransform
+
+    def batchtransform(documents, *args, **kwargs):
+        import numpy as np
+
+        documents = list(documents)
+        texts = [doc[1] if isinstance(doc, tuple) else doc for doc in documents]
+        if not all(isinstance(text, str) for text in texts):
+            return transform(documents, *args, **kwargs)
 
+        options = (args, tuple(sorted(kwargs.items())))
+        keys = [(options, text) for text in texts]
+        vectors = [_query_vectors.get(key) for key in keys]
 
-def get_embeddings():
-    """Lazy-load txtai embeddings."""
-    global _embeddings
-    if _embeddings is None:
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            computed = transform([documents[i] for i in missing], *args, **kwargs)
+            for i, vector in zip(missing, computed):
+                vectors[i] = vector
+                _query_vectors.put(keys[i], vector)
+
+        return np.asarray(vectors)
+
+    embeddings.batchtransform = batchtransform
+
+
+def embeddings_config() -> dict[str, Any]:
+    """
+    Build the txtai configuration for new indexes.
+
+    Raises ValueError if DEEP_ANALYSIS_VECTORS is not a known storage mode.
+    """
+    if VECTOR_STORAGE not in VECTOR_STORAGE_CONFIGS:
+        raise ValueError(
+            f"Unknown DEEP_ANALYSIS_VECTORS: {VECTOR_STORAGE} "
+            f"(expected {', '.join(VECTOR_STORAGE_CONFIGS)})"
+        )
+
+    return {
+        "path": MODEL_PATH,
+        "content": True,  # Store content for retrieval
+        **VECTOR_STORAGE_CONFIGS[VECTOR_STORAGE],
+    }
+
+
+def create_embeddings():
+    """Create an empty txtai embeddings instance."""
+    from txtai import Embeddings
+
+    embeddings = Embeddings(**embeddings_config())
+    memoize_query_vectors(embeddings)
+    return embeddings
+
+
+@dataclass(frozen=True)
+class Shard:
+    """An independently built index over one analysis directory."""
+
+    name: str
+    analysis_dir: Path
+
+    @property
+    def index_path(self) -> Path:
+        """Directory of the live index, as named by the pointer file after a rebuild."""
         try:
-            from txtai import Embeddings
+            current = self.pointer_path.read_text(encoding="utf-8").strip()
+        except OSError:
+            current = ""
+        return SHARDS_DIR / (Path(current).name or self.name)
 
-            INDEX_DIR.mkdir(parents=True, exist_ok=True)
-            index_path = INDEX_DIR / "embeddings"
+    @property
+    def pointer_path(self) -> Path:
+        return SHARDS_DIR / f"{self.name}.current"
+
+    @property
+    def metadata_path(self) -> Path:
+        return SHARDS_DIR / f"{self.name}.meta.json"
+
+
+def shard_lock(shard: Shard) -> threading.RLock:
+    """Get the lock guarding a shard's embeddings."""
+    with _shard_locks_guard:
+        return _shard_locks.setdefault(shard.name, threading.RLock())
+
+
+def rebuild_lock(shard: Shard) -> threading.Lock:
+    """Get the lock serializing rebuilds of a shard."""
+    with _shard_locks_guard:
+        return _rebuild_locks.setdefault(shard.name, threading.Lock())
+
+
+def note_change(shard: Shard, path: Path, action: str) -> None:
+    """
+    Record an "upsert" or "delete" for a rebuild in progress.
+
+    Call with the shard lock held; does nothing when the shard is not
+    being rebuilt.
+    """
+    changes = _rebuild_changes.get(shard.name)
+    if changes is not None:
+        changes[path] = action
+
+
+def get_embeddings(shard: Shard | None = None):
+    """Lazy-load txtai embeddings for a shard (default: global)."""
+    shard = shard or global_shard()
+
+    with shard_lock(shard):
+        if shard.name not in _shards:
+            _shards[shard.name] = load_embeddings(shard)
+
+        return _shards[shard.name]
+
+
+def load_embeddings(shard: Shard, path: Path | None = None):
+    """Open a shard's saved index (or the one at path), or an empty one if it has none."""
+    path = path or shard.index_path
+    try:
+        embeddings = create_embeddings()
+
+        # Load existing index if it exists
+        if path.exists():
+            embeddings.load(str(path))
+            logger.info(f"Loaded existing index from {path}")
+        else:
+            logger.info(f"No existing index for shard {shard.name}, starting fresh")
+
+    except ImportError as e:
+        logger.error(f"Failed to import txtai: {e}")
+        raise RuntimeError(
+            "txtai is required but not installed. Run: uv add txtai"
+        ) from e
+
+    return embeddings
+
+
+def writable_embeddings(shard: Shard):
+    """
+    Get a shard's embeddings ready for upserts and deletes.
+
+    A memory-mapped index is reloaded into RAM first. The saved config
+    keeps mmap, so the next server start maps the index again.
+    """
+    with shard_lock(shard):
+        embeddings = get_embeddings(shard)
+        if not memory_mapped(embeddings):
+            return embeddings
+
+        reopened = reopen_unmapped(embeddings, shard.index_path)
+        _shards[shard.name] = reopened
+        logger.info(f"Reloaded memory-mapped index {shard.name} for writing")
+        return reopened
+
+
+def reopen_unmapped(embeddings, path: Path):
+    """Close a memory-mapped index and load it from path into RAM, keeping mmap in its config."""
+    settings = embeddings.config["faiss"]
+    reopened = create_embeddings()
+    reopened.load(str(path), config={"faiss": {**settings, "mmap": False}})
+    reopened.config["faiss"] = settings
+    embeddings.close()
+    return reopened
+
+
+def memory_mapped(embeddings) -> bool:
+    """Check whether an index's faiss inverted lists are mapped read-only."""
+    backend = getattr(getattr(embeddings, "ann", None), "backend", None)
+    if backend is None or not type(backend).__module__.startswith("faiss"):
+        return False
+
+    import faiss
+
+    ivf = faiss.try_extract_index_ivf(backend)
+    if ivf is None:
+        return False
+    invlists = faiss.downcast_InvertedLists(ivf.invlists)
+    return isinstance(invlists, faiss.OnDiskInvertedLists) and invlists.read_only
 
-            _embeddings = Embeddings(
-                path="sentence-transformers/all-MiniLM-L6-v2",
-                content=True,  # Store content for retrieval
-            )
 
-            # Load existing index if it exists
-            if index_path.exists():
-                _embeddings.load(str(index_path))
-                logger.info(f"Loaded existing index from {index_path}")
-            else:
-                logger.info("No existing index found, starting fresh")
+def set_embeddings(shard: Shard, embeddings, path: Path | None = None) -> None:
+    """
+    Replace a shard's live embeddings, e.g. after a rebuild, closing the old ones.
+
+    With path, the shard's pointer file is switched to that index
+    directory at the same time.
+    """
+    with shard_lock(shard):
+        if path is not None:
+            temp_path = shard.pointer_path.with_suffix(".tmp")
+            temp_path.write_text(path.name, encoding="utf-8")
+            temp_path.replace(shard.pointer_path)
+
+        previous = _shards.get(shard.name)
+        _shards[shard.name] = embeddings
+        bump_generation(shard)
+        if previous is not None and previous is not embeddings:
+            previous.close()
 
-        except ImportError as e:
-            logger.error(f"Failed to import txtai: {e}")
-            raise RuntimeError(
-                "txtai is required but not installed. Run: uv add txtai"
-            ) from e
 
-    return _embeddings
+def bump_generation(shard: Shard) -> None:
+    """Mark a shard's index as changed and drop cached search results."""
+    with _shard_locks_guard:
+        _generations[shard.name] = _generations.get(shard.name, 0) + 1
+    _search_results.clear()
 
 
-def save_index():
-    """Save the index to disk."""
-    if _embeddings is not None:
-        index_path = INDEX_DIR / "embeddings"
-        _embeddings.save(str(index_path))
-        logger.info(f"Saved index to {index_path}")
+def shard_generations(shards: list[Shard]) -> tuple[tuple[str, int], ...]:
+    """Get the current generation of each shard, for cache keys."""
+    with _shard_locks_guard:
+        return tuple((shard.name, _generations.get(shard.name, 0)) for shard in shards)
+
+
+def save_index(shard: Shard | None = None):
+    """
+    Save a shard's index to disk (default: global).
+
+    Every upsert, delete and rebuild ends with a save, so this is also
+    where the shard's generation is bumped.
+    """
+    shard = shard or global_shard()
+
+    with shard_lock(shard):
+        embeddings = _shards.get(shard.name)
+        if embeddings is not None:
+            shard.index_path.parent.mkdir(parents=True, exist_ok=True)
+            embeddings.save(str(shard.index_path))
+            logger.info(f"Saved index to {shard.index_path}")
+        bump_generation(shard)
 
 
 def compute_file_hash(path: Path) -> str:
@@ -79,6 +442,58 @@ def compute_file_hash(path: Path) -> str:
     return sha256.hexdigest()
 
 
+def is_frontmatter_delimiter(line: str) -> bool:
+    """Check whether a line opens or closes a YAML frontmatter block."""
+    return line.rstrip() == "---"
+
+
+def split_frontmatter(content: str) -> tuple[str | None, str]:
+    """
+    Split markdown content into (frontmatter_yaml, body_text).
+
+    Scans line by line and stops at the closing delimiter, so "---" inside
+    the body or a YAML value is never mistaken for one. Returns None for
+    the YAML when there is no complete frontmatter block.
+    """
+    if not content.startswith("---"):
+        return None, content
+
+    end = content.find("\n")
+    if end == -1 or not is_frontmatter_delimiter(content[:end]):
+        return None, content
+
+    start = pos = end + 1
+    while pos < len(content):
+        end = content.find("\n", pos)
+        if end == -1:
+            end = len(content)
+        if is_frontmatter_delimiter(content[pos:end]):
+            return content[start:pos], content[end + 1 :].strip()
+        pos = end + 1
+
+    return None, content
+
+
+def load_frontmatter_yaml(text: str) -> dict[str, Any]:
+    """
+    Load a frontmatter YAML block.
+
+    Permissive: returns empty dict if YAML is unavailable, invalid, or not
+    a mapping.
+    """
+    if yaml is None:
+        logger.warning("PyYAML not installed, ignoring frontmatter")
+        return {}
+
+    try:
+        frontmatter = yaml.load(text, Loader=YAML_LOADER)
+    except Exception as e:
+        logger.warning(f"Failed to parse YAML frontmatter: {e}")
+        return {}
+
+    return frontmatter if isinstance(frontmatter, dict) else {}
+
+
 def parse_frontmatter(content: str) -> tuple[dict[str, Any], str]:
     """
     Parse YAML frontmatter from markdown content.
@@ -86,23 +501,139 @@ def parse_frontmatter(content: str) -> tuple[dict[str, Any], str]:
     Returns (frontmatter_dict, body_text).
     Permissive: returns empty dict if no frontmatter or invalid YAML.
     """
-    frontmatter: dict[str, Any] = {}
-    body = content
+    text, body = split_frontmatter(content)
+    if text is None:
+        return {}, body
+    return load_frontmatter_yaml(text), body
+
+
+def read_frontmatter_block(path: Path) -> str | None:
+    """Read only the frontmatter lines of a file, stopping at the closing delimiter."""
+    with open(path, encoding="utf-8") as f:
+        if not is_frontmatter_delimiter(f.readline()):
+            return None
+        lines = []
+        for line in f:
+            if is_frontmatter_delimiter(line):
+                return "".join(lines)
+            lines.append(line)
+    return None
+
+
+def file_signature(path: Path) -> tuple[int, int]:
+    """Get a file's (mtime_ns, size), which changes whenever it is rewritten."""
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def read_frontmatter(
+    path: Path,
+    content: str | None = None,
+    signature: tuple[int, int] | None = None,
+) -> dict[str, Any]:
+    """
+    Get a file's parsed frontmatter, memoized by (path, mtime, size).
+
+    Pass content when the file has already been read, with the
+    file_signature taken before reading it; content without a signature
+    is parsed but not cached. Otherwise only the frontmatter block is
+    read from disk. The signature is always taken before the read, so a
+    write racing with it leaves a stale signature that misses next time,
+    never stale data under the new one. The returned dict is shared with
+    the cache and must not be mutated.
+    """
+    if content is None:
+        signature = file_signature(path)
+
+    cached = _frontmatter_cache.get(path) if signature is not None else None
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    if content is None:
+        text = read_frontmatter_block(path)
+    else:
+        text, _ = split_frontmatter(content)
+    frontmatter = load_frontmatter_yaml(text) if text is not None else {}
+
+    if signature is not None:
+        _frontmatter_cache.put(path, (signature, frontmatter))
+    return frontmatter
+
+
+def split_long_text(text: str, max_chars: int = CHUNK_MAX_CHARS) -> list[str]:
+    """
+    Split text into pieces of at most max_chars.
+
+    Packs whole paragraphs where possible and falls back to breaking
+    oversized paragraphs on whitespace.
+    """
+    pieces: list[str] = []
+    current = ""
+
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+
+        while len(paragraph) > max_chars:
+            cut = paragraph.rfind(" ", 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(paragraph[:cut].strip())
+            paragraph = paragraph[cut:].strip()
+
+        if current and len(current) + len(paragraph) + 2 > max_chars:
+            pieces.append(current)
+            current = ""
+        current = f"{current}\n\n{paragraph}" if current else paragraph
 
-    # Check for frontmatter delimiters
-    if content.startswith("---"):
-        parts = content.split("---", 2)
-        if len(parts) >= 3:
-            try:
-                import yaml
+    if current:
+        pieces.append(current)
 
-                frontmatter = yaml.safe_load(parts[1]) or {}
-            except Exception as e:
-                logger.warning(f"Failed to parse YAML frontmatter: {e}")
-                frontmatter = {}
-            body = parts[2].strip()
+    return pieces
 
-    return frontmatter, body
+
+def chunk_markdown(body: str, max_chars: int = CHUNK_MAX_CHARS) -> list[tuple[str, str]]:
+    """
+    Split a markdown body into passages driven by its headings.
+
+    Returns a list of (section_heading, passage) tuples. Sections longer
+    than max_chars are split further on paragraph boundaries. Headings
+    inside fenced code blocks are ignored.
+    """
+    sections: list[tuple[str, list[str]]] = [("", [])]
+    in_fence = False
+
+    for line in body.splitlines():
+        if line.lstrip().startswith(("```", "~~~")):
+            in_fence = not in_fence
+
+        match = None if in_fence else HEADING_PATTERN.match(line)
+        if match:
+            sections.append((match.group(2), []))
+        else:
+            sections[-1][1].append(line)
+
+    chunks: list[tuple[str, str]] = []
+    for heading, lines in sections:
+        text = "\n".join(lines).strip()
+        if not text:
+            continue
+        for passage in split_long_text(text, max_chars):
+            chunks.append((heading, passage))
+
+    return chunks
+
+
+def make_snippet(text: str, max_chars: int = SNIPPET_CHARS) -> str:
+    """Collapse whitespace and truncate a passage for display."""
+    snippet = " ".join(text.split())
+    if len(snippet) > max_chars:
+        snippet = snippet[: max_chars - 1].rsplit(" ", 1)[0] + "…"
+    return snippet
 
 
 def validate_path(path: str, project_path: str | None = None) -> Path:
@@ -129,6 +660,115 @@ def validate_path(path: str, project_path: str | None = None) -> Path:
     )
 
 
+def load_registered_projects() -> list[Path]:
+    """Load project roots registered with the server."""
+    if not PROJECTS_FILE.exists():
+        return []
+
+    try:
+        data = json.loads(PROJECTS_FILE.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Failed to read project registry {PROJECTS_FILE}: {e}")
+        return []
+
+    return [Path(p) for p in data.get("projects", [])]
+
+
+def register_project(project_path: str | None) -> None:
+    """
+    Remember a project root so its docs/analysis/ directory is watched.
+
+    No-op when project_path is None or already registered.
+    """
+    if not project_path:
+        return
+
+    root = Path(project_path).resolve()
+    projects = load_registered_projects()
+    if root in projects:
+        return
+
+    projects.append(root)
+    PROJECTS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = PROJECTS_FILE.with_suffix(".tmp")
+    temp_path.write_text(
+        json.dumps({"projects": [str(p) for p in projects]}, indent=2),
+        encoding="utf-8",
+    )
+    temp_path.replace(PROJECTS_FILE)
+    logger.info(f"Registered project {root}")
+
+
+def global_shard() -> Shard:
+    """Get the shard for ~/.claude/analyses/."""
+    return Shard(GLOBAL_SHARD, GLOBAL_ANALYSES_DIR)
+
+
+def project_shard(project_path: str | Path) -> Shard:
+    """Get the shard for a project's docs/analysis/ directory."""
+    root = Path(project_path).resolve()
+    digest = hashlib.sha256(str(root).encode("utf-8")).hexdigest()[:12]
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "-", root.name).strip("-") or "project"
+    return Shard(f"project-{slug}-{digest}", root / "docs" / "analysis")
+
+
+def known_shards() -> list[Shard]:
+    """Get the global shard plus one shard per registered project."""
+    shards = [global_shard()]
+    for root in load_registered_projects():
+        shard = project_shard(root)
+        if shard not in shards:
+            shards.append(shard)
+    return shards
+
+
+def shard_for_path(path: Path, shards: list[Shard] | None = None) -> Shard | None:
+    """
+    Find the shard whose analysis directory contains path.
+
+    Pass shards (from known_shards) when routing many paths, so the
+    project registry is read once rather than per path.
+    """
+    for shard in shards if shards is not None else known_shards():
+        if path.is_relative_to(shard.analysis_dir):
+            return shard
+    return None
+
+
+def select_shards(project_path: str | None = None, scope: str | None = None) -> list[Shard]:
+    """
+    Choose the shards a search should fan out to.
+
+    scope "global" and "project" pick a single shard, "all" picks every
+    registered shard. Without a scope, the global shard is searched plus
+    the project's shard when project_path is given.
+    """
+    if scope == "all":
+        return known_shards()
+    if scope == "global":
+        return [global_shard()]
+    if scope == "project":
+        if not project_path:
+            raise ValueError("scope 'project' requires project_path")
+        return [project_shard(project_path)]
+    if scope is not None:
+        raise ValueError(f"Unknown scope: {scope} (expected global, project or all)")
+
+    shards = [global_shard()]
+    if project_path:
+        shards.append(project_shard(project_path))
+    return shards
+
+
+def get_watched_dirs() -> list[Path]:
+    """Get the global directory plus every registered project's analysis dir."""
+    return [
+        shard.analysis_dir
+        for shard in known_shards()
+        if shard.analysis_dir == GLOBAL_ANALYSES_DIR or shard.analysis_dir.exists()
+    ]
+
+
 def get_analysis_dirs(project_path: str | None = None) -> list[Path]:
     """Get all directories to scan for analyses."""
     dirs = [GLOBAL_ANALYSES_DIR]
@@ -155,11 +795,15 @@ def index_single_file(path: Path) -> dict[str, Any] | None:
         return None
 
     try:
-        content = path.read_text(encoding="utf-8")
-        frontmatter, body = parse_frontmatter(content)
+        # Read once for both the hash and the text
+        signature = file_signature(path)
+        raw = path.read_bytes()
+        file_hash = hashlib.sha256(raw).hexdigest()
+        content = raw.decode("utf-8")
+        frontmatter = read_frontmatter(path, content, signature)
+        _, body = split_frontmatter(content)
 
         # Extract key fields
-        file_hash = compute_file_hash(path)
         problem = frontmatter.get("problem", path.stem)
         date = frontmatter.get("date", "")
         if isinstance(date, datetime):
@@ -169,15 +813,26 @@ def index_single_file(path: Path) -> dict[str, Any] | None:
         domain = frontmatter.get("domain", [])
         keywords = frontmatter.get("keywords", [])
 
-        # Create searchable text
-        searchable_text = f"{problem} {body}"
+        if not isinstance(keywords, list):
+            keywords = [keywords]
+
+        # Summary chunk: short enough to always fit in one embedding
+        summary = str(problem)
+        if decision:
+            summary += f"\nDecision: {decision}"
         if keywords:
-            searchable_text += " " + " ".join(keywords)
+            summary += "\nKeywords: " + ", ".join(str(k) for k in keywords)
+
+        chunks = [{"section": "", "text": summary}]
+        for section, passage in chunk_markdown(body):
+            # Prefix each passage with its context so it embeds on its own
+            context = f"{problem}: {section}" if section else str(problem)
+            chunks.append({"section": section, "text": f"{context}\n{passage}"})
 
         doc = {
             "id": str(path),
             "path": str(path),
-            "text": searchable_text,
+            "chunks": chunks,
             "problem": problem,
             "date": str(date),
             "decision": decision,
@@ -193,6 +848,686 @@ def index_single_file(path: Path) -> dict[str, Any] | None:
         return None
 
 
+def document_rows(doc: dict[str, Any]) -> list[tuple[str, dict[str, Any], None]]:
+    """
+    Build txtai rows for a document, one per chunk.
+
+    Each chunk carries the parent document id so hits can be aggregated
+    back to documents at search time.
+    """
+    rows = []
+    for i, chunk in enumerate(doc["chunks"]):
+        rows.append(
+            (
+                f"{doc['id']}#{i}",
+                {
+                    "text": chunk["text"],
+                    "parent": doc["id"],
+                    "section": chunk["section"],
+                    "problem": doc["problem"],
+                    "date": doc["date"],
+                    "decision": doc["decision"],
+                    "status": doc["status"],
+                    "domain": doc["domain"],
+                    "hash": doc["hash"],
+                },
+                None,
+            )
+        )
+    return rows
+
+
+def document_chunk_ids(embeddings, doc_id: str) -> list[str]:
+    """
+    Get the ids of every indexed row belonging to a document.
+
+    Includes the bare document id so indexes built before chunking
+    are cleaned up too.
+    """
+    results = embeddings.search(
+        "select id from txtai where parent = :parent",
+        limit=MAX_CHUNKS_PER_DOCUMENT,
+        parameters={"parent": doc_id},
+    )
+    return [doc_id] + [result["id"] for result in results]
+
+
+def aggregate_chunk_hits(
+    hits: list[dict[str, Any]],
+    mode: str = "max",
+) -> list[dict[str, Any]]:
+    """
+    Aggregate chunk-level search hits into document-level results.
+
+    Scores are combined per parent document with max or sum scoring.
+    Each result keeps its best-matching passage as a snippet.
+    """
+    if mode not in ("max", "sum"):
+        raise ValueError(f"Unknown aggregate mode: {mode} (expected max or sum)")
+
+    documents: dict[str, dict[str, Any]] = {}
+
+    for hit in hits:
+        # Rows indexed before chunking have no parent
+        parent = hit.get("parent") or hit["id"]
+        score = hit.get("score", 0)
+        text = hit.get("text") or ""
+        passage = text.split("\n", 1)[-1]
+
+        entry = documents.get(parent)
+        if entry is None:
+            documents[parent] = {
+                "id": parent,
+                "score": score,
+                "best": score,
+                "problem": hit.get("problem") or Path(parent).stem,
+                "date": hit.get("date") or "",
+                "decision": hit.get("decision") or "",
+                "status": hit.get("status") or "",
+                "section": hit.get("section") or "",
+                "snippet": make_snippet(passage),
+            }
+            continue
+
+        if mode == "max":
+            entry["score"] = max(entry["score"], score)
+        else:
+            entry["score"] += score
+
+        if score > entry["best"]:
+            entry["best"] = score
+            entry["section"] = hit.get("section") or ""
+            entry["snippet"] = make_snippet(passage)
+
+    return sorted(documents.values(), key=lambda d: d["score"], reverse=True)
+
+
+def indexed_hash(embeddings, doc_id: str) -> str | None:
+    """Get the content hash stored with a document's chunks, if indexed."""
+    results = embeddings.search(
+        "select hash from txtai where parent = :parent",
+        limit=1,
+        parameters={"parent": doc_id},
+    )
+    return results[0].get("hash") if results else None
+
+
+def upsert_document(embeddings, doc: dict[str, Any]) -> None:
+    """Replace all indexed chunks of a document with its current chunks."""
+    embeddings.delete(document_chunk_ids(embeddings, doc["id"]))
+    embeddings.upsert(document_rows(doc))
+
+
+def remove_document(embeddings, doc_id: str) -> None:
+    """Delete every indexed chunk of a document."""
+    embeddings.delete(document_chunk_ids(embeddings, doc_id))
+
+
+class IndexWatcher:
+    """
+    Keeps the index in sync with analysis directories in the background.
+
+    Uses watchdog (inotify/FSEvents) when installed, otherwise polls
+    file mtimes. Events are coalesced per path and applied as one batch,
+    with a single index save, once no new events arrive for the debounce
+    window.
+    """
+
+    def __init__(
+        self,
+        debounce: float = WATCH_DEBOUNCE_SECONDS,
+        poll_interval: float = WATCH_POLL_SECONDS,
+        use_watchdog: bool = True,
+    ):
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.use_watchdog = use_watchdog
+
+        self._pending: dict[Path, str] = {}
+        self._pending_lock = threading.Lock()
+        self._last_event = 0.0
+        self._last_poll = 0.0
+        self._snapshot: dict[Path, tuple[int, int]] = {}
+        self._watched: set[Path] = set()
+        self._observer = None
+        self._handler = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start watching in a daemon thread."""
+        if self.use_watchdog:
+            self._start_observer()
+
+        if self._observer is None:
+            # Polling baseline: only changes after startup produce events
+            self._snapshot = self._scan()
+
+        self._queue_existing_files()
+
+        self._thread = threading.Thread(
+            target=self._run, name="deep-analysis-watcher", daemon=True
+        )
+        self._thread.start()
+        mode = "watchdog" if self._observer is not None else "polling"
+        logger.info(f"Index watcher started ({mode})")
+
+    def stop(self) -> None:
+        """Stop watching and apply any pending changes."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+        self.flush(force=True)
+
+    def record(self, path: Path, action: str) -> None:
+        """Queue an "upsert" or "delete" for path; the latest event wins."""
+        if path.suffix != ".md":
+            return
+        with self._pending_lock:
+            self._pending[path] = action
+            self._last_event = time.monotonic()
+
+    def flush(self, force: bool = False) -> int:
+        """
+        Apply queued changes once the debounce window has passed.
+
+        Returns the number of changes applied.
+        """
+        with self._pending_lock:
+            if not self._pending:
+                return 0
+            if not force and time.monotonic() - self._last_event < self.debounce:
+                return 0
+            changes = self._pending
+            self._pending = {}
+
+        try:
+            return apply_changes(changes)
+        except Exception as e:
+            logger.error(f"Watcher failed to apply {len(changes)} changes: {e}")
+            return 0
+
+    def _run(self) -> None:
+        while not self._stop.wait(min(self.poll_interval, self.debounce)):
+            if self._observer is not None:
+                self._schedule_new_dirs()
+            elif self._poll_due():
+                self._poll()
+            self.flush()
+
+    def _poll_due(self) -> bool:
+        now = time.monotonic()
+        if now - self._last_poll < self.poll_interval:
+            return False
+        self._last_poll = now
+        return True
+
+    def _start_observer(self) -> None:
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            logger.info("watchdog not installed, falling back to polling")
+            return
+
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            def on_created(self, event):
+                if not event.is_directory:
+                    watcher.record(Path(event.src_path), "upsert")
+
+            def on_modified(self, event):
+                if not event.is_directory:
+                    watcher.record(Path(event.src_path), "upsert")
+
+            def on_deleted(self, event):
+                if not event.is_directory:
+                    watcher.record(Path(event.src_path), "delete")
+
+            def on_moved(self, event):
+                if not event.is_directory:
+                    watcher.record(Path(event.src_path), "delete")
+                    watcher.record(Path(event.dest_path), "upsert")
+
+        self._handler = Handler()
+        self._observer = Observer()
+        self._schedule_new_dirs()
+        self._observer.start()
+
+    def _schedule_new_dirs(self) -> None:
+        for dir_path in get_watched_dirs():
+            if dir_path in self._watched or not dir_path.exists():
+                continue
+            self._observer.schedule(self._handler, str(dir_path), recursive=True)
+            self._watched.add(dir_path)
+            logger.info(f"Watching {dir_path}")
+
+    def _scan(self) -> dict[Path, tuple[int, int]]:
+        snapshot = {}
+        for dir_path in get_watched_dirs():
+            if not dir_path.exists():
+                continue
+            for md_file in dir_path.glob("**/*.md"):
+                try:
+                    snapshot[md_file] = file_signature(md_file)
+                except OSError:
+                    continue
+        return snapshot
+
+    def _poll(self) -> None:
+        current = self._scan()
+        for path, signature in current.items():
+            if self._snapshot.get(path) != signature:
+                self.record(path, "upsert")
+        for path in self._snapshot.keys() - current.keys():
+            self.record(path, "delete")
+        self._snapshot = current
+
+    def _queue_existing_files(self) -> None:
+        # Catch up on edits made while the server was down; unchanged
+        # files are skipped by hash in apply_changes.
+        for dir_path in get_watched_dirs():
+            if dir_path.exists():
+                for md_file in dir_path.glob("**/*.md"):
+                    self.record(md_file, "upsert")
+
+
+def apply_changes(changes: dict[Path, str]) -> int:
+    """
+    Apply a batch of coalesced file changes to the index.
+
+    Changes are routed to the shard that owns each path. Upserts of files
+    whose content hash is unchanged are skipped before the shard is made
+    writable, so a batch of unchanged files (such as the watcher's startup
+    catch-up) leaves memory-mapped indexes mapped. Each touched shard is
+    saved once for the whole batch.
+
+    Returns the number of documents upserted or deleted.
+    """
+    shards = known_shards()
+    by_shard: dict[Shard, dict[Path, str]] = {}
+    for path, action in changes.items():
+        shard = shard_for_path(path, shards)
+        if shard is None:
+            logger.warning(f"Ignoring change outside known shards: {path}")
+            continue
+        by_shard.setdefault(shard, {})[path] = action
+
+    applied = 0
+
+    for shard, shard_changes in by_shard.items():
+        with shard_lock(shard):
+            for path, action in shard_changes.items():
+                note_change(shard, path, action)
+
+            shard_changes = pending_changes(get_embeddings(shard), shard_changes)
+            if not shard_changes:
+                continue
+
+            shard_applied = apply_shard_changes(writable_embeddings(shard), shard_changes)
+            if shard_applied:
+                save_index(shard)
+
+        applied += shard_applied
+
+    if applied:
+        logger.info(f"Watcher applied {applied} index changes")
+    return applied
+
+
+def pending_changes(embeddings, changes: dict[Path, str]) -> dict[Path, str]:
+    """Drop upserts of files whose content hash is already indexed."""
+    return {
+        path: action
+        for path, action in changes.items()
+        if action == "delete"
+        or not path.exists()
+        or indexed_hash(embeddings, str(path)) != compute_file_hash(path)
+    }
+
+
+def apply_shard_changes(embeddings, changes: dict[Path, str]) -> int:
+    """
+    Apply coalesced file changes to one shard's embeddings, without saving.
+
+    Returns the number of documents upserted or deleted.
+    """
+    applied = 0
+
+    for path, action in changes.items():
+        doc_id = str(path)
+
+        if action == "delete" or not path.exists():
+            remove_document(embeddings, doc_id)
+            applied += 1
+            continue
+
+        if indexed_hash(embeddings, doc_id) == compute_file_hash(path):
+            continue
+
+        doc = index_single_file(path)
+        if doc is not None:
+            upsert_document(embeddings, doc)
+            applied += 1
+
+    return applied
+
+
+def find_analysis_files(dirs: list[Path]) -> list[Path]:
+    """List markdown files under dirs, creating missing dirs."""
+    files = []
+    for dir_path in dirs:
+        if not dir_path.exists():
+            dir_path.mkdir(parents=True, exist_ok=True)
+            continue
+        files.extend(dir_path.glob("**/*.md"))
+    return files
+
+
+def parse_analysis_files(
+    paths: list[Path],
+    progress: Callable[[int, int], None] | None = None,
+    workers: int = REBUILD_WORKERS,
+    batch_size: int = REBUILD_BATCH_SIZE,
+) -> Iterator[dict[str, Any]]:
+    """
+    Parse analysis files on a thread pool, yielding documents in order.
+
+    The next batch is parsed while the caller consumes the current one,
+    and at most two batches are in flight. progress is called with
+    (files_done, files_total) after each batch.
+    """
+    total = len(paths)
+    batches = [paths[i : i + batch_size] for i in range(0, total, batch_size)]
+    done = 0
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = None
+        for i in range(len(batches)):
+            futures = pending or [executor.submit(index_single_file, p) for p in batches[i]]
+            pending = (
+                [executor.submit(index_single_file, p) for p in batches[i + 1]]
+                if i + 1 < len(batches)
+                else None
+            )
+
+            for future in futures:
+                doc = future.result()
+                if doc is not None:
+                    yield doc
+
+            done += len(batches[i])
+            if progress:
+                progress(done, total)
+
+
+def build_index(
+    embeddings,
+    paths: list[Path],
+    progress: Callable[[int, int], None] | None = None,
+) -> tuple[int, int]:
+    """
+    Index analysis files into a fresh embeddings instance.
+
+    Rows are streamed into txtai, which vectorizes them in batches, so the
+    full corpus is never held in memory.
+
+    Returns (documents_indexed, passages_indexed).
+    """
+    counts = {"documents": 0, "passages": 0}
+
+    def rows() -> Iterator[tuple[str, dict[str, Any], None]]:
+        for doc in parse_analysis_files(paths, progress):
+            counts["documents"] += 1
+            for row in document_rows(doc):
+                counts["passages"] += 1
+                yield row
+
+    stream = rows()
+    first = next(stream, None)
+    if first is not None:
+        embeddings.index(itertools.chain([first], stream))
+
+    return counts["documents"], counts["passages"]
+
+
+def rebuild_progress_reporter() -> Callable[[int, int], None]:
+    """
+    Create a progress callback for a rebuild running off the event loop.
+
+    Progress is logged, and also sent as MCP progress notifications when
+    the client supplied a progress token with the request.
+    """
+    session = token = None
+    try:
+        ctx = server.request_context
+        session = ctx.session
+        token = ctx.meta.progressToken if ctx.meta else None
+    except LookupError:
+        pass
+    loop = asyncio.get_running_loop()
+
+    def report(done: int, total: int) -> None:
+        logger.info(f"Rebuild progress: {done}/{total} files parsed")
+        if token is not None:
+            asyncio.run_coroutine_threadsafe(
+                session.send_progress_notification(token, done, total), loop
+            )
+
+    return report
+
+
+def load_shard_metadata(shard: Shard) -> dict[str, Any]:
+    """Load a shard's metadata store (cluster assignments)."""
+    if not shard.metadata_path.exists():
+        return {}
+    try:
+        return json.loads(shard.metadata_path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Failed to read {shard.metadata_path}: {e}")
+        return {}
+
+
+def save_shard_metadata(shard: Shard, metadata: dict[str, Any]) -> None:
+    """Atomically write a shard's metadata store."""
+    shard.metadata_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = shard.metadata_path.with_suffix(".tmp")
+    temp_path.write_text(json.dumps(metadata, indent=2), encoding="utf-8")
+    temp_path.replace(shard.metadata_path)
+
+
+def ann_vectors(embeddings, indexids: list[int]):
+    """
+    Read stored vectors back out of the txtai ANN backend by index id.
+
+    Supports the faiss (flat IDMap and IVF), hnswlib and numpy backends.
+    Nothing is re-embedded.
+    """
+    import numpy as np
+
+    backend = embeddings.ann.backend
+
+    # hnswlib
+    if hasattr(backend, "get_items"):
+        return np.asarray(backend.get_items(indexids), dtype=np.float32)
+
+    # faiss
+    if hasattr(backend, "reconstruct"):
+        import faiss
+
+        if hasattr(backend, "id_map"):
+            # IDMap only stores positions in its inner index
+            ids = faiss.vector_to_array(backend.id_map)
+            order = np.argsort(ids)
+            positions = order[np.searchsorted(ids, indexids, sorter=order)]
+            inner = faiss.downcast_index(backend.index)
+            return np.asarray(
+                [inner.reconstruct(int(pos)) for pos in positions], dtype=np.float32
+            )
+
+        # IVF needs a direct map to reconstruct by id; built once, then kept
+        # up to date by faiss on every add and remove
+        ivf = faiss.extract_index_ivf(backend)
+        if ivf.direct_map.type != faiss.DirectMap.Hashtable:
+            ivf.set_direct_map_type(faiss.DirectMap.Hashtable)
+        return np.asarray([backend.reconstruct(i) for i in indexids], dtype=np.float32)
+
+    # numpy / torch
+    return np.asarray(backend[indexids], dtype=np.float32)
+
+
+def document_vectors(embeddings, doc_ids: list[str] | None = None) -> dict[str, Any]:
+    """
+    Get one vector per document from the stored passage vectors.
+
+    A document's vector is the L2-normalized mean of its passage vectors.
+    Covers every indexed document when doc_ids is None.
+    """
+    import numpy as np
+
+    if doc_ids is None:
+        rows = embeddings.search(
+            "select id, parent from txtai", limit=max(embeddings.count(), 1)
+        )
+        parents = {row["id"]: row.get("parent") or row["id"] for row in rows}
+    else:
+        parents = {
+            chunk_id: doc_id
+            for doc_id in doc_ids
+            for chunk_id in document_chunk_ids(embeddings, doc_id)
+        }
+
+    # (indexid, id) pairs for every row that exists in the index
+    pairs = embeddings.database.ids(list(parents))
+    if not pairs:
+        return {}
+
+    vectors = ann_vectors(embeddings, [indexid for indexid, _ in pairs])
+
+    sums: dict[str, Any] = {}
+    for (_, uid), vector in zip(pairs, vectors):
+        parent = parents[uid]
+        sums[parent] = sums[parent] + vector if parent in sums else vector.copy()
+
+    return {
+        doc_id: vector / (np.linalg.norm(vector) or 1.0)
+        for doc_id, vector in sums.items()
+    }
+
+
+def mmr_rerank(
+    results: list[dict[str, Any]],
+    vectors: dict[str, Any],
+    limit: int,
+    diversity: float,
+) -> list[dict[str, Any]]:
+    """
+    Reorder results with maximal marginal relevance.
+
+    Each pick maximizes (1 - diversity) * relevance - diversity * (highest
+    similarity to an already picked result). Results without a stored
+    vector are scored on relevance alone.
+    """
+    import numpy as np
+
+    remaining = list(results)
+    selected: list[dict[str, Any]] = []
+
+    while remaining and len(selected) < limit:
+        best, best_score = None, None
+        for result in remaining:
+            redundancy = 0.0
+            vector = vectors.get(result["id"])
+            if vector is not None:
+                for picked in selected:
+                    other = vectors.get(picked["id"])
+                    if other is not None:
+                        redundancy = max(redundancy, float(np.dot(vector, other)))
+
+            score = (1 - diversity) * result["score"] - diversity * redundancy
+            if best_score is None or score > best_score:
+                best, best_score = result, score
+
+        selected.append(best)
+        remaining.remove(best)
+
+    return selected
+
+
+def cluster_vectors(
+    vectors: dict[str, Any],
+    threshold: float = CLUSTER_THRESHOLD,
+    block_size: int = 1024,
+) -> list[list[str]]:
+    """
+    Group documents whose vectors are at least threshold-similar.
+
+    Single-link clustering: documents are connected when their cosine
+    similarity reaches the threshold, and clusters are the connected
+    components. Similarities are computed in blocks to bound memory.
+    Returns clusters of two or more documents, largest first.
+    """
+    import numpy as np
+
+    ids = sorted(vectors)
+    if len(ids) < 2:
+        return []
+    matrix = np.stack([vectors[doc_id] for doc_id in ids])
+
+    parent = list(range(len(ids)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for start in range(0, len(ids), block_size):
+        block = matrix[start : start + block_size] @ matrix.T
+        rows, cols = np.nonzero(block >= threshold)
+        for row, col in zip(rows, cols):
+            i, j = start + int(row), int(col)
+            if i < j:
+                parent[find(i)] = find(j)
+
+    groups: dict[int, list[str]] = {}
+    for i, doc_id in enumerate(ids):
+        groups.setdefault(find(i), []).append(doc_id)
+
+    clusters = [members for members in groups.values() if len(members) > 1]
+    clusters.sort(key=lambda members: (-len(members), members[0]))
+    return clusters
+
+
+def cluster_shard(shard: Shard, threshold: float = CLUSTER_THRESHOLD) -> list[list[str]]:
+    """
+    Cluster a shard's documents and record cluster ids in its metadata store.
+
+    Cluster ids are "c1", "c2", ... in descending order of cluster size.
+    """
+    with shard_lock(shard):
+        embeddings = get_embeddings(shard)
+        vectors = document_vectors(embeddings) if embeddings.count() else {}
+
+    clusters = cluster_vectors(vectors, threshold)
+
+    metadata = load_shard_metadata(shard)
+    metadata["clusters"] = {
+        doc_id: f"c{number}"
+        for number, members in enumerate(clusters, 1)
+        for doc_id in members
+    }
+    metadata["clusterThreshold"] = threshold
+    metadata["clustered"] = datetime.now().isoformat()
+    save_shard_metadata(shard, metadata)
+
+    return clusters
+
+
 # Create MCP server
 server = Server("deep-analysis")
 
@@ -216,15 +1551,97 @@ async def list_tools() -> list[types.Tool]:
                         "description": "Optional absolute path to project root. "
                         "If provided, also searches project's docs/analysis/",
                     },
+                    "scope": {
+                        "type": "string",
+                        "enum": ["global", "project", "all"],
+                        "description": "Optional shard selection: only the global "
+                        "shard, only the project shard, or every registered project. "
+                        "Default: global plus project_path's shard",
+                    },
                     "limit": {
                         "type": "integer",
                         "description": "Maximum results to return (default 5)",
                         "default": 5,
                     },
+                    "aggregate": {
+                        "type": "string",
+                        "enum": ["max", "sum"],
+                        "description": "How passage scores combine into a document "
+                        "score: best passage (max) or all matching passages (sum)",
+                        "default": "max",
+                    },
+                    "diversity": {
+                        "type": "number",
+                        "description": "MMR diversification from 0 (pure relevance) "
+                        "to 1 (maximally different results). Default 0",
+                        "minimum": 0,
+                        "maximum": 1,
+                        "default": 0,
+                    },
                 },
                 "required": ["query"],
             },
         ),
+        types.Tool(
+            name="find_similar_analyses",
+            description="Find analyses similar to an indexed analysis, "
+            "flagging near-duplicates",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "path": {
+                        "type": "string",
+                        "description": "Absolute path to an indexed analysis",
+                    },
+                    "project_path": {
+                        "type": "string",
+                        "description": "Optional absolute path to project root. "
+                        "If provided, also compares against project's docs/analysis/",
+                    },
+                    "scope": {
+                        "type": "string",
+                        "enum": ["global", "project", "all"],
+                        "description": "Optional shard selection (same as search_analyses)",
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum results to return (default 5)",
+                        "default": 5,
+                    },
+                },
+                "required": ["path"],
+            },
+        ),
+        types.Tool(
+            name="cluster_analyses",
+            description="Group analyses by vector similarity and store cluster ids",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "project_path": {
+                        "type": "string",
+                        "description": "Optional project path. If provided, clusters "
+                        "that project's shard instead of the global shard",
+                    },
+                    "all": {
+                        "type": "boolean",
+                        "description": "Cluster every shard",
+                        "default": False,
+                    },
+                    "threshold": {
+                        "type": "number",
+                        "description": "Minimum cosine similarity linking two "
+                        f"analyses (default {CLUSTER_THRESHOLD})",
+                        "default": CLUSTER_THRESHOLD,
+                    },
+                },
+            },
+        ),
+        types.Tool(
+            name="cache_stats",
+            description="Show query-embedding, search-result and frontmatter cache hit rates",
+            inputSchema={"type": "object", "properties": {}},
+        ),
         types.Tool(
             name="index_analysis",
             description="Add or update an analysis document in the index",
@@ -259,13 +1676,20 @@ async def list_tools() -> list[types.Tool]:
         ),
         types.Tool(
             name="rebuild_index",
-            description="Rebuild the entire index by scanning all analysis directories",
+            description="Rebuild an index shard by rescanning its analysis directory",
             inputSchema={
                 "type": "object",
                 "properties": {
                     "project_path": {
                         "type": "string",
-                        "description": "Optional project path to include in rebuild",
+                        "description": "Optional project path. If provided, rebuilds "
+                        "that project's shard instead of the global shard",
+                    },
+                    "all": {
+                        "type": "boolean",
+                        "description": "Rebuild the global shard and every registered "
+                        "project shard",
+                        "default": False,
                     },
                 },
             },
@@ -299,8 +1723,29 @@ async def call_tool(name: str, arguments: dict) -> list[types.TextContent]:
             query=arguments["query"],
             project_path=arguments.get("project_path"),
             limit=arguments.get("limit", 5),
+            aggregate=arguments.get("aggregate", "max"),
+            scope=arguments.get("scope"),
+            diversity=arguments.get("diversity", 0.0),
         )
 
+    elif name == "find_similar_analyses":
+        return await handle_find_similar_analyses(
+            path=arguments["path"],
+            project_path=arguments.get("project_path"),
+            limit=arguments.get("limit", 5),
+            scope=arguments.get("scope"),
+        )
+
+    elif name == "cluster_analyses":
+        return await handle_cluster_analyses(
+            project_path=arguments.get("project_path"),
+            all_shards=arguments.get("all", False),
+            threshold=arguments.get("threshold", CLUSTER_THRESHOLD),
+        )
+
+    elif name == "cache_stats":
+        return await handle_cache_stats()
+
     elif name == "index_analysis":
         return await handle_index_analysis(
             path=arguments["path"],
@@ -313,6 +1758,7 @@ async def call_tool(name: str, arguments: dict) -> list[types.TextContent]:
     elif name == "rebuild_index":
         return await handle_rebuild_index(
             project_path=arguments.get("project_path"),
+            all_shards=arguments.get("all", False),
         )
 
     elif name == "list_analyses":
@@ -325,17 +1771,164 @@ async def call_tool(name: str, arguments: dict) -> list[types.TextContent]:
         return [types.TextContent(type="text", text=f"Unknown tool: {name}")]
 
 
+def search_shard(
+    shard: Shard,
+    query: str,
+    limit: int,
+    aggregate: str = "max",
+) -> tuple[int, list[dict[str, Any]]]:
+    """
+    Search one shard and aggregate its passage hits into documents.
+
+    Each document is tagged with the shard it came from.
+
+    Returns (indexed_row_count, top_documents).
+    """
+    with shard_lock(shard):
+        embeddings = get_embeddings(shard)
+
+        count = embeddings.count()
+        if count == 0:
+            return 0, []
+
+        # Search passages, then fold them back into documents
+        hits = embeddings.search(
+            SEARCH_QUERY,
+            limit=limit * CHUNK_OVERSAMPLE,
+            parameters={"query": query},
+        )
+
+    results = aggregate_chunk_hits(hits, aggregate)[:limit]
+    for result in results:
+        result["shard"] = shard
+    return count, results
+
+
+def shard_document_vectors(shard: Shard, doc_ids: list[str] | None = None) -> dict[str, Any]:
+    """Get stored document vectors from one shard (all documents if doc_ids is None)."""
+    with shard_lock(shard):
+        embeddings = get_embeddings(shard)
+        if embeddings.count() == 0:
+            return {}
+        return document_vectors(embeddings, doc_ids)
+
+
+def nearest_documents(embeddings, vector, limit: int) -> dict[str, dict[str, Any]]:
+    """
+    Search the ANN index for the passages nearest to vector.
+
+    Returns the rows of those passages keyed by parent document id, so
+    only documents near vector need their stored vectors read.
+    """
+    import numpy as np
+
+    hits = embeddings.ann.search(np.asarray([vector], dtype=np.float32), limit)[0]
+    indexids = sorted({int(indexid) for indexid, _ in hits if indexid >= 0})
+    if not indexids:
+        return {}
+
+    rows = embeddings.search(
+        "select id, parent, problem, date, decision from txtai "
+        f"where indexid in ({', '.join(map(str, indexids))})",
+        limit=len(indexids),
+    )
+    return {row.get("parent") or row["id"]: row for row in rows}
+
+
+def similar_in_shard(
+    shard: Shard,
+    vector,
+    limit: int,
+    exclude: str,
+) -> list[dict[str, Any]]:
+    """
+    Find the documents in a shard closest to vector, excluding one id.
+
+    Candidates come from an ANN search for passages near vector and are
+    ranked by the similarity of their document vectors, so only their
+    stored vectors are read.
+    """
+    import numpy as np
+
+    with shard_lock(shard):
+        embeddings = get_embeddings(shard)
+        count = embeddings.count()
+        if count == 0:
+            return []
+
+        # The excluded document's own passages are usually the nearest hits
+        excluded = len(document_chunk_ids(embeddings, exclude))
+        candidates = nearest_documents(
+            embeddings, vector, min(count, limit * CHUNK_OVERSAMPLE + excluded)
+        )
+        candidates.pop(exclude, None)
+        vectors = document_vectors(embeddings, list(candidates)) if candidates else {}
+
+    if not vectors:
+        return []
+
+    ids = list(vectors)
+    scores = np.stack([vectors[doc_id] for doc_id in ids]) @ vector
+    top = np.argsort(-scores)[:limit]
+
+    clusters = load_shard_metadata(shard).get("clusters", {})
+    results = []
+    for i in top:
+        doc_id = ids[int(i)]
+        row = candidates[doc_id]
+        results.append(
+            {
+                "id": doc_id,
+                "score": float(scores[int(i)]),
+                "problem": row.get("problem") or Path(doc_id).stem,
+                "date": row.get("date") or "",
+                "decision": row.get("decision") or "",
+                "cluster": clusters.get(doc_id),
+            }
+        )
+    return results
+
+
 async def handle_search_analyses(
     query: str,
     project_path: str | None = None,
     limit: int = 5,
+    aggregate: str = "max",
+    scope: str | None = None,
+    diversity: float = 0.0,
 ) -> list[types.TextContent]:
     """Semantic search over indexed analyses."""
     try:
-        embeddings = get_embeddings()
+        if not 0.0 <= diversity <= 1.0:
+            raise ValueError(f"diversity must be between 0 and 1, got {diversity}")
+
+        register_project(project_path)
+        shards = select_shards(project_path, scope)
+
+        cache_key = (
+            query,
+            limit,
+            aggregate,
+            diversity,
+            shard_generations(shards),
+        )
+        cached = _search_results.get(cache_key)
+        if cached is not None:
+            return [types.TextContent(type="text", text=cached)]
+
+        # MMR reranks a larger candidate pool down to limit
+        candidates = limit * MMR_OVERSAMPLE if diversity else limit
+
+        # Fan out to the selected shards concurrently, then merge the top-k
+        shard_results = await asyncio.gather(
+            *(
+                asyncio.to_thread(search_shard, shard, query, candidates, aggregate)
+                for shard in shards
+            )
+        )
 
         # Check if index has any documents
-        if embeddings.count() == 0:
+        if sum(count for count, _ in shard_results) == 0:
             return [
                 types.TextContent(
                     type="text",
@@ -343,51 +1936,184 @@ async def handle_search_analyses(
                 )
             ]
 
-        # Perform search
-        results = embeddings.search(query, limit=limit)
+        results = sorted(
+            (result for _, results in shard_results for result in results),
+            key=lambda r: r["score"],
+            reverse=True,
+        )[:candidates]
+
+        if diversity and results:
+            # Stored vectors of the candidates, read per owning shard
+            by_shard: dict[Shard, list[str]] = {}
+            for result in results:
+                by_shard.setdefault(result["shard"], []).append(result["id"])
+            vectors: dict[str, Any] = {}
+            for shard_vectors in await asyncio.gather(
+                *(
+                    asyncio.to_thread(shard_document_vectors, shard, doc_ids)
+                    for shard, doc_ids in by_shard.items()
+                )
+            ):
+                vectors.update(shard_vectors)
+            results = mmr_rerank(results, vectors, limit, diversity)
+        else:
+            results = results[:limit]
 
         if not results:
+            text = f"No analyses found matching: {query}"
+            _search_results.put(cache_key, text)
+            return [types.TextContent(type="text", text=text)]
+
+        # Format results
+        output_lines = [f"Found {len(results)} matching analyses:\n"]
+
+        for i, result in enumerate(results, 1):
+            output_lines.append(
+                f"{i}. **{result['problem']}** (score: {result['score']:.3f})"
+            )
+            output_lines.append(f"   Path: {result['id']}")
+            if result["date"]:
+                output_lines.append(f"   Date: {result['date']}")
+            if result["decision"]:
+                output_lines.append(f"   Decision: {result['decision']}")
+            if result["status"]:
+                output_lines.append(f"   Status: {result['status']}")
+            if result["snippet"]:
+                section = f" ({result['section']})" if result["section"] else ""
+                output_lines.append(f"   Passage{section}: {result['snippet']}")
+            output_lines.append("")
+
+        text = "\n".join(output_lines)
+        _search_results.put(cache_key, text)
+        return [types.TextContent(type="text", text=text)]
+
+    except Exception as e:
+        logger.error(f"Search failed: {e}")
+        return [types.TextContent(type="text", text=f"Search failed: {e}")]
+
+
+async def handle_find_similar_analyses(
+    path: str,
+    project_path: str | None = None,
+    limit: int = 5,
+    scope: str | None = None,
+) -> list[types.TextContent]:
+    """Find analyses whose stored vectors are closest to an indexed analysis."""
+    try:
+        resolved = validate_path(path, project_path)
+        register_project(project_path)
+
+        source = shard_for_path(resolved) or global_shard()
+        doc_id = str(resolved)
+        target = await asyncio.to_thread(shard_document_vectors, source, [doc_id])
+        if doc_id not in target:
             return [
                 types.TextContent(
                     type="text",
-                    text=f"No analyses found matching: {query}",
+                    text=f"Not indexed: {doc_id}. Use index_analysis first.",
                 )
             ]
 
-        # Format results
-        output_lines = [f"Found {len(results)} matching analyses:\n"]
+        shards = select_shards(project_path, scope)
+        shard_results = await asyncio.gather(
+            *(
+                asyncio.to_thread(similar_in_shard, shard, target[doc_id], limit, doc_id)
+                for shard in shards
+            )
+        )
+        results = sorted(
+            (result for results in shard_results for result in results),
+            key=lambda r: r["score"],
+            reverse=True,
+        )[:limit]
 
+        if not results:
+            return [
+                types.TextContent(type="text", text=f"No other analyses to compare with {doc_id}")
+            ]
+
+        output_lines = [f"Analyses most similar to {resolved.name}:\n"]
         for i, result in enumerate(results, 1):
-            # txtai returns (id, score) or dict depending on content setting
-            if isinstance(result, dict):
-                doc_id = result.get("id", "unknown")
-                score = result.get("score", 0)
-                problem = result.get("problem", "unknown")
-                date = result.get("date", "unknown")
-                decision = result.get("decision", "")
-                status = result.get("status", "unknown")
-            else:
-                doc_id, score = result[0], result[1]
-                problem = Path(doc_id).stem if doc_id else "unknown"
-                date = ""
-                decision = ""
-                status = ""
-
-            output_lines.append(f"{i}. **{problem}** (score: {score:.3f})")
-            output_lines.append(f"   Path: {doc_id}")
-            if date:
-                output_lines.append(f"   Date: {date}")
-            if decision:
-                output_lines.append(f"   Decision: {decision}")
-            if status:
-                output_lines.append(f"   Status: {status}")
+            duplicate = " [near-duplicate]" if result["score"] >= DUPLICATE_THRESHOLD else ""
+            output_lines.append(
+                f"{i}. **{result['problem']}** (similarity: {result['score']:.3f}){duplicate}"
+            )
+            output_lines.append(f"   Path: {result['id']}")
+            if result["date"]:
+                output_lines.append(f"   Date: {result['date']}")
+            if result["decision"]:
+                output_lines.append(f"   Decision: {result['decision']}")
+            if result["cluster"]:
+                output_lines.append(f"   Cluster: {result['cluster']}")
+            output_lines.append("")
+
+        return [types.TextContent(type="text", text="\n".join(output_lines))]
+
+    except ValueError as e:
+        return [types.TextContent(type="text", text=str(e))]
+    except Exception as e:
+        logger.error(f"Similarity search failed: {e}")
+        return [types.TextContent(type="text", text=f"Similarity search failed: {e}")]
+
+
+async def handle_cluster_analyses(
+    project_path: str | None = None,
+    all_shards: bool = False,
+    threshold: float = CLUSTER_THRESHOLD,
+) -> list[types.TextContent]:
+    """Cluster analyses by stored vector similarity and record cluster ids."""
+    try:
+        register_project(project_path)
+
+        if all_shards:
+            shards = known_shards()
+        elif project_path:
+            shards = [project_shard(project_path)]
+        else:
+            shards = [global_shard()]
+
+        output_lines = []
+        for shard in shards:
+            clusters = await asyncio.to_thread(cluster_shard, shard, threshold)
+            output_lines.append(
+                f"Shard {shard.name}: {len(clusters)} clusters "
+                f"(similarity >= {threshold:.2f})"
+            )
+            for number, members in enumerate(clusters, 1):
+                output_lines.append(f"- c{number} ({len(members)} analyses)")
+                for doc_id in members:
+                    output_lines.append(f"  - {doc_id}")
             output_lines.append("")
 
         return [types.TextContent(type="text", text="\n".join(output_lines))]
 
     except Exception as e:
-        logger.error(f"Search failed: {e}")
-        return [types.TextContent(type="text", text=f"Search failed: {e}")]
+        logger.error(f"Clustering failed: {e}")
+        return [types.TextContent(type="text", text=f"Clustering failed: {e}")]
+
+
+async def handle_cache_stats() -> list[types.TextContent]:
+    """Report cache sizes and hit rates."""
+    output_lines = []
+    for label, cache in (
+        ("Query embeddings", _query_vectors),
+        ("Search results", _search_results),
+        ("Frontmatter", _frontmatter_cache),
+    ):
+        stats = cache.stats()
+        output_lines.append(
+            f"{label}: {stats['hits']} hits, {stats['misses']} misses "
+            f"(hit rate {stats['hit_rate']:.1%}), "
+            f"{stats['size']}/{stats['maxsize']} entries"
+        )
+
+    generations = shard_generations(known_shards())
+    output_lines.append("")
+    output_lines.append("Index generations:")
+    for name, generation in generations:
+        output_lines.append(f"- {name}: {generation}")
+
+    return [types.TextContent(type="text", text="\n".join(output_lines))]
 
 
 async def handle_index_analysis(
@@ -397,9 +2123,9 @@ async def handle_index_analysis(
     """Index a single analysis file."""
     try:
         validated_path = validate_path(path, project_path)
-        embeddings = get_embeddings()
+        await asyncio.to_thread(register_project, project_path)
 
-        doc = index_single_file(validated_path)
+        doc = await asyncio.to_thread(index_analysis, validated_path)
         if doc is None:
             return [
                 types.TextContent(
@@ -408,10 +2134,6 @@ async def handle_index_analysis(
                 )
             ]
 
-        # Upsert the document
-        embeddings.upsert([(doc["id"], doc["text"], None)])
-        save_index()
-
         return [
             types.TextContent(
                 type="text",
@@ -426,15 +2148,40 @@ async def handle_index_analysis(
         return [types.TextContent(type="text", text=f"Index failed: {e}")]
 
 
+def index_analysis(path: Path) -> dict[str, Any] | None:
+    """
+    Index one analysis file into its shard and save the shard.
+
+    Returns the document dict, or None if the file was skipped. Blocks
+    on the shard lock, so run it off the event loop.
+    """
+    doc = index_single_file(path)
+    if doc is None:
+        return None
+
+    # Replace any previously indexed chunks of this document
+    shard = shard_for_path(path) or global_shard()
+    with shard_lock(shard):
+        note_change(shard, path, "upsert")
+        upsert_document(writable_embeddings(shard), doc)
+        save_index(shard)
+    return doc
+
+
+def remove_analysis(path: Path) -> None:
+    """Delete every chunk of an analysis from its shard and save the shard."""
+    shard = shard_for_path(path) or global_shard()
+    with shard_lock(shard):
+        note_change(shard, path, "delete")
+        remove_document(writable_embeddings(shard), str(path))
+        save_index(shard)
+
+
 async def handle_remove_analysis(path: str) -> list[types.TextContent]:
     """Remove an analysis from the index."""
     try:
-        embeddings = get_embeddings()
         resolved = Path(path).resolve()
-
-        # Delete from index
-        embeddings.delete([str(resolved)])
-        save_index()
+        await asyncio.to_thread(remove_analysis, resolved)
 
         return [
             types.TextContent(
@@ -450,54 +2197,109 @@ async def handle_remove_analysis(path: str) -> list[types.TextContent]:
 
 async def handle_rebuild_index(
     project_path: str | None = None,
+    all_shards: bool = False,
 ) -> list[types.TextContent]:
-    """Rebuild the entire index."""
+    """Rebuild the global shard, a project shard, or every shard."""
     try:
-        from txtai import Embeddings
-
-        global _embeddings
-
-        # Create fresh embeddings
-        INDEX_DIR.mkdir(parents=True, exist_ok=True)
-        _embeddings = Embeddings(
-            path="sentence-transformers/all-MiniLM-L6-v2",
-            content=True,
-        )
-
-        # Scan all directories
-        dirs = get_analysis_dirs(project_path)
-        documents = []
-        scanned = 0
-        indexed = 0
+        register_project(project_path)
+        progress = rebuild_progress_reporter()
+
+        if all_shards:
+            shards = known_shards()
+        elif project_path:
+            shards = [project_shard(project_path)]
+        else:
+            shards = [global_shard()]
+
+        output_lines = []
+        for shard in shards:
+            started = time.monotonic()
+            scanned, indexed, passages = await asyncio.to_thread(
+                rebuild_index, shard, progress
+            )
+            elapsed = time.monotonic() - started
+            output_lines.append(
+                f"Rebuilt shard {shard.name}: scanned {scanned} files, "
+                f"indexed {indexed} analyses ({passages} passages) in {elapsed:.1f}s"
+            )
 
-        for dir_path in dirs:
-            if not dir_path.exists():
-                dir_path.mkdir(parents=True, exist_ok=True)
-                continue
+        return [types.TextContent(type="text", text="\n".join(output_lines))]
 
-            for md_file in dir_path.glob("**/*.md"):
-                scanned += 1
-                doc = index_single_file(md_file)
-                if doc:
-                    documents.append((doc["id"], doc["text"], None))
-                    indexed += 1
+    except Exception as e:
+        logger.error(f"Rebuild failed: {e}")
+        return [types.TextContent(type="text", text=f"Rebuild failed: {e}")]
 
-        # Index all documents
-        if documents:
-            _embeddings.index(documents)
 
-        save_index()
+def rebuild_index(
+    shard: Shard,
+    progress: Callable[[int, int], None] | None = None,
+) -> tuple[int, int, int]:
+    """
+    Replace a shard's index with a fresh scan of its analysis directory.
 
-        return [
-            types.TextContent(
-                type="text",
-                text=f"Rebuilt index: scanned {scanned} files, indexed {indexed} analyses",
-            )
-        ]
+    The new index is built, saved to a new directory and loaded from it
+    without the shard lock, so searches and updates keep using the old
+    index in the meantime. Changes made to the shard during the build are
+    recorded; under the lock they are replayed onto the new index, and
+    the shard's pointer file and live embeddings are switched to it. The
+    old index directory is deleted afterwards.
 
-    except Exception as e:
-        logger.error(f"Rebuild failed: {e}")
-        return [types.TextContent(type="text", text=f"Rebuild failed: {e}")]
+    Returns (files_scanned, documents_indexed, passages_indexed).
+    """
+    with rebuild_lock(shard):
+        # Start recording before the scan, so no change can slip between
+        # the scan and the swap
+        with shard_lock(shard):
+            _rebuild_changes[shard.name] = {}
+            old_path = shard.index_path
+
+        build_path = SHARDS_DIR / f"{shard.name}.{time.time_ns()}"
+        swapped = False
+        try:
+            remove_stale_indexes(shard, keep=old_path)
+
+            embeddings = create_embeddings()
+            paths = find_analysis_files([shard.analysis_dir])
+            indexed, passages = build_index(embeddings, paths, progress)
+
+            build_path.parent.mkdir(parents=True, exist_ok=True)
+            embeddings.save(str(build_path))
+            # txtai keeps writing to the directory it first saved to, so the
+            # swapped-in index is a fresh load, bound to build_path for good
+            embeddings.close()
+            rebuilt = load_embeddings(shard, build_path)
+
+            with shard_lock(shard):
+                changes = pending_changes(rebuilt, _rebuild_changes.pop(shard.name))
+                if changes:
+                    if memory_mapped(rebuilt):
+                        rebuilt = reopen_unmapped(rebuilt, build_path)
+                    if apply_shard_changes(rebuilt, changes):
+                        rebuilt.save(str(build_path))
+                set_embeddings(shard, rebuilt, build_path)
+                swapped = True
+                logger.info(f"Swapped in rebuilt index at {build_path}")
+        finally:
+            with shard_lock(shard):
+                _rebuild_changes.pop(shard.name, None)
+            remove_path(old_path if swapped else build_path)
+
+    return len(paths), indexed, passages
+
+
+def remove_stale_indexes(shard: Shard, keep: Path) -> None:
+    """Delete index directories of a shard left behind by interrupted rebuilds."""
+    for path in SHARDS_DIR.glob(f"{shard.name}.*"):
+        if path.is_dir() and path != keep:
+            remove_path(path)
+
+
+def remove_path(path: Path) -> None:
+    """Delete a file or directory tree if it exists."""
+    if path.is_dir():
+        shutil.rmtree(path)
+    elif path.exists():
+        path.unlink()
 
 
 async def handle_list_analyses(
@@ -517,8 +2319,7 @@ async def handle_list_analyses(
 
             for md_file in dir_path.glob("**/*.md"):
                 try:
-                    content = md_file.read_text(encoding="utf-8")
-                    frontmatter, _ = parse_frontmatter(content)
+                    frontmatter = read_frontmatter(md_file)
 
                     doc_date = frontmatter.get("date", "")
                     if isinstance(doc_date, datetime):
@@ -587,12 +2388,21 @@ async def handle_list_analyses(
 
 async def main():
     """Run the MCP server."""
-    async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            server.create_initialization_options(),
-        )
+    watcher = None
+    if WATCH_MODE not in ("", "0", "false", "off"):
+        watcher = IndexWatcher(use_watchdog=WATCH_MODE != "poll")
+        watcher.start()
+
+    try:
+        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+            await server.run(
+                read_stream,
+                write_stream,
+                server.create_initialization_options(),
+            )
+    finally:
+        if watcher is not None:
+            watcher.stop()
 
 
 if __name__ == "__main__":
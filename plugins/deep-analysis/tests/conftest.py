@@ -0,0 +1,55 @@
+"""Pytest configuration for deep-analysis tests."""
+
+import re
+import sys
+import zlib
+from pathlib import Path
+
+import pytest
+
+# Add the MCP server directory to path for imports
+server_dir = Path(__file__).parent.parent / "mcp"
+sys.path.insert(0, str(server_dir))
+
+import server  # noqa: E402
+
+
+def word_vectors(texts):
+    """Embed texts as normalized bag-of-words hashes, so tests need no model."""
+    import numpy as np
+
+    vectors = np.zeros((len(texts), 64), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for word in re.findall(r"\w+", text.lower()):
+            vectors[row, zlib.crc32(word.encode("utf-8")) % 64] += 1
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+@pytest.fixture
+def index_dir(tmp_path, monkeypatch):
+    """Point shards and analyses at temporary directories."""
+    monkeypatch.setattr(server, "SHARDS_DIR", tmp_path / "shards")
+    monkeypatch.setattr(server, "GLOBAL_ANALYSES_DIR", tmp_path / "analyses")
+    monkeypatch.setattr(server, "PROJECTS_FILE", tmp_path / "projects.json")
+    monkeypatch.setattr(server, "_shards", {})
+    monkeypatch.setattr(server, "_generations", {})
+    return tmp_path
+
+
+@pytest.fixture
+def word_embeddings(index_dir, monkeypatch):
+    """Build real txtai indexes that embed with word_vectors instead of the model."""
+    pytest.importorskip("txtai")
+    pytest.importorskip("faiss")
+
+    # txtai stores the transform by name and resolves it again on load
+    monkeypatch.setenv("ALLOW_RESOLVE_TRANSFORM", "True")
+    config = server.embeddings_config
+
+    def external_config():
+        settings = {key: value for key, value in config().items() if key != "path"}
+        return {**settings, "method": "external", "transform": "conftest.word_vectors"}
+
+    monkeypatch.setattr(server, "embeddings_config", external_config)
+    return index_dir
@@ -0,0 +1,60 @@
+"""Tests for the LRU cache."""
+
+import pytest
+
+from server import LRUCache
+
+
+def test_get_and_put():
+    """Cached values are returned; misses return None."""
+    cache = LRUCache(2)
+    cache.put("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+
+
+def test_evicts_least_recently_used():
+    """A get refreshes an entry, so the untouched one is evicted."""
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_put_replaces_and_refreshes():
+    """Putting an existing key updates it without growing the cache."""
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.put("a", 10)
+    cache.put("c", 3)
+
+    assert cache.get("a") == 10
+    assert cache.get("b") is None
+    assert cache.stats()["size"] == 2
+
+
+def test_stats_count_hits_and_misses():
+    """Hit rate covers every lookup and survives clear()."""
+    cache = LRUCache(4)
+    cache.put("a", 1)
+    cache.get("a")
+    cache.get("a")
+    cache.get("x")
+    cache.clear()
+
+    stats = cache.stats()
+    assert stats["size"] == 0
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+    assert stats["hit_rate"] == pytest.approx(2 / 3)
+
+
+def test_empty_stats():
+    """A cache that was never read reports a zero hit rate."""
+    assert LRUCache(1).stats()["hit_rate"] == 0.0
@@ -0,0 +1,82 @@
+"""Tests for splitting analyses into passages."""
+
+from server import chunk_markdown, split_long_text
+
+
+def test_split_long_text_packs_paragraphs():
+    """Short paragraphs are packed together up to max_chars."""
+    text = "aaaa\n\nbbbb\n\ncccc"
+
+    assert split_long_text(text, max_chars=10) == ["aaaa\n\nbbbb", "cccc"]
+    assert split_long_text(text, max_chars=100) == ["aaaa\n\nbbbb\n\ncccc"]
+
+
+def test_split_long_text_exact_fit_stays_in_one_piece():
+    """A paragraph of exactly max_chars is not split."""
+    assert split_long_text("x" * 10, max_chars=10) == ["x" * 10]
+    assert split_long_text("aaaa\n\nbbbb", max_chars=10) == ["aaaa\n\nbbbb"]
+
+
+def test_split_long_text_breaks_oversized_paragraph_on_whitespace():
+    """A paragraph longer than max_chars is cut at the last space before max_chars."""
+    pieces = split_long_text("one two three four five six", max_chars=10)
+
+    assert pieces == ["one two", "three", "four five", "six"]
+    assert all(len(piece) <= 10 for piece in pieces)
+
+
+def test_split_long_text_hard_cuts_words_without_spaces():
+    """A single word longer than max_chars is cut at max_chars."""
+    assert split_long_text("x" * 25, max_chars=10) == ["x" * 10, "x" * 10, "x" * 5]
+
+
+def test_split_long_text_flushes_packed_text_before_oversized_paragraph():
+    """Pending short paragraphs are emitted before an oversized one is split."""
+    pieces = split_long_text("short\n\n" + "word " * 5, max_chars=10)
+
+    assert pieces[0] == "short"
+    assert all(len(piece) <= 10 for piece in pieces)
+    assert " ".join(pieces[1:]).split() == ["word"] * 5
+
+
+def test_split_long_text_ignores_blank_paragraphs():
+    """Whitespace-only paragraphs produce no pieces."""
+    assert split_long_text("\n\n   \n\n", max_chars=10) == []
+
+
+def test_chunk_markdown_splits_on_headings():
+    """Each heading starts a new passage tagged with the heading text."""
+    body = "Intro text\n\n## Context\nWhy it matters\n\n### Options ###\nA or B"
+
+    assert chunk_markdown(body) == [
+        ("", "Intro text"),
+        ("Context", "Why it matters"),
+        ("Options", "A or B"),
+    ]
+
+
+def test_chunk_markdown_skips_empty_sections():
+    """Headings with no text under them produce no passages."""
+    assert chunk_markdown("# Title\n\n## Empty\n\n## Filled\ntext") == [("Filled", "text")]
+
+
+def test_chunk_markdown_ignores_headings_in_code_fences():
+    """'#' lines inside fenced code blocks stay in the current section."""
+    body = "## Setup\n```bash\n# install\npip install x\n```\n~~~\n# not a heading\n~~~"
+
+    chunks = chunk_markdown(body)
+
+    assert [section for section, _ in chunks] == ["Setup"]
+    assert "# install" in chunks[0][1]
+    assert "# not a heading" in chunks[0][1]
+
+
+def test_chunk_markdown_splits_oversized_sections():
+    """A section longer than max_chars becomes several passages with the same heading."""
+    body = "## Long\n" + "\n\n".join(f"paragraph {i} " + "x" * 20 for i in range(5))
+
+    chunks = chunk_markdown(body, max_chars=40)
+
+    assert len(chunks) == 5
+    assert all(section == "Long" for section, _ in chunks)
+    assert all(len(passage) <= 40 for _, passage in chunks)
@@ -0,0 +1,126 @@
+"""Tests for frontmatter parsing and caching."""
+
+import os
+
+import server
+from server import (
+    LRUCache,
+    file_signature,
+    parse_frontmatter,
+    read_frontmatter,
+    split_frontmatter,
+)
+
+
+def test_split_frontmatter_returns_yaml_and_body():
+    """The YAML block and the stripped body are returned separately."""
+    content = "---\nproblem: Caching\nstatus: accepted\n---\n\n# Body\n"
+
+    assert split_frontmatter(content) == ("problem: Caching\nstatus: accepted\n", "# Body")
+
+
+def test_split_frontmatter_without_block():
+    """Content without an opening delimiter is all body."""
+    assert split_frontmatter("# Just a body\n") == (None, "# Just a body\n")
+    assert split_frontmatter("----\nnot: yaml\n----\n") == (None, "----\nnot: yaml\n----\n")
+
+
+def test_split_frontmatter_unclosed_block():
+    """An opening delimiter with no closing one is not frontmatter."""
+    content = "---\nproblem: Caching\n"
+
+    assert split_frontmatter(content) == (None, content)
+
+
+def test_split_frontmatter_stops_at_first_closing_delimiter():
+    """'---' later in the body, or inside a value, is not a delimiter."""
+    content = "---\ndecision: use a --- separator\n---  \nBody\n\n---\n\nMore"
+
+    text, body = split_frontmatter(content)
+
+    assert text == "decision: use a --- separator\n"
+    assert body == "Body\n\n---\n\nMore"
+
+
+def test_parse_frontmatter_is_permissive():
+    """Invalid or non-mapping YAML yields an empty dict."""
+    assert parse_frontmatter("---\n: [unclosed\n---\nBody") == ({}, "Body")
+    assert parse_frontmatter("---\n- a list\n---\nBody") == ({}, "Body")
+
+
+def test_read_frontmatter_reads_only_the_block(tmp_path):
+    """Without content, the frontmatter block is read from disk."""
+    path = tmp_path / "analysis.md"
+    path.write_text("---\nproblem: Caching\n---\n\nBody", encoding="utf-8")
+
+    assert read_frontmatter(path) == {"problem": "Caching"}
+    assert read_frontmatter(path, path.read_text(encoding="utf-8")) == {"problem": "Caching"}
+
+
+def test_read_frontmatter_is_cached_while_file_is_unchanged(tmp_path):
+    """Repeated reads of an unchanged file return the cached dict."""
+    path = tmp_path / "analysis.md"
+    path.write_text("---\nproblem: Caching\n---\n", encoding="utf-8")
+
+    assert read_frontmatter(path) is read_frontmatter(path)
+
+
+def test_read_frontmatter_cache_invalidated_by_size_change(tmp_path):
+    """A write that changes the file size is picked up."""
+    path = tmp_path / "analysis.md"
+    path.write_text("---\nproblem: Old\n---\n", encoding="utf-8")
+    assert read_frontmatter(path) == {"problem": "Old"}
+
+    stat = path.stat()
+    path.write_text("---\nproblem: Longer\n---\n", encoding="utf-8")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))  # same mtime, new size
+
+    assert read_frontmatter(path) == {"problem": "Longer"}
+
+
+def test_read_frontmatter_cache_invalidated_by_mtime_change(tmp_path):
+    """A same-size write with a new mtime is picked up."""
+    path = tmp_path / "analysis.md"
+    path.write_text("---\nproblem: AAA\n---\n", encoding="utf-8")
+    assert read_frontmatter(path) == {"problem": "AAA"}
+
+    stat = path.stat()
+    path.write_text("---\nproblem: BBB\n---\n", encoding="utf-8")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert read_frontmatter(path) == {"problem": "BBB"}
+
+
+def test_read_frontmatter_race_does_not_cache_stale_data(tmp_path):
+    """Content read before a write is cached under the pre-write signature."""
+    path = tmp_path / "analysis.md"
+    path.write_text("---\nproblem: Old\n---\n", encoding="utf-8")
+    signature = file_signature(path)
+    content = path.read_text(encoding="utf-8")
+
+    path.write_text("---\nproblem: Newer\n---\n", encoding="utf-8")
+
+    assert read_frontmatter(path, content, signature) == {"problem": "Old"}
+    assert read_frontmatter(path) == {"problem": "Newer"}
+
+
+def test_read_frontmatter_content_without_signature_is_not_cached(tmp_path, monkeypatch):
+    """Content with no signature taken before its read is parsed but not cached."""
+    monkeypatch.setattr(server, "_frontmatter_cache", LRUCache(4))
+    path = tmp_path / "analysis.md"
+    path.write_text("---\nproblem: Caching\n---\n", encoding="utf-8")
+
+    assert read_frontmatter(path, path.read_text(encoding="utf-8")) == {"problem": "Caching"}
+    assert server._frontmatter_cache.stats()["size"] == 0
+
+
+def test_read_frontmatter_cache_is_bounded(tmp_path, monkeypatch):
+    """The least recently read files are evicted once the cache is full."""
+    monkeypatch.setattr(server, "_frontmatter_cache", LRUCache(2))
+    for name in ("a", "b", "c"):
+        path = tmp_path / f"{name}.md"
+        path.write_text(f"---\nproblem: {name}\n---\n", encoding="utf-8")
+        read_frontmatter(path)
+
+    assert server._frontmatter_cache.stats()["size"] == 2
+    assert server._frontmatter_cache.get(tmp_path / "a.md") is None
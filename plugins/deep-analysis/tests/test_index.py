@@ -0,0 +1,136 @@
+"""Tests against real txtai indexes, embedding with word_vectors from conftest."""
+
+import numpy as np
+import pytest
+
+import server
+from conftest import word_vectors
+from server import (
+    ann_vectors,
+    document_vectors,
+    get_embeddings,
+    global_shard,
+    memory_mapped,
+    rebuild_index,
+    remove_document,
+    similar_in_shard,
+    writable_embeddings,
+)
+
+TOPICS = [
+    "cache invalidation strategy for search results",
+    "database migration rollback plan",
+    "retry backoff for flaky network calls",
+    "thread pool sizing under load",
+    "frontmatter parsing of markdown files",
+    "vector quantization memory savings",
+]
+
+
+def write_analysis(directory, name: str, problem: str, body: str) -> None:
+    """Write an analysis file with minimal frontmatter."""
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / f"{name}.md").write_text(
+        f"---\nproblem: {problem}\ndecision: decided\n---\n\n## Context\n{body}\n",
+        encoding="utf-8",
+    )
+
+
+@pytest.fixture(params=["full", "float16", "int8"])
+def storage(request, word_embeddings, monkeypatch):
+    """Build indexes with each DEEP_ANALYSIS_VECTORS mode."""
+    monkeypatch.setattr(server, "VECTOR_STORAGE", request.param)
+    return request.param
+
+
+@pytest.fixture
+def corpus(storage):
+    """A global shard with one analysis per topic plus a near-duplicate of the first."""
+    shard = global_shard()
+    for i, topic in enumerate(TOPICS):
+        write_analysis(shard.analysis_dir, f"a{i}", topic, f"{topic} details")
+    write_analysis(shard.analysis_dir, "copy", TOPICS[0], f"{TOPICS[0]} details again")
+    rebuild_index(shard)
+    return shard
+
+
+def test_ann_vectors_return_stored_passage_vectors(corpus):
+    """Vectors read back by index id match what was embedded, also after deletes."""
+    embeddings = writable_embeddings(corpus)
+    remove_document(embeddings, str(corpus.analysis_dir / "a1.md"))
+
+    rows = embeddings.search("select id, text from txtai", limit=100)
+    pairs = dict((uid, indexid) for indexid, uid in embeddings.database.ids([r["id"] for r in rows]))
+    texts = [row["text"] for row in rows]
+
+    vectors = ann_vectors(embeddings, [pairs[row["id"]] for row in rows])
+
+    assert np.allclose(vectors, word_vectors(texts), atol=1e-2)
+
+
+def test_similar_in_shard_matches_exhaustive_ranking(corpus):
+    """The ANN-driven candidates rank documents the same as comparing every vector."""
+    target = str(corpus.analysis_dir / "a0.md")
+    embeddings = get_embeddings(corpus)
+    every = document_vectors(embeddings)
+    vector = every.pop(target)
+
+    expected = sorted(every, key=lambda doc_id: -float(every[doc_id] @ vector))[:3]
+    results = similar_in_shard(corpus, vector, 3, target)
+
+    assert [r["id"] for r in results] == expected
+    assert results[0]["id"] == str(corpus.analysis_dir / "copy.md")
+    assert results[0]["score"] >= server.DUPLICATE_THRESHOLD
+    assert results[0]["problem"] == TOPICS[0]
+    assert all(r["id"] != target for r in results)
+
+
+def test_similar_in_shard_reads_only_candidate_vectors(corpus, monkeypatch):
+    """Only the nearest documents' vectors are read, not the whole shard."""
+    target = str(corpus.analysis_dir / "a0.md")
+    vector = document_vectors(get_embeddings(corpus), [target])[target]
+    requested = []
+    original = server.document_vectors
+
+    def recording_document_vectors(embeddings, doc_ids=None):
+        requested.append(doc_ids)
+        return original(embeddings, doc_ids)
+
+    monkeypatch.setattr(server, "document_vectors", recording_document_vectors)
+    similar_in_shard(corpus, vector, 1, target)
+
+    assert requested and None not in requested
+    assert target not in requested[0]
+
+
+def test_reloaded_shard_accepts_upserts_and_deletes(corpus, storage):
+    """Build, save and reload a shard, then write to it through the watcher path."""
+    server._shards.clear()  # as after a server restart
+    assert memory_mapped(get_embeddings(corpus)) == (storage != "full")
+
+    write_analysis(corpus.analysis_dir, "new", "brand new topic", "brand new topic details")
+    changes = {corpus.analysis_dir / "new.md": "upsert", corpus.analysis_dir / "a1.md": "delete"}
+    assert server.apply_changes(changes) == 2
+    assert not memory_mapped(get_embeddings(corpus))
+
+    server._shards.clear()
+    embeddings = get_embeddings(corpus)
+    assert memory_mapped(embeddings) == (storage != "full")  # the saved config still maps
+    parents = {row["parent"] for row in embeddings.search("select parent from txtai", limit=100)}
+    assert str(corpus.analysis_dir / "new.md") in parents
+    assert str(corpus.analysis_dir / "a1.md") not in parents
+    assert embeddings.search("brand new topic details", 1)[0]["id"].startswith(
+        str(corpus.analysis_dir / "new.md")
+    )
+
+
+def test_unchanged_files_leave_the_index_mapped(corpus, storage):
+    """A catch-up over unchanged files neither writes nor reloads a mapped index."""
+    server._shards.clear()  # as after a server restart
+    mapped = get_embeddings(corpus)
+
+    changes = {path: "upsert" for path in corpus.analysis_dir.glob("*.md")}
+    assert server.apply_changes(changes) == 0
+
+    assert get_embeddings(corpus) is mapped
+    assert memory_mapped(mapped) == (storage != "full")
@@ -0,0 +1,122 @@
+"""Tests for aggregating, reranking and clustering search results."""
+
+import numpy as np
+import pytest
+
+from server import aggregate_chunk_hits, cluster_vectors, mmr_rerank
+
+
+def unit(*values: float) -> np.ndarray:
+    """Build an L2-normalized float32 vector."""
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+HITS = [
+    {"id": "/a.md#1", "parent": "/a.md", "score": 0.9, "section": "Context", "text": "A: Context\nbest a"},
+    {"id": "/b.md#0", "parent": "/b.md", "score": 0.8, "section": "", "text": "B\nsummary b"},
+    {"id": "/a.md#2", "parent": "/a.md", "score": 0.3, "section": "Risks", "text": "A: Risks\nother a"},
+    {"id": "/b.md#3", "parent": "/b.md", "score": 0.7, "section": "Plan", "text": "B: Plan\nplan b"},
+]
+
+
+def test_aggregate_max_keeps_best_passage():
+    """Max scoring ranks documents by their best passage."""
+    results = aggregate_chunk_hits(HITS, "max")
+
+    assert [(r["id"], r["score"]) for r in results] == [("/a.md", 0.9), ("/b.md", 0.8)]
+    assert results[0]["section"] == "Context"
+    assert results[0]["snippet"] == "best a"
+
+
+def test_aggregate_sum_adds_passage_scores():
+    """Sum scoring rewards documents with several matching passages."""
+    results = aggregate_chunk_hits(HITS, "sum")
+
+    assert [r["id"] for r in results] == ["/b.md", "/a.md"]
+    assert results[0]["score"] == pytest.approx(1.5)
+    assert results[1]["score"] == pytest.approx(1.2)
+    assert results[0]["snippet"] == "summary b"  # snippet still from the best passage
+
+
+def test_aggregate_rows_without_parent():
+    """Rows indexed before chunking are their own document."""
+    results = aggregate_chunk_hits([{"id": "/old.md", "score": 0.5, "text": "Old"}])
+
+    assert results[0]["id"] == "/old.md"
+    assert results[0]["problem"] == "old"
+
+
+def test_aggregate_rejects_unknown_mode():
+    """Only max and sum are supported."""
+    with pytest.raises(ValueError, match="Unknown aggregate mode"):
+        aggregate_chunk_hits(HITS, "mean")
+
+
+def test_mmr_without_diversity_keeps_relevance_order():
+    """diversity=0 is plain relevance ranking."""
+    results = [{"id": "a", "score": 0.9}, {"id": "b", "score": 0.8}, {"id": "c", "score": 0.7}]
+    vectors = {"a": unit(1, 0), "b": unit(1, 0), "c": unit(0, 1)}
+
+    assert [r["id"] for r in mmr_rerank(results, vectors, 3, 0.0)] == ["a", "b", "c"]
+
+
+def test_mmr_demotes_near_duplicates():
+    """A result identical to an earlier pick drops below a different one."""
+    results = [{"id": "a", "score": 0.9}, {"id": "b", "score": 0.85}, {"id": "c", "score": 0.7}]
+    vectors = {"a": unit(1, 0), "b": unit(1, 0.01), "c": unit(0, 1)}
+
+    assert [r["id"] for r in mmr_rerank(results, vectors, 2, 0.5)] == ["a", "c"]
+
+
+def test_mmr_scores_missing_vectors_on_relevance():
+    """Results without a stored vector are never penalised for redundancy."""
+    results = [{"id": "a", "score": 0.9}, {"id": "b", "score": 0.85}, {"id": "c", "score": 0.8}]
+    vectors = {"a": unit(1, 0), "b": unit(1, 0)}
+
+    assert [r["id"] for r in mmr_rerank(results, vectors, 3, 0.5)] == ["a", "c", "b"]
+
+
+def test_mmr_respects_limit():
+    """At most limit results are returned."""
+    results = [{"id": str(i), "score": 1.0 - i / 10} for i in range(5)]
+
+    assert len(mmr_rerank(results, {}, 2, 0.3)) == 2
+    assert mmr_rerank([], {}, 2, 0.3) == []
+
+
+def test_cluster_vectors_groups_similar_documents():
+    """Documents above the threshold are linked; singletons are dropped."""
+    vectors = {
+        "a": unit(1, 0, 0),
+        "b": unit(1, 0.1, 0),
+        "c": unit(0, 1, 0),
+        "d": unit(0, 1, 0.1),
+        "e": unit(0, 1, 0.05),
+        "f": unit(0, 0, 1),
+    }
+
+    assert cluster_vectors(vectors, threshold=0.95) == [["c", "d", "e"], ["a", "b"]]
+
+
+def test_cluster_vectors_is_single_link():
+    """A chain of similar neighbours forms one cluster even if its ends differ."""
+    angles = [0.0, 0.2, 0.4, 0.6]
+    vectors = {f"d{i}": unit(np.cos(a), np.sin(a)) for i, a in enumerate(angles)}
+
+    assert cluster_vectors(vectors, threshold=0.97) == [["d0", "d1", "d2", "d3"]]
+    assert float(np.dot(vectors["d0"], vectors["d3"])) < 0.97
+
+
+def test_cluster_vectors_block_size_does_not_change_result():
+    """Blocked similarity computation matches a single block."""
+    rng = np.random.default_rng(0)
+    vectors = {f"d{i:02d}": unit(*rng.normal(size=4)) for i in range(40)}
+
+    assert cluster_vectors(vectors, 0.8, block_size=3) == cluster_vectors(vectors, 0.8)
+
+
+def test_cluster_vectors_needs_two_documents():
+    """Fewer than two documents cannot form a cluster."""
+    assert cluster_vectors({}) == []
+    assert cluster_vectors({"a": unit(1, 0)}) == []
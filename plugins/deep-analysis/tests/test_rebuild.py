@@ -0,0 +1,182 @@
+"""Tests for rebuilding a shard without blocking the live index."""
+
+import asyncio
+import threading
+from pathlib import Path
+
+import pytest
+
+import server
+from server import global_shard, note_change, rebuild_index, shard_lock
+
+
+class SavedIndex:
+    """Stands in for an index: save() writes a label file that load() reads back."""
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.closed = False
+
+    def save(self, path: str) -> None:
+        Path(path).mkdir(parents=True, exist_ok=True)
+        (Path(path) / "label").write_text(self.label)
+
+    def load(self, path: str) -> None:
+        self.label = (Path(path) / "label").read_text()
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def test_rebuild_builds_without_the_shard_lock(index_dir, monkeypatch):
+    """The shard stays usable during the build and load; changes made meanwhile are replayed."""
+    shard = global_shard()
+    started, release = threading.Event(), threading.Event()
+    replayed = []
+
+    def slow_build(embeddings, paths, progress=None):
+        started.set()
+        assert release.wait(5)
+        return 3, 7
+
+    def record_replay(embeddings, changes):
+        replayed.append((embeddings, dict(changes)))
+        return len(changes)
+
+    lock = shard_lock(shard)
+
+    class UnlockedLoad(SavedIndex):
+        def load(self, path: str) -> None:
+            assert lock.acquire(timeout=1), "rebuild held the shard lock while loading"
+            lock.release()
+            super().load(path)
+
+    built, loaded = SavedIndex("new"), UnlockedLoad()
+    created = iter([built, loaded])
+    monkeypatch.setattr(server, "create_embeddings", lambda: next(created))
+    monkeypatch.setattr(server, "build_index", slow_build)
+    monkeypatch.setattr(server, "pending_changes", lambda embeddings, changes: changes)
+    monkeypatch.setattr(server, "apply_shard_changes", record_replay)
+    old_path = shard.index_path
+    SavedIndex("old").save(str(old_path))
+    old = server._shards[shard.name] = SavedIndex("old")
+
+    results = []
+    thread = threading.Thread(target=lambda: results.append(rebuild_index(shard)))
+    thread.start()
+    assert started.wait(5)
+
+    assert lock.acquire(timeout=1), "rebuild held the shard lock while building"
+    changed = shard.analysis_dir / "changed.md"
+    note_change(shard, changed, "upsert")
+    lock.release()
+
+    release.set()
+    thread.join(5)
+
+    assert results == [(0, 3, 7)]
+    assert replayed == [(loaded, {changed: "upsert"})]
+    assert server._shards[shard.name] is loaded and loaded.label == "new"
+    assert built.closed and old.closed
+    assert shard.index_path != old_path and not old_path.exists()
+    assert (shard.index_path / "label").read_text() == "new"
+    assert server._generations[shard.name] == 1
+
+
+def test_rebuild_removes_directories_of_interrupted_rebuilds(index_dir, monkeypatch):
+    """Only the live index directory survives a rebuild."""
+    shard = global_shard()
+    stale = server.SHARDS_DIR / f"{shard.name}.123"
+    SavedIndex("stale").save(str(stale))
+    monkeypatch.setattr(server, "create_embeddings", SavedIndex)
+    monkeypatch.setattr(server, "build_index", lambda embeddings, paths, progress=None: (0, 0))
+
+    rebuild_index(shard)
+
+    assert not stale.exists()
+    assert [p for p in server.SHARDS_DIR.iterdir() if p.is_dir()] == [shard.index_path]
+
+
+def test_changes_are_only_recorded_during_a_rebuild(index_dir):
+    """note_change is a no-op unless the shard is being rebuilt."""
+    shard = global_shard()
+    note_change(shard, Path("/x.md"), "delete")
+    assert shard.name not in server._rebuild_changes
+
+
+def test_failed_rebuild_keeps_the_old_index(index_dir, monkeypatch):
+    """A build error leaves the old index and no temporary files behind."""
+    shard = global_shard()
+
+    def failing_build(embeddings, paths, progress=None):
+        raise RuntimeError("out of memory")
+
+    monkeypatch.setattr(server, "create_embeddings", lambda: SavedIndex("new"))
+    monkeypatch.setattr(server, "build_index", failing_build)
+    SavedIndex("old").save(str(shard.index_path))
+
+    with pytest.raises(RuntimeError, match="out of memory"):
+        rebuild_index(shard)
+
+    assert (shard.index_path / "label").read_text() == "old"
+    assert [p for p in server.SHARDS_DIR.iterdir() if p.is_dir()] == [shard.index_path]
+    assert shard.name not in server._rebuild_changes
+    assert shard.name not in server._shards
+
+
+def test_rebuilt_index_accepts_updates(word_embeddings):
+    """The swapped-in index is served from its final directory and stays writable."""
+    shard = global_shard()
+    shard.analysis_dir.mkdir(parents=True)
+    for name in ("a", "b"):
+        (shard.analysis_dir / f"{name}.md").write_text(f"---\nproblem: {name}\n---\n\nBody {name}\n")
+    rebuild_index(shard)
+
+    added = shard.analysis_dir / "c.md"
+    added.write_text("---\nproblem: c\n---\n\nBody c\n")
+    assert server.apply_changes({added: "upsert", shard.analysis_dir / "a.md": "delete"}) == 2
+
+    server._shards.clear()
+    embeddings = server.get_embeddings(shard)
+    parents = {row["parent"] for row in embeddings.search("select parent from txtai", limit=100)}
+    assert parents == {str(shard.analysis_dir / "b.md"), str(added)}
+
+
+class RecordingIndex:
+    """Stands in for writable embeddings, recording upserted ids."""
+
+    def __init__(self):
+        self.upserted = []
+
+    def search(self, query, limit=None, parameters=None):
+        return []
+
+    def delete(self, ids):
+        pass
+
+    def upsert(self, rows):
+        self.upserted.extend(uid for uid, _, _ in rows)
+
+
+def test_index_handler_waits_for_the_shard_lock_off_the_event_loop(index_dir, monkeypatch):
+    """While a rebuild swap or watcher batch holds the lock, the event loop keeps running."""
+    shard = global_shard()
+    shard.analysis_dir.mkdir(parents=True)
+    path = shard.analysis_dir / "a.md"
+    path.write_text("---\nproblem: A\n---\n\nBody\n")
+    index = RecordingIndex()
+    monkeypatch.setattr(server, "writable_embeddings", lambda shard: index)
+    lock = shard_lock(shard)
+
+    async def scenario():
+        lock.acquire()
+        task = asyncio.create_task(server.handle_index_analysis(str(path)))
+        await asyncio.sleep(0.1)  # would never get here if the handler blocked the loop
+        assert not task.done()
+        lock.release()
+        return await task
+
+    result = asyncio.run(scenario())
+
+    assert result[0].text.startswith("Indexed: A")
+    assert index.upserted == [f"{path}#0", f"{path}#1"]
@@ -0,0 +1,82 @@
+"""Tests for choosing the index shards a request touches."""
+
+import json
+
+import pytest
+
+import server
+from server import global_shard, project_shard, select_shards
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    """Point the project registry at a temporary file."""
+    projects_file = tmp_path / "projects.json"
+    monkeypatch.setattr(server, "PROJECTS_FILE", projects_file)
+    return projects_file
+
+
+def test_default_scope_is_global(registry):
+    """Without a project, only the global shard is searched."""
+    assert select_shards() == [global_shard()]
+
+
+def test_default_scope_adds_project_shard(registry, tmp_path):
+    """With a project, its shard is searched alongside the global one."""
+    assert select_shards(str(tmp_path)) == [global_shard(), project_shard(tmp_path)]
+
+
+def test_global_scope_ignores_project(registry, tmp_path):
+    """scope 'global' searches only the global shard."""
+    assert select_shards(str(tmp_path), "global") == [global_shard()]
+
+
+def test_project_scope(registry, tmp_path):
+    """scope 'project' searches only the project's shard, and needs a project."""
+    assert select_shards(str(tmp_path), "project") == [project_shard(tmp_path)]
+    with pytest.raises(ValueError, match="requires project_path"):
+        select_shards(None, "project")
+
+
+def test_all_scope_uses_registered_projects(registry, tmp_path):
+    """scope 'all' searches the global shard and every registered project once."""
+    first, second = tmp_path / "first", tmp_path / "second"
+    registry.write_text(json.dumps({"projects": [str(first), str(second), str(first)]}))
+
+    assert select_shards(scope="all") == [
+        global_shard(),
+        project_shard(first),
+        project_shard(second),
+    ]
+
+
+def test_unknown_scope(registry):
+    """Unknown scopes are rejected."""
+    with pytest.raises(ValueError, match="Unknown scope"):
+        select_shards(scope="everything")
+
+
+def test_project_shard_names_are_stable_and_distinct(tmp_path):
+    """Shard names derive from the resolved project path."""
+    a, b = tmp_path / "app", tmp_path / "other" / "app"
+
+    assert project_shard(a) == project_shard(str(a / "."))
+    assert project_shard(a).name != project_shard(b).name
+    assert project_shard(a).name.startswith("project-app-")
+    assert project_shard(a).analysis_dir == a.resolve() / "docs" / "analysis"
+
+
+def test_apply_changes_reads_the_registry_once_per_batch(registry, tmp_path, monkeypatch):
+    """Routing a batch of paths to shards does not re-read projects.json per path."""
+    reads = []
+    original = server.load_registered_projects
+
+    def counting_load():
+        reads.append(True)
+        return original()
+
+    monkeypatch.setattr(server, "load_registered_projects", counting_load)
+    changes = {tmp_path / "elsewhere" / f"{i}.md": "upsert" for i in range(5)}
+
+    assert server.apply_changes(changes) == 0
+    assert len(reads) == 1
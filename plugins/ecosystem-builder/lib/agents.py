@@ -3,14 +3,17 @@
 from __future__ import annotations
 
 import logging
-import re
+import time
 import uuid
-
-import yaml
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Callable
 
 from dataclasses import dataclass
 from pathlib import Path
 
+from lib.scan_cache import ScanCache
+from lib.snapshot import EcosystemSnapshot
 from lib.state import Gap, GapType
 
 
@@ -22,6 +25,7 @@ class AgentResult:
     gaps: list[Gap]
     artifacts_scanned: int
     error: str | None = None
+    duration_s: float = 0.0  # wall time the agent ran, or waited before timing out
 
     @property
     def success(self) -> bool:
@@ -35,15 +39,96 @@ class AgentPanel:
 
     user_skills_dir: Path
     plugins_dir: Path
+    agent_timeout_s: float = 60.0
+    scan_cache: ScanCache | None = None
+
+    def __post_init__(self) -> None:
+        if self.agent_timeout_s <= 0:
+            raise ValueError(f"AgentPanel.agent_timeout_s must be positive. Got: {self.agent_timeout_s!r}")
 
     def run_all_agents(self) -> list[AgentResult]:
-        """Run all agents and collect results."""
-        return [
-            self._run_catalog_agent(),
-            self._run_workflow_agent(),
-            self._run_quality_agent(),
+        """Run all agents concurrently and collect results in a fixed order.
+
+        The ecosystem is scanned once up front, on a worker thread with
+        agent_timeout_s to finish, and the agents share the read-only
+        snapshot. If the scan fails or times out, every agent reports that
+        error. Each agent then runs on its own thread and is isolated: an
+        exception or a timeout becomes an AgentResult with an error
+        instead of failing the panel. A timed-out thread cannot be
+        killed; it finishes in the background and its result is
+        discarded.
+        """
+        agents: list[tuple[str, Callable[[EcosystemSnapshot], AgentResult]]] = [
+            ("catalog", self._run_catalog_agent),
+            ("workflow-analyzer", self._run_workflow_agent),
+            ("quality-scorer", self._run_quality_agent),
         ]
 
+        pool = ThreadPoolExecutor(max_workers=len(agents), thread_name_prefix="agent")
+        try:
+            started = time.monotonic()
+            try:
+                snapshot = pool.submit(self.scan).result(timeout=self.agent_timeout_s)
+            except FutureTimeoutError:
+                error = f"Scan timed out after {self.agent_timeout_s}s"
+            except Exception as e:
+                error = f"Scan failed: {type(e).__name__}: {e}"
+            else:
+                error = None
+            if error is not None:
+                logging.warning(error)
+                return [
+                    AgentResult(
+                        agent_name=name,
+                        gaps=[],
+                        artifacts_scanned=0,
+                        error=error,
+                        duration_s=time.monotonic() - started,
+                    )
+                    for name, _ in agents
+                ]
+
+            started = time.monotonic()
+            futures = [(name, pool.submit(self._run_isolated, name, run, snapshot)) for name, run in agents]
+
+            results = []
+            for name, future in futures:
+                # All agents start together, so each gets the timeout from the common start
+                remaining = self.agent_timeout_s - (time.monotonic() - started)
+                try:
+                    results.append(future.result(timeout=max(remaining, 0)))
+                except FutureTimeoutError:
+                    logging.warning(f"Agent {name} timed out after {self.agent_timeout_s}s")
+                    results.append(AgentResult(
+                        agent_name=name,
+                        gaps=[],
+                        artifacts_scanned=0,
+                        error=f"Timed out after {self.agent_timeout_s}s",
+                        duration_s=time.monotonic() - started,
+                    ))
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+        return results
+
+    @staticmethod
+    def _run_isolated(
+        name: str, run: Callable[[EcosystemSnapshot], AgentResult], snapshot: EcosystemSnapshot
+    ) -> AgentResult:
+        """Run one agent, timing it and turning exceptions into an error result."""
+        started = time.monotonic()
+        try:
+            result = run(snapshot)
+        except Exception as e:
+            logging.warning(f"Agent {name} failed: {type(e).__name__}: {e}")
+            result = AgentResult(
+                agent_name=name,
+                gaps=[],
+                artifacts_scanned=0,
+                error=f"{type(e).__name__}: {e}",
+            )
+        result.duration_s = time.monotonic() - started
+        return result
+
     def merge_gaps(self, results: list[AgentResult]) -> list[Gap]:
         """Merge and deduplicate gaps from all agents."""
         gaps_by_id: dict[str, Gap] = {}
@@ -59,29 +144,27 @@ class AgentPanel:
         # Sort by priority (lower = higher priority)
         return sorted(gaps_by_id.values(), key=lambda g: g.priority)
 
-    def _run_catalog_agent(self) -> AgentResult:
+    def scan(self) -> EcosystemSnapshot:
+        """Take a snapshot of the ecosystem for the agents to share.
+
+        With a scan_cache, unchanged skills are taken from the cache and
+        the cache is saved with this scan's results. The cache is only an
+        optimisation, so failing to save it is logged, not raised.
+        """
+        snapshot = EcosystemSnapshot.scan(self.user_skills_dir, self.plugins_dir, cache=self.scan_cache)
+        if self.scan_cache is not None:
+            try:
+                self.scan_cache.save()
+            except RuntimeError as e:
+                logging.warning(f"Continuing without saving the scan cache: {e}")
+        return snapshot
+
+    def _run_catalog_agent(self, snapshot: EcosystemSnapshot | None = None) -> AgentResult:
         """Catalog existing artifacts and find missing skills."""
-        existing_skills: set[str] = set()
-        scanned = 0
-
-        # Scan user skills
-        if self.user_skills_dir.exists():
-            for skill_dir in self.user_skills_dir.iterdir():
-                if skill_dir.is_dir() and (skill_dir / "SKILL.md").exists():
-                    existing_skills.add(skill_dir.name.lower())
-                    scanned += 1
-
-        # Scan plugin skills
-        if self.plugins_dir.exists():
-            for plugin_dir in self.plugins_dir.iterdir():
-                if not plugin_dir.is_dir():
-                    continue
-                skills_path = plugin_dir / "skills"
-                if skills_path.exists():
-                    for skill_dir in skills_path.iterdir():
-                        if skill_dir.is_dir() and (skill_dir / "SKILL.md").exists():
-                            existing_skills.add(skill_dir.name.lower())
-                            scanned += 1
+        if snapshot is None:
+            snapshot = self.scan()
+        existing_skills = {skill.name.lower() for skill in snapshot.all_skills}
+        scanned = len(snapshot.all_skills)
 
         # Common skill patterns to check for
         expected_patterns = [
@@ -114,145 +197,93 @@ class AgentPanel:
             artifacts_scanned=scanned,
         )
 
-    def _run_workflow_agent(self) -> AgentResult:
+    def _run_workflow_agent(self, snapshot: EcosystemSnapshot | None = None) -> AgentResult:
         """Analyze workflows for holes."""
+        if snapshot is None:
+            snapshot = self.scan()
         gaps: list[Gap] = []
-        scanned = 0
 
         # Check user skills for completeness
-        if self.user_skills_dir.exists():
-            for skill_dir in self.user_skills_dir.iterdir():
-                if not skill_dir.is_dir():
-                    continue
-                skill_md = skill_dir / "SKILL.md"
-                if not skill_md.exists():
-                    continue
-
-                scanned += 1
-                skill_name = skill_dir.name
-
-                # Check for references directory
-                has_references = (skill_dir / "references").exists()
-                # Check for examples directory
-                has_examples = (skill_dir / "examples").exists()
-                # Check for scripts directory
-                has_scripts = (skill_dir / "scripts").exists()
-
-                if not any([has_references, has_examples, has_scripts]):
+        for skill in snapshot.user_skills:
+            skill_name = skill.name
+
+            if not any([skill.has_references, skill.has_examples, skill.has_scripts]):
+                gaps.append(
+                    Gap(
+                        gap_id=f"gap-workflow-{uuid.uuid4().hex[:6]}",
+                        gap_type=GapType.INCOMPLETE_ARTIFACT,
+                        title=f"Incomplete structure: {skill_name}",
+                        description=f"Skill '{skill_name}' lacks references, examples, or scripts",
+                        source_agent="workflow-analyzer",
+                        confidence=0.7,
+                        priority=3,
+                    )
+                )
+
+            # Check for hook-worthy skills
+            if skill.mentions_hook_trigger:
+                # Check if hooks exist in same plugin
+                if not skill.has_hooks:
                     gaps.append(
                         Gap(
                             gap_id=f"gap-workflow-{uuid.uuid4().hex[:6]}",
-                            gap_type=GapType.INCOMPLETE_ARTIFACT,
-                            title=f"Incomplete structure: {skill_name}",
-                            description=f"Skill '{skill_name}' lacks references, examples, or scripts",
+                            gap_type=GapType.WORKFLOW_HOLE,
+                            title=f"Missing hook for: {skill_name}",
+                            description=f"Skill '{skill_name}' mentions hook triggers but no hooks.json exists",
                             source_agent="workflow-analyzer",
-                            confidence=0.7,
-                            priority=3,
+                            confidence=0.75,
+                            priority=2,
                         )
                     )
 
-                # Check for hook-worthy skills
-                try:
-                    content = skill_md.read_text().lower()
-                except (OSError, UnicodeDecodeError) as e:
-                    logging.warning(f"Skipping unreadable skill {skill_md}: {e}")
-                    continue
-                hook_triggers = ["pre-commit", "before commit", "on save", "pre-push"]
-                if any(trigger in content for trigger in hook_triggers):
-                    # Check if hooks exist in same plugin
-                    hooks_file = skill_dir.parent.parent / "hooks" / "hooks.json"
-                    if not hooks_file.exists():
-                        gaps.append(
-                            Gap(
-                                gap_id=f"gap-workflow-{uuid.uuid4().hex[:6]}",
-                                gap_type=GapType.WORKFLOW_HOLE,
-                                title=f"Missing hook for: {skill_name}",
-                                description=f"Skill '{skill_name}' mentions hook triggers but no hooks.json exists",
-                                source_agent="workflow-analyzer",
-                                confidence=0.75,
-                                priority=2,
-                            )
-                        )
-
         return AgentResult(
             agent_name="workflow-analyzer",
             gaps=gaps,
-            artifacts_scanned=scanned,
+            artifacts_scanned=len(snapshot.user_skills),
         )
 
-    def _run_quality_agent(self) -> AgentResult:
+    def _run_quality_agent(self, snapshot: EcosystemSnapshot | None = None) -> AgentResult:
         """Score artifact quality and flag issues."""
+        if snapshot is None:
+            snapshot = self.scan()
         gaps: list[Gap] = []
-        scanned = 0
-
-        def parse_frontmatter(content: str) -> dict:
-            """Extract YAML frontmatter from markdown.
-
-            Falls back to simple key:value parsing if YAML is malformed.
-            """
-            match = re.match(r"^---\s*\n(.*?)\n---", content, re.DOTALL)
-            if not match:
-                return {}
-            try:
-                return yaml.safe_load(match.group(1)) or {}
-            except yaml.YAMLError:
-                # Fallback to simple key:value parsing for malformed YAML
-                result = {}
-                for line in match.group(1).split("\n"):
-                    if ":" in line:
-                        key, value = line.split(":", 1)
-                        result[key.strip()] = value.strip()
-                return result
 
         # Check user skills for quality
-        if self.user_skills_dir.exists():
-            for skill_dir in self.user_skills_dir.iterdir():
-                if not skill_dir.is_dir():
-                    continue
-                skill_md = skill_dir / "SKILL.md"
-                if not skill_md.exists():
-                    continue
-
-                scanned += 1
-                skill_name = skill_dir.name
-                try:
-                    content = skill_md.read_text()
-                except (OSError, UnicodeDecodeError) as e:
-                    logging.warning(f"Skipping unreadable skill {skill_md}: {e}")
-                    continue
-                frontmatter = parse_frontmatter(content)
-
-                # Check for description
-                if not frontmatter.get("description"):
-                    gaps.append(
-                        Gap(
-                            gap_id=f"gap-quality-{uuid.uuid4().hex[:6]}",
-                            gap_type=GapType.QUALITY_ISSUE,
-                            title=f"Missing description: {skill_name}",
-                            description=f"Skill '{skill_name}' lacks a description field in frontmatter",
-                            source_agent="quality-scorer",
-                            confidence=0.9,
-                            priority=2,
-                        )
+        for skill in snapshot.user_skills:
+            if not skill.readable:
+                continue
+            skill_name = skill.name
+
+            # Check for description
+            if not skill.frontmatter.get("description"):
+                gaps.append(
+                    Gap(
+                        gap_id=f"gap-quality-{uuid.uuid4().hex[:6]}",
+                        gap_type=GapType.QUALITY_ISSUE,
+                        title=f"Missing description: {skill_name}",
+                        description=f"Skill '{skill_name}' lacks a description field in frontmatter",
+                        source_agent="quality-scorer",
+                        confidence=0.9,
+                        priority=2,
                     )
+                )
 
-                # Check content length (excluding frontmatter)
-                body = re.sub(r"^---.*?---\s*", "", content, flags=re.DOTALL)
-                if len(body.strip()) < 100:
-                    gaps.append(
-                        Gap(
-                            gap_id=f"gap-quality-{uuid.uuid4().hex[:6]}",
-                            gap_type=GapType.QUALITY_ISSUE,
-                            title=f"Minimal content: {skill_name}",
-                            description=f"Skill '{skill_name}' has very short content (< 100 chars)",
-                            source_agent="quality-scorer",
-                            confidence=0.8,
-                            priority=3,
-                        )
+            # Check content length (excluding frontmatter)
+            if skill.body_length < 100:
+                gaps.append(
+                    Gap(
+                        gap_id=f"gap-quality-{uuid.uuid4().hex[:6]}",
+                        gap_type=GapType.QUALITY_ISSUE,
+                        title=f"Minimal content: {skill_name}",
+                        description=f"Skill '{skill_name}' has very short content (< 100 chars)",
+                        source_agent="quality-scorer",
+                        confidence=0.8,
+                        priority=3,
                     )
+                )
 
         return AgentResult(
             agent_name="quality-scorer",
             gaps=gaps,
-            artifacts_scanned=scanned,
+            artifacts_scanned=len(snapshot.user_skills),
         )
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import json
 import logging
+import threading
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
@@ -20,10 +21,11 @@ class Event:
 
 
 class EventLogger:
-    """Appends events to a JSONL log file."""
+    """Appends events to a JSONL log file. Safe to share between threads."""
 
     def __init__(self, log_file: Path) -> None:
         self.log_file = log_file
+        self._lock = threading.Lock()
         if not self.log_file.exists():
             self.log_file.touch()
 
@@ -42,7 +44,7 @@ class EventLogger:
         })
 
         try:
-            with self.log_file.open("a") as f:
+            with self._lock, self.log_file.open("a") as f:
                 f.write(line + "\n")
         except OSError as e:
             raise RuntimeError(
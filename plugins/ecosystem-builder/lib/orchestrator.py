@@ -1,9 +1,12 @@
-"""Single-threaded orchestrator for ecosystem-builder runs."""
+"""Pipelined orchestrator for ecosystem-builder runs."""
 
 from __future__ import annotations
 
 import json
 import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import asdict
 from pathlib import Path
 from typing import Any, Callable
@@ -11,13 +14,28 @@ from typing import Any, Callable
 from lib.agents import AgentPanel
 from lib.builder import SkillBuilder
 from lib.logging import EventLogger
+from lib.scan_cache import ScanCache
 from lib.staging import StagingManager
 from lib.state import RunManifest
+from lib.task_adapter import SubagentAdapter
 from lib.validator import ValidationPanel
 
 
 class Orchestrator:
-    """Orchestrates a single ecosystem-builder run."""
+    """Orchestrates a single ecosystem-builder run.
+
+    Gaps flow through a build -> validate -> stage pipeline: up to
+    build_workers builds run at once, a single validation thread checks
+    their output, and the run loop is the only writer, staging artifacts
+    and saving the manifest as results arrive.
+
+    Elapsed time is metered into budget.hours with a monotonic clock, and
+    token and cost usage reported by a SubagentAdapter (or passed to
+    record_usage) into budget.tokens and budget.cost_usd. No build starts
+    once any budget is exhausted; if time, tokens or cost run out while
+    builds are in flight, they are cancelled and their gaps returned to
+    the build queue.
+    """
 
     def __init__(
         self,
@@ -26,11 +44,22 @@ class Orchestrator:
         user_skills_dir: Path | None = None,
         plugins_dir: Path | None = None,
         subagent_callable: Callable[[str], str] | None = None,
+        full_rescan: bool = False,
+        build_workers: int = 1,
     ) -> None:
+        if build_workers < 1:
+            raise ValueError(f"Orchestrator build_workers must be >= 1. Got: {build_workers!r}")
         self.manifest = manifest
         self.logger = EventLogger(manifest.run_dir / "log.jsonl")
         self.staging = StagingManager(staging_dir=staging_dir)
         self.build_queue: list[dict[str, Any]] = []
+        self.build_workers = build_workers
+        self._budget_lock = threading.Lock()
+        # Resolved when reported usage exhausts the budget, waking the run loop
+        self._budget_stop: Future[None] = Future()
+        self._run_started = time.monotonic()
+        self._hours_before_run = manifest.budget.hours.used
+        self._cancel_in_flight: Callable[[], None] | None = None
 
         # Ecosystem paths
         if user_skills_dir is None:
@@ -38,11 +67,20 @@ class Orchestrator:
         if plugins_dir is None:
             plugins_dir = Path.home() / ".claude" / "plugins"
 
+        # Scan results are cached across runs in the state directory;
+        # a full rescan ignores the cache but still refreshes it
+        cache_path = manifest.run_dir.parent / "scan-cache.json"
+        self.scan_cache = ScanCache(cache_path) if full_rescan else ScanCache.load(cache_path)
+
         self.agent_panel = AgentPanel(
             user_skills_dir=user_skills_dir,
             plugins_dir=plugins_dir,
+            scan_cache=self.scan_cache,
         )
         self.builder = SkillBuilder(subagent_callable=subagent_callable)
+        if isinstance(subagent_callable, SubagentAdapter):
+            subagent_callable.add_usage_listener(self.record_usage)
+            self._cancel_in_flight = subagent_callable.cancel
         self.validator = ValidationPanel(existing_skills_dir=user_skills_dir)
 
         if subagent_callable is None:
@@ -53,6 +91,8 @@ class Orchestrator:
 
     def run(self) -> None:
         """Execute the main control loop."""
+        self._run_started = time.monotonic()
+        self._hours_before_run = self.manifest.budget.hours.used
         self.logger.log("run_started", {
             "run_id": self.manifest.run_id,
             "budget": {
@@ -72,43 +112,11 @@ class Orchestrator:
             # Phase 2: Propose (populate build queue)
             self.build_queue = self._prioritize(gaps)
 
-            # Phase 3-5: Build -> Validate -> Stage loop
-            while self.build_queue and not self.manifest.budget.any_exhausted:
-                gap = self.build_queue.pop(0)
-
-                # Build
-                artifact = self._build(gap)
-                if artifact is None:
-                    continue
-
-                self.manifest.progress.built += 1
-                self.logger.log("artifact_built", {
-                    "name": artifact["name"],
-                    "gap_id": gap.get("gap_id"),
-                })
-
-                # Validate
-                passed = self._validate(artifact)
-
-                if passed:
-                    # Stage
-                    self.staging.stage_skill(
-                        name=artifact["name"],
-                        content=artifact["content"],
-                        run_id=self.manifest.run_id,
-                        gap_id=gap.get("gap_id", "unknown"),
-                    )
-                    self.manifest.progress.passed += 1
-                    self.logger.log("artifact_staged", {"name": artifact["name"]})
-                else:
-                    self.manifest.progress.failed += 1
-                    self.logger.log("artifact_rejected", {"name": artifact["name"]})
-
-                # Update budget
-                self.manifest.budget.artifacts.used += 1
-                self.manifest.save()
+            # Phase 3-5: Build -> Validate -> Stage pipeline
+            self._run_pipeline()
 
             # Complete
+            self._meter_time()
             self.manifest.status = "complete"
             if self.manifest.budget.any_exhausted:
                 self.manifest.completion_reason = "budget_exhausted"
@@ -127,6 +135,7 @@ class Orchestrator:
             raise
 
         finally:
+            self._meter_time()
             self.manifest.save()
             self.logger.log("run_complete", {
                 "status": self.manifest.status,
@@ -139,9 +148,162 @@ class Orchestrator:
                 },
             })
 
+    def _run_pipeline(self) -> None:
+        """Build, validate and stage gaps from the build queue until it or the budget runs out.
+
+        A build starts only after reserving an artifact from the budget,
+        so concurrent builds never overshoot the limit; a failed build
+        returns its reservation for the next gap. The loop also wakes when
+        the time budget runs out or reported usage exhausts the budget.
+        Results that are already in are still staged (a finished build is
+        validated on the spot), as are pending validations; only builds
+        still in flight are cancelled.
+        """
+        builds = ThreadPoolExecutor(max_workers=self.build_workers, thread_name_prefix="build")
+        validations = ThreadPoolExecutor(max_workers=1, thread_name_prefix="validate")
+        # future -> (gap, artifact); artifact is None while building
+        pending: dict[Future, tuple[dict[str, Any], dict[str, Any] | None]] = {}
+        try:
+            while True:
+                while self.build_queue and self._reserve_build():
+                    gap = self.build_queue.pop(0)
+                    pending[builds.submit(self._build, gap)] = (gap, None)
+                if not pending:
+                    break
+
+                done, _ = wait(
+                    [*pending, self._budget_stop],
+                    timeout=self._seconds_left(),
+                    return_when=FIRST_COMPLETED,
+                )
+                exhausted = self._usage_exhausted()
+                for future in done:
+                    if future is self._budget_stop:
+                        continue
+                    gap, artifact = pending.pop(future)
+                    if artifact is None:
+                        # Build finished
+                        artifact = future.result()
+                        if artifact is None:
+                            self._settle_build(used=0)
+                            continue
+                        self.manifest.progress.built += 1
+                        self.logger.log("artifact_built", {
+                            "name": artifact["name"],
+                            "gap_id": gap.get("gap_id"),
+                        })
+                        if exhausted:
+                            # The build is already paid for; validation is local
+                            self._stage(gap, artifact, passed=self._validate(artifact))
+                        else:
+                            pending[validations.submit(self._validate, artifact)] = (gap, artifact)
+                    else:
+                        # Validation finished
+                        self._stage(gap, artifact, passed=future.result())
+                if exhausted:
+                    self._cancel_pending(pending)
+                    break
+        finally:
+            builds.shutdown(wait=False, cancel_futures=True)
+            validations.shutdown(wait=False, cancel_futures=True)
+
+    def record_usage(self, tokens: int, cost_usd: float) -> None:
+        """Add subagent usage to the budget. Safe to call from any thread."""
+        with self._budget_lock:
+            budget = self.manifest.budget
+            budget.tokens.used += tokens
+            budget.cost_usd.used += cost_usd
+            exhausted = budget.tokens.exhausted or budget.cost_usd.exhausted
+        if exhausted and not self._budget_stop.done():
+            self._budget_stop.set_result(None)
+
+    def _meter_time(self) -> None:
+        """Update hours used from the monotonic clock."""
+        elapsed_hours = (time.monotonic() - self._run_started) / 3600
+        with self._budget_lock:
+            self.manifest.budget.hours.used = self._hours_before_run + elapsed_hours
+
+    def _seconds_left(self) -> float:
+        """Seconds until the time budget runs out."""
+        self._meter_time()
+        return max(0.0, self.manifest.budget.hours.remaining * 3600)
+
+    def _usage_exhausted(self) -> bool:
+        """Whether time, tokens or cost have run out, as opposed to artifacts."""
+        self._meter_time()
+        with self._budget_lock:
+            budget = self.manifest.budget
+            return budget.hours.exhausted or budget.tokens.exhausted or budget.cost_usd.exhausted
+
+    def _reserve_build(self) -> bool:
+        """Claim budget for one more build, or return False if none is left."""
+        self._meter_time()
+        with self._budget_lock:
+            budget = self.manifest.budget
+            return not budget.any_exhausted and budget.artifacts.reserve()
+
+    def _cancel_pending(
+        self, pending: dict[Future, tuple[dict[str, Any], dict[str, Any] | None]]
+    ) -> None:
+        """Abandon in-flight builds, returning their gaps to the front of the build queue.
+
+        Pending validations are finished instead: their builds are already
+        paid for and counted as built, and validation is local.
+        """
+        cancelled = [gap for gap, artifact in pending.values() if artifact is None]
+        for future, (gap, artifact) in pending.items():
+            if artifact is None:
+                future.cancel()
+                self._settle_build(used=0)
+                self.logger.log("build_cancelled", {"gap_id": gap.get("gap_id")})
+        self.build_queue[:0] = cancelled
+        if self._cancel_in_flight is not None:
+            self._cancel_in_flight()
+
+        for future, (gap, artifact) in pending.items():
+            if artifact is not None:
+                passed = self._validate(artifact) if future.cancel() else future.result()
+                self._stage(gap, artifact, passed=passed)
+        pending.clear()
+
+    def _settle_build(self, used: int) -> None:
+        """Release a build's reservation, counting used artifacts."""
+        with self._budget_lock:
+            self.manifest.budget.artifacts.settle(reserved=1, used=used)
+
+    def _stage(self, gap: dict[str, Any], artifact: dict[str, Any], passed: bool) -> None:
+        """Stage a validated artifact or record its rejection, then save progress."""
+        if passed:
+            self.staging.stage_skill(
+                name=artifact["name"],
+                content=artifact["content"],
+                run_id=self.manifest.run_id,
+                gap_id=gap.get("gap_id", "unknown"),
+            )
+            self.manifest.progress.passed += 1
+            self.logger.log("artifact_staged", {"name": artifact["name"]})
+        else:
+            self.manifest.progress.failed += 1
+            self.logger.log("artifact_rejected", {"name": artifact["name"]})
+
+        self._settle_build(used=1)
+        self.manifest.save()
+
     def _analyze(self) -> list[dict[str, Any]]:
         """Analyze ecosystem for gaps using agent panel."""
         results = self.agent_panel.run_all_agents()
+        self.logger.log("ecosystem_scanned", {
+            "cache_hits": self.scan_cache.hits,
+            "cache_misses": self.scan_cache.misses,
+        })
+        for result in results:
+            self.logger.log("agent_completed" if result.success else "agent_failed", {
+                "agent": result.agent_name,
+                "scanned": result.artifacts_scanned,
+                "gaps": len(result.gaps),
+                "duration_s": round(result.duration_s, 3),
+                "error": result.error,
+            })
         gaps = self.agent_panel.merge_gaps(results)
 
         # Convert to dicts and save
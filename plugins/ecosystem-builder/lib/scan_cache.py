@@ -0,0 +1,77 @@
+"""On-disk cache of per-skill scan results, reused across runs."""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+from pathlib import Path
+from typing import Any
+
+CACHE_VERSION = 1
+
+
+class ScanCache:
+    """Parsed skill facts keyed by skill directory path.
+
+    Each entry records the skill directory's mtime and SKILL.md's
+    (mtime, size) alongside what was derived from them: structure flags,
+    frontmatter, body length and the content checks the agents use. A
+    scan reuses an entry while those stamps match and recomputes it
+    otherwise. Entries for skills not seen by the latest scan are
+    dropped on save.
+    """
+
+    def __init__(self, path: Path, entries: dict[str, dict[str, Any]] | None = None) -> None:
+        self.path = path
+        self._entries = entries or {}
+        self._seen: dict[str, dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, path: Path) -> ScanCache:
+        """Load the cache, starting empty if it is missing, stale or corrupt."""
+        try:
+            data = json.loads(path.read_text())
+        except FileNotFoundError:
+            return cls(path)
+        except (OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
+            logging.warning(f"Ignoring unreadable scan cache {path}: {e}")
+            return cls(path)
+
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            return cls(path)
+        return cls(path, data.get("entries", {}))
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Cached entry for a skill directory, if any."""
+        return self._entries.get(key)
+
+    def put(self, key: str, entry: dict[str, Any], hit: bool) -> None:
+        """Record the entry used for a skill directory in this scan."""
+        self._seen[key] = entry
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def save(self) -> None:
+        """Persist the entries seen by the latest scan.
+
+        Uses atomic write pattern: write to temp file, then rename.
+        Raises RuntimeError on failure with context.
+        """
+        temp_path = self.path.with_suffix(".tmp")
+        data = {"version": CACHE_VERSION, "entries": self._seen}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path.write_text(json.dumps(data))
+            temp_path.replace(self.path)  # Atomic on POSIX
+        except OSError as e:
+            # The cleanup can fail for the same reason as the write
+            with contextlib.suppress(OSError):
+                temp_path.unlink(missing_ok=True)
+            raise RuntimeError(f"Failed to save scan cache to {self.path}: {e}") from e
+        self._entries = self._seen
+        self._seen = {}
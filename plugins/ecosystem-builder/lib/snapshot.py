@@ -0,0 +1,264 @@
+"""Single-pass, read-only snapshot of the skill ecosystem."""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Literal, Mapping
+
+import yaml
+
+from lib.scan_cache import ScanCache
+
+STRUCTURE_DIRS = ("references", "examples", "scripts")
+
+# Phrases suggesting a skill would be better driven by a hook
+HOOK_TRIGGERS = ("pre-commit", "before commit", "on save", "pre-push")
+
+# Timestamps this recent may not yet reflect a write in progress or one
+# made within the filesystem's timestamp granularity, so they aren't
+# trusted for cache hits
+RACY_WINDOW_NS = 2_000_000_000
+
+
+def parse_frontmatter(content: str) -> dict:
+    """Extract YAML frontmatter from markdown.
+
+    Falls back to simple key:value parsing if YAML is malformed.
+    """
+    match = re.match(r"^---\s*\n(.*?)\n---", content, re.DOTALL)
+    if not match:
+        return {}
+    try:
+        data = yaml.safe_load(match.group(1))
+        return data if isinstance(data, dict) else {}
+    except yaml.YAMLError:
+        # Fallback to simple key:value parsing for malformed YAML
+        result = {}
+        for line in match.group(1).split("\n"):
+            if ":" in line:
+                key, value = line.split(":", 1)
+                result[key.strip()] = value.strip()
+        return result
+
+
+def json_safe(value: Any) -> Any:
+    """Convert parsed YAML to the JSON types the scan cache stores.
+
+    Mapping keys become strings, and values other than JSON scalars,
+    lists and mappings (dates, for example) become their str(). Facts
+    are normalised this way on every scan, so a skill looks the same
+    to the agents whether it was read fresh or taken from the cache.
+    """
+    if isinstance(value, dict):
+        return {str(key): json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_safe(item) for item in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def body_length(content: str) -> int:
+    """Length of the markdown body without frontmatter or surrounding whitespace."""
+    return len(re.sub(r"^---.*?---\s*", "", content, flags=re.DOTALL).strip())
+
+
+@dataclass(frozen=True)
+class SkillRecord:
+    """One skill directory containing a SKILL.md, as seen by the scan."""
+
+    name: str
+    path: Path
+    source: Literal["user", "plugin"]
+    mtime_ns: int
+    size: int
+    has_references: bool = False
+    has_examples: bool = False
+    has_scripts: bool = False
+    has_hooks: bool = False  # hooks/hooks.json beside the skills directory
+    readable: bool = False  # False if not read (plugin skills) or unreadable
+    frontmatter: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}))
+    body_length: int = 0
+    mentions_hook_trigger: bool = False
+
+    @property
+    def skill_md(self) -> Path:
+        return self.path / "SKILL.md"
+
+
+@dataclass(frozen=True)
+class EcosystemSnapshot:
+    """Everything the analysis agents need, gathered in one walk.
+
+    Directories are listed once with os.scandir, each user SKILL.md is
+    read and its frontmatter parsed once, and the agents share the
+    result. Plugin skills are only catalogued, so their SKILL.md files
+    are stat'ed but not read. Unreadable directories and files are
+    logged and skipped, as the agents did before.
+
+    With a ScanCache, a skill directory whose mtime is unchanged is not
+    listed again, and a SKILL.md whose (mtime, size) is unchanged is not
+    read again; the facts derived from them come from the cache.
+    Timestamps from the last couple of seconds are never trusted.
+    """
+
+    user_skills: tuple[SkillRecord, ...] = ()
+    plugin_skills: tuple[SkillRecord, ...] = ()
+
+    @property
+    def all_skills(self) -> tuple[SkillRecord, ...]:
+        return self.user_skills + self.plugin_skills
+
+    @classmethod
+    def scan(
+        cls, user_skills_dir: Path, plugins_dir: Path, cache: ScanCache | None = None
+    ) -> EcosystemSnapshot:
+        """Walk the user skills and plugin directories once."""
+        user_hooks = (user_skills_dir.parent / "hooks" / "hooks.json").exists()
+        user_skills = tuple(
+            _scan_skill(entry, "user", user_hooks, read=True, cache=cache)
+            for entry in _subdirs(user_skills_dir)
+        )
+
+        plugin_skills: list[SkillRecord | None] = []
+        for plugin in _subdirs(plugins_dir):
+            skills_dir = Path(plugin.path) / "skills"
+            hooks = (Path(plugin.path) / "hooks" / "hooks.json").exists()
+            plugin_skills.extend(
+                _scan_skill(entry, "plugin", hooks, read=False, cache=cache)
+                for entry in _subdirs(skills_dir)
+            )
+
+        return cls(
+            user_skills=tuple(s for s in user_skills if s is not None),
+            plugin_skills=tuple(s for s in plugin_skills if s is not None),
+        )
+
+
+def _subdirs(path: Path) -> list[os.DirEntry]:
+    """Directory entries of path that are directories, sorted by name."""
+    try:
+        with os.scandir(path) as it:
+            entries = [e for e in it if e.is_dir()]
+    except FileNotFoundError:
+        return []
+    except OSError as e:
+        logging.warning(f"Skipping unreadable directory {path}: {e}")
+        return []
+    return sorted(entries, key=lambda e: e.name)
+
+
+def _scan_skill(
+    entry: os.DirEntry,
+    source: Literal["user", "plugin"],
+    has_hooks: bool,
+    read: bool,
+    cache: ScanCache | None = None,
+) -> SkillRecord | None:
+    """Build the record for one skill directory, or None if it has no SKILL.md."""
+    try:
+        dir_mtime_ns = entry.stat().st_mtime_ns
+    except OSError as e:
+        logging.warning(f"Skipping unreadable skill directory {entry.path}: {e}")
+        return None
+
+    settled_before = time.time_ns() - RACY_WINDOW_NS
+    cached = cache.get(entry.path) if cache is not None else None
+    if cached is not None and cached["dir_mtime_ns"] == dir_mtime_ns < settled_before:
+        listing = cached
+    else:
+        cached = None
+        listing = _list_skill_dir(entry.path)
+        if listing is None:
+            return None
+        listing["dir_mtime_ns"] = dir_mtime_ns
+
+    if not listing["is_skill"]:
+        if cache is not None:
+            cache.put(entry.path, listing, hit=cached is not None)
+        return None
+
+    skill_md = Path(entry.path) / "SKILL.md"
+    try:
+        stat = skill_md.stat()
+    except OSError as e:
+        logging.warning(f"Skipping unreadable skill directory {entry.path}: {e}")
+        return None
+
+    facts = {
+        "dir_mtime_ns": dir_mtime_ns,
+        "is_skill": True,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        **{key: listing[key] for key in ("has_references", "has_examples", "has_scripts")},
+    }
+    hit = (
+        cached is not None
+        and (cached["mtime_ns"], cached["size"]) == (stat.st_mtime_ns, stat.st_size)
+        and stat.st_mtime_ns < settled_before
+        and (cached["read"] or not read)
+    )
+    if hit:
+        facts.update({key: cached[key] for key in ("read", "frontmatter", "body_length", "mentions_hook_trigger")})
+    else:
+        facts.update(read=False, frontmatter={}, body_length=0, mentions_hook_trigger=False)
+        if read:
+            try:
+                content = skill_md.read_text()
+            except (OSError, UnicodeDecodeError) as e:
+                logging.warning(f"Skipping unreadable skill {skill_md}: {e}")
+            else:
+                lowered = content.lower()
+                facts.update(
+                    read=True,
+                    frontmatter=json_safe(parse_frontmatter(content)),
+                    body_length=body_length(content),
+                    mentions_hook_trigger=any(trigger in lowered for trigger in HOOK_TRIGGERS),
+                )
+    # Unreadable files aren't cached, so they are retried next time
+    if cache is not None and (facts["read"] or not read):
+        cache.put(entry.path, facts, hit=hit)
+
+    return SkillRecord(
+        name=entry.name,
+        path=Path(entry.path),
+        source=source,
+        mtime_ns=stat.st_mtime_ns,
+        size=stat.st_size,
+        has_references=facts["has_references"],
+        has_examples=facts["has_examples"],
+        has_scripts=facts["has_scripts"],
+        has_hooks=has_hooks,
+        readable=facts["read"],
+        frontmatter=MappingProxyType(facts["frontmatter"]),
+        body_length=facts["body_length"],
+        mentions_hook_trigger=facts["mentions_hook_trigger"],
+    )
+
+
+def _list_skill_dir(path: str) -> dict[str, Any] | None:
+    """List a skill directory once: whether it has SKILL.md and which subdirectories."""
+    is_skill = False
+    subdirs: set[str] = set()
+    try:
+        with os.scandir(path) as it:
+            for child in it:
+                if child.name == "SKILL.md" and child.is_file():
+                    is_skill = True
+                elif child.name in STRUCTURE_DIRS:
+                    subdirs.add(child.name)
+    except OSError as e:
+        logging.warning(f"Skipping unreadable skill directory {path}: {e}")
+        return None
+    return {
+        "is_skill": is_skill,
+        "has_references": "references" in subdirs,
+        "has_examples": "examples" in subdirs,
+        "has_scripts": "scripts" in subdirs,
+    }
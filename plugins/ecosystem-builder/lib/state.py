@@ -143,6 +143,8 @@ class BudgetItem:
 
     limit: int | float
     used: int | float = 0
+    # Claimed by work in flight but not yet used; not persisted
+    reserved: int | float = field(default=0, repr=False, compare=False)
 
     def __post_init__(self) -> None:
         if self.limit < 0:
@@ -158,6 +160,18 @@ class BudgetItem:
     def exhausted(self) -> bool:
         return self.used >= self.limit
 
+    def reserve(self, amount: int | float = 1) -> bool:
+        """Claim amount ahead of use. Returns False if it would overshoot the limit."""
+        if self.used + self.reserved + amount > self.limit:
+            return False
+        self.reserved += amount
+        return True
+
+    def settle(self, reserved: int | float, used: int | float) -> None:
+        """Replace a reservation with the amount actually used."""
+        self.reserved -= reserved
+        self.used += used
+
 
 @dataclass
 class Budget:
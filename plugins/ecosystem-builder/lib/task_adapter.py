@@ -10,9 +10,29 @@ the same interface for production use.
 
 from __future__ import annotations
 
+import asyncio
+import random
 import re
+import threading
+import time
+from concurrent.futures import Future
 from dataclasses import dataclass
-from typing import Callable
+from typing import Awaitable, Callable
+
+
+@dataclass
+class SubagentReply:
+    """A subagent response with the usage it was billed for."""
+
+    content: str
+    tokens: int = 0
+    cost_usd: float = 0.0
+
+
+# Async transports: one prompt -> one response, or a batch of prompts ->
+# responses in the same order. Plain strings carry no usage.
+AsyncSend = Callable[[str], Awaitable[str | SubagentReply]]
+AsyncSendBatch = Callable[[list[str]], Awaitable[list[str | SubagentReply]]]
 
 
 @dataclass
@@ -23,12 +43,295 @@ class SubagentConfig:
     model: str = "sonnet"
     timeout_ms: int = 60000
     description: str = "Generate skill from gap"
+    max_concurrency: int = 4
+    requests_per_minute: float | None = None  # None = unlimited
+    max_retries: int = 3
+    retry_backoff_ms: int = 1000  # first retry delay, doubled each attempt
+    max_backoff_ms: int = 30000
+    batch_size: int = 1  # > 1 needs a batch transport
+    batch_window_ms: int = 50
 
     def __post_init__(self) -> None:
         if self.timeout_ms < 1000:
             raise ValueError(f"SubagentConfig.timeout_ms must be >= 1000. Got: {self.timeout_ms!r}")
         if self.timeout_ms > 600000:
             raise ValueError(f"SubagentConfig.timeout_ms must be <= 600000 (10 min). Got: {self.timeout_ms!r}")
+        if self.max_concurrency < 1:
+            raise ValueError(f"SubagentConfig.max_concurrency must be >= 1. Got: {self.max_concurrency!r}")
+        if self.requests_per_minute is not None and self.requests_per_minute <= 0:
+            raise ValueError(
+                f"SubagentConfig.requests_per_minute must be positive. Got: {self.requests_per_minute!r}"
+            )
+        if self.max_retries < 0:
+            raise ValueError(f"SubagentConfig.max_retries must be non-negative. Got: {self.max_retries!r}")
+        if not 0 <= self.retry_backoff_ms <= self.max_backoff_ms:
+            raise ValueError(
+                "SubagentConfig.retry_backoff_ms must be between 0 and max_backoff_ms. "
+                f"Got: {self.retry_backoff_ms!r}"
+            )
+        if self.batch_size < 1:
+            raise ValueError(f"SubagentConfig.batch_size must be >= 1. Got: {self.batch_size!r}")
+        if self.batch_window_ms < 0:
+            raise ValueError(f"SubagentConfig.batch_window_ms must be non-negative. Got: {self.batch_window_ms!r}")
+
+
+class SubagentError(Exception):
+    """A failed subagent request, with any usage it was still billed for."""
+
+    def __init__(self, message: str = "", tokens: int = 0, cost_usd: float = 0.0) -> None:
+        super().__init__(message)
+        self.tokens = tokens
+        self.cost_usd = cost_usd
+
+
+class TransientSubagentError(SubagentError):
+    """A subagent failure worth retrying, such as a rate-limit or overload response."""
+
+
+# Failures retried with backoff; anything else fails the request at once
+RETRYABLE_ERRORS = (TimeoutError, ConnectionError, TransientSubagentError)
+
+
+class TokenBucket:
+    """Token-bucket rate limiter: rate requests per second, bursts up to capacity."""
+
+    def __init__(self, rate: float, capacity: float = 1.0) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        """Wait until a token is available, then take it."""
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+async def _cancel_tasks() -> None:
+    """Cancel every other task on the running loop and wait for them to finish."""
+    tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class SubagentAdapter:
+    """Calls an async subagent transport with limits, retries and timeouts.
+
+    Every request waits for the rate limiter, holds one of
+    max_concurrency slots while in flight and is cancelled after
+    timeout_ms. Timeouts, connection errors and TransientSubagentError
+    are retried up to max_retries times with jittered exponential
+    backoff. With batch_size > 1 and a send_batch transport, prompts
+    arriving within batch_window_ms are sent together as one request.
+
+    The adapter is a Callable[[str], str], so it plugs into SkillBuilder
+    and SkillGeneratorAgent as their subagent/LLM callable. Synchronous
+    calls, from any number of threads, run on one event loop owned by
+    the adapter, so the limits hold across concurrent builds; call
+    close() when done. Async code can await generate() directly instead.
+    The limits belong to one event loop: the first loop generate() runs
+    on, which is the adapter's own loop once it has made a synchronous
+    call. Using the adapter from another loop raises RuntimeError.
+
+    Transports may return SubagentReply to report usage; the adapter
+    keeps running totals and passes each reply's usage to listeners
+    added with add_usage_listener(). Failed requests report what they
+    were billed through SubagentError, and a transport can call
+    report_usage() as usage accrues so that requests cut off by the
+    timeout are counted too. cancel() abandons the synchronous calls in
+    flight.
+    """
+
+    def __init__(
+        self,
+        send: AsyncSend | None = None,
+        config: SubagentConfig | None = None,
+        send_batch: AsyncSendBatch | None = None,
+    ) -> None:
+        if send is None and send_batch is None:
+            raise ValueError("SubagentAdapter needs a send or send_batch transport")
+        self.config = config or SubagentConfig()
+        if self.config.batch_size > 1 and send_batch is None:
+            raise ValueError("SubagentConfig.batch_size > 1 requires a send_batch transport")
+        self._send = send
+        self._send_batch = send_batch
+        self._slots = asyncio.Semaphore(self.config.max_concurrency)
+        self._bucket = (
+            TokenBucket(self.config.requests_per_minute / 60)
+            if self.config.requests_per_minute is not None
+            else None
+        )
+        self._batch: list[tuple[str, asyncio.Future[str]]] = []
+        self._batch_timer: asyncio.TimerHandle | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._owner: asyncio.AbstractEventLoop | None = None
+        self._closed = False
+        self._lock = threading.Lock()
+        self._calls: set[Future[str]] = set()
+        self._usage_listeners: list[Callable[[int, float], None]] = []
+        self.tokens_used = 0
+        self.cost_usd = 0.0
+
+    def __call__(self, prompt: str) -> str:
+        """Generate a response synchronously on the adapter's event loop.
+
+        Raises concurrent.futures.CancelledError if cancel() or close()
+        is called while the request is in flight, and RuntimeError once
+        the adapter is closed.
+        """
+        with self._lock:
+            loop = self._ensure_loop()
+            call = asyncio.run_coroutine_threadsafe(self.generate(prompt), loop)
+            self._calls.add(call)
+        try:
+            return call.result()
+        finally:
+            with self._lock:
+                self._calls.discard(call)
+
+    def add_usage_listener(self, listener: Callable[[int, float], None]) -> None:
+        """Call listener(tokens, cost_usd) for each reply that reports usage."""
+        self._usage_listeners.append(listener)
+
+    def report_usage(self, tokens: int, cost_usd: float) -> None:
+        """Record usage billed for a request and pass it to the listeners."""
+        with self._lock:
+            self.tokens_used += tokens
+            self.cost_usd += cost_usd
+        for listener in self._usage_listeners:
+            listener(tokens, cost_usd)
+
+    def cancel(self) -> None:
+        """Cancel every synchronous call in flight."""
+        with self._lock:
+            calls = list(self._calls)
+        for call in calls:
+            call.cancel()
+
+    async def generate(self, prompt: str) -> str:
+        """Generate a response, retrying transient failures with backoff."""
+        self._check_loop()
+        for attempt in range(self.config.max_retries + 1):
+            try:
+                if self.config.batch_size > 1:
+                    return await self._enqueue(prompt)
+                return (await self._request([prompt]))[0]
+            except RETRYABLE_ERRORS:
+                if attempt == self.config.max_retries:
+                    raise
+                delay_ms = min(self.config.max_backoff_ms, self.config.retry_backoff_ms * 2**attempt)
+                await asyncio.sleep(delay_ms / 1000 * random.uniform(0.5, 1.0))
+        raise AssertionError("unreachable")
+
+    def close(self) -> None:
+        """Cancel the synchronous calls in flight and stop their event loop."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+            self._closed = True
+        self.cancel()
+        if loop is not None and thread is not None:
+            asyncio.run_coroutine_threadsafe(_cancel_tasks(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+    def __enter__(self) -> SubagentAdapter:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the background event loop on first synchronous use; call with the lock held."""
+        if self._closed:
+            raise RuntimeError("SubagentAdapter is closed")
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                target=self._loop.run_forever, name="subagent-adapter", daemon=True
+            )
+            self._thread.start()
+        return self._loop
+
+    def _check_loop(self) -> None:
+        """Bind the limits to the running event loop, or reject a different one."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._owner is None:
+                self._owner = loop
+            elif self._owner is not loop:
+                raise RuntimeError(
+                    "SubagentAdapter is already in use on another event loop; "
+                    "create one adapter per loop"
+                )
+
+    async def _request(self, prompts: list[str]) -> list[str]:
+        """Send one request, subject to the rate limit, concurrency limit and timeout."""
+        if self._bucket is not None:
+            await self._bucket.acquire()
+        async with self._slots:
+            try:
+                async with asyncio.timeout(self.config.timeout_ms / 1000):
+                    if self._send_batch is not None and (len(prompts) > 1 or self._send is None):
+                        responses = await self._send_batch(prompts)
+                    else:
+                        responses = [await self._send(prompts[0])]
+            except SubagentError as e:
+                if e.tokens or e.cost_usd:
+                    self.report_usage(e.tokens, e.cost_usd)
+                raise
+        if len(responses) != len(prompts):
+            raise ValueError(f"Subagent returned {len(responses)} responses for {len(prompts)} prompts")
+        return [self._unwrap(response) for response in responses]
+
+    def _unwrap(self, response: str | SubagentReply) -> str:
+        """Record a reply's usage and return its content."""
+        if isinstance(response, str):
+            return response
+        self.report_usage(response.tokens, response.cost_usd)
+        return response.content
+
+    async def _enqueue(self, prompt: str) -> str:
+        """Add a prompt to the pending batch and wait for its response."""
+        future: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+        self._batch.append((prompt, future))
+        if len(self._batch) >= self.config.batch_size:
+            self._flush()
+        elif self._batch_timer is None:
+            self._batch_timer = asyncio.get_running_loop().call_later(
+                self.config.batch_window_ms / 1000, self._flush
+            )
+        return await future
+
+    def _flush(self) -> None:
+        """Send the pending batch as one request."""
+        if self._batch_timer is not None:
+            self._batch_timer.cancel()
+            self._batch_timer = None
+        batch, self._batch = self._batch, []
+        if batch:
+            asyncio.get_running_loop().create_task(self._send_pending(batch))
+
+    async def _send_pending(self, batch: list[tuple[str, asyncio.Future[str]]]) -> None:
+        try:
+            responses = await self._request([prompt for prompt, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, future), response in zip(batch, responses):
+                if not future.done():
+                    future.set_result(response)
 
 
 def create_subagent_callable(
@@ -37,7 +340,9 @@ def create_subagent_callable(
     """Create a callable that invokes the Task tool.
 
     In production, this would be wired to Claude Code's Task tool.
-    For testing, use mock callables directly on SkillBuilder.
+    For testing, use mock callables directly on SkillBuilder. To apply
+    the config's timeout, retry and rate limits to an async transport,
+    use SubagentAdapter.
 
     Returns:
         A callable that takes a prompt string and returns generated content.
@@ -83,6 +388,53 @@ def create_mock_callable(response: str) -> Callable[[str], str]:
     return mock_invoke
 
 
+class MockSubagentServer:
+    """In-process stand-in for a subagent service, for exercising SubagentAdapter.
+
+    Responds after latency_s with respond(prompt), by default the dynamic
+    mock skill, billing tokens and cost_usd per prompt. The first
+    `failures` requests raise TransientSubagentError. Records each
+    request's prompts and the peak number of requests in flight.
+    """
+
+    def __init__(
+        self,
+        latency_s: float = 0.0,
+        failures: int = 0,
+        respond: Callable[[str], str] | None = None,
+        tokens: int = 0,
+        cost_usd: float = 0.0,
+    ) -> None:
+        self.latency_s = latency_s
+        self.failures = failures
+        self.respond = respond or create_dynamic_mock_callable()
+        self.tokens = tokens
+        self.cost_usd = cost_usd
+        self.requests: list[list[str]] = []
+        self.request_times: list[float] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def send(self, prompt: str) -> SubagentReply:
+        """Handle a single-prompt request."""
+        return (await self.send_batch([prompt]))[0]
+
+    async def send_batch(self, prompts: list[str]) -> list[SubagentReply]:
+        """Handle a request carrying several prompts."""
+        self.requests.append(prompts)
+        self.request_times.append(time.monotonic())
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency_s)
+            if self.failures > 0:
+                self.failures -= 1
+                raise TransientSubagentError("503 overloaded")
+            return [SubagentReply(self.respond(prompt), self.tokens, self.cost_usd) for prompt in prompts]
+        finally:
+            self.in_flight -= 1
+
+
 def create_dynamic_mock_callable() -> Callable[[str], str]:
     """Create a dynamic mock that generates contextual skill content.
 
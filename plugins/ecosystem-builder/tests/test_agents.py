@@ -1,5 +1,7 @@
 """Tests for agent panel."""
 
+import threading
+import time
 from pathlib import Path
 
 import pytest
@@ -327,3 +329,100 @@ class TestQualityScorerAgent:
             "complete-skill" in g.title
             for g in result.gaps
         )
+
+
+class TestParallelAgents:
+    """Tests for concurrent agent execution."""
+
+    def test_agent_error_is_isolated(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """One failing agent should not prevent the others' results."""
+        panel = AgentPanel(
+            user_skills_dir=tmp_path / "skills",
+            plugins_dir=tmp_path / "plugins",
+        )
+
+        def broken(snapshot) -> AgentResult:
+            raise OSError("disk on fire")
+
+        monkeypatch.setattr(panel, "_run_workflow_agent", broken)
+        results = panel.run_all_agents()
+
+        assert [r.agent_name for r in results] == ["catalog", "workflow-analyzer", "quality-scorer"]
+        assert results[1].error == "OSError: disk on fire"
+        assert results[0].success and results[2].success
+
+    def test_agent_timeout(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """A slow agent should be reported as timed out without blocking the panel."""
+        panel = AgentPanel(
+            user_skills_dir=tmp_path / "skills",
+            plugins_dir=tmp_path / "plugins",
+            agent_timeout_s=0.2,
+        )
+
+        def slow(snapshot) -> AgentResult:
+            time.sleep(2)
+            return AgentResult(agent_name="quality-scorer", gaps=[], artifacts_scanned=0)
+
+        monkeypatch.setattr(panel, "_run_quality_agent", slow)
+        started = time.monotonic()
+        results = panel.run_all_agents()
+
+        assert time.monotonic() - started < 1.5
+        assert "Timed out" in results[2].error
+        assert results[0].success
+
+    def test_scan_error_is_reported_by_every_agent(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """A failing scan should produce error results rather than raise."""
+        panel = AgentPanel(user_skills_dir=tmp_path / "skills", plugins_dir=tmp_path / "plugins")
+
+        def broken_scan() -> None:
+            raise PermissionError("no access")
+
+        monkeypatch.setattr(panel, "scan", broken_scan)
+        results = panel.run_all_agents()
+
+        assert [r.agent_name for r in results] == ["catalog", "workflow-analyzer", "quality-scorer"]
+        assert all(r.error == "Scan failed: PermissionError: no access" for r in results)
+
+    def test_scan_timeout(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """A hung scan should time out like an agent."""
+        panel = AgentPanel(
+            user_skills_dir=tmp_path / "skills",
+            plugins_dir=tmp_path / "plugins",
+            agent_timeout_s=0.2,
+        )
+        release = threading.Event()
+        monkeypatch.setattr(panel, "scan", lambda: release.wait(5))
+
+        started = time.monotonic()
+        results = panel.run_all_agents()
+        release.set()
+
+        assert time.monotonic() - started < 1.5
+        assert all("Scan timed out" in r.error for r in results)
+
+    def test_agents_run_concurrently_and_record_wall_time(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Agents should overlap, and each result should carry its own duration."""
+        panel = AgentPanel(
+            user_skills_dir=tmp_path / "skills",
+            plugins_dir=tmp_path / "plugins",
+        )
+
+        def sleeper(name: str):
+            def run(snapshot) -> AgentResult:
+                time.sleep(0.3)
+                return AgentResult(agent_name=name, gaps=[], artifacts_scanned=0)
+            return run
+
+        for attr, name in [
+            ("_run_catalog_agent", "catalog"),
+            ("_run_workflow_agent", "workflow-analyzer"),
+            ("_run_quality_agent", "quality-scorer"),
+        ]:
+            monkeypatch.setattr(panel, attr, sleeper(name))
+
+        started = time.monotonic()
+        results = panel.run_all_agents()
+
+        assert time.monotonic() - started < 0.8
+        assert all(r.duration_s >= 0.3 for r in results)
@@ -35,3 +35,17 @@ class TestRunCommand:
         assert result.returncode == 0
         assert "Created run:" in result.stdout
         assert "Dry run" in result.stdout
+
+    def test_run_mock_meters_usage_through_adapter(self, tmp_path: Path) -> None:
+        """A --mock run goes through SubagentAdapter and reports metered usage."""
+        result = subprocess.run(
+            ["uv", "run", "bin/ecosystem-builder", "run", "--artifacts", "1", "--mock"],
+            capture_output=True,
+            text=True,
+            cwd=PROJECT_DIR,
+            env={**os.environ, "HOME": str(tmp_path)},
+        )
+
+        assert result.returncode == 0
+        assert "Run complete:" in result.stdout
+        assert "Tokens: 0" in result.stdout
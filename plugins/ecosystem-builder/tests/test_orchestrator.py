@@ -1,12 +1,15 @@
 """Tests for orchestrator."""
 
+import threading
+import time
 from pathlib import Path
 from unittest.mock import Mock
 
 import pytest
 
 from lib.orchestrator import Orchestrator
-from lib.state import StateManager
+from lib.state import RunManifest, StateManager
+from lib.task_adapter import MockSubagentServer, SubagentAdapter
 
 
 class TestOrchestrator:
@@ -65,6 +68,229 @@ class TestOrchestrator:
         assert "run_complete" in log_content
 
 
+class TestOrchestratorPipeline:
+    """Tests for concurrent builds."""
+
+    def make_orchestrator(self, tmp_path: Path, artifact_limit: int, workers: int) -> Orchestrator:
+        state_manager = StateManager(state_dir=tmp_path / "state")
+        orchestrator = Orchestrator(
+            manifest=state_manager.create_run(artifact_limit=artifact_limit),
+            staging_dir=tmp_path / "staging",
+            build_workers=workers,
+        )
+        orchestrator._validate = Mock(return_value=True)
+        return orchestrator
+
+    def test_builds_run_concurrently(self, tmp_path: Path) -> None:
+        """Builds should overlap rather than run back to back."""
+        orchestrator = self.make_orchestrator(tmp_path, artifact_limit=4, workers=4)
+        orchestrator._analyze = Mock(return_value=[{"gap_id": f"gap-{i}"} for i in range(4)])
+        # Each build waits for all four to be running; serial builds would break the barrier
+        barrier = threading.Barrier(4, timeout=5)
+
+        def build(gap):
+            barrier.wait()
+            return {"name": gap["gap_id"], "content": "content"}
+
+        orchestrator._build = build
+        orchestrator.run()
+
+        assert orchestrator.manifest.progress.passed == 4
+        assert sorted(p.name for p in (tmp_path / "staging" / "skills").iterdir()) == [
+            "gap-0", "gap-1", "gap-2", "gap-3",
+        ]
+
+    def test_concurrency_never_overshoots_budget(self, tmp_path: Path) -> None:
+        """No more builds start than the artifact budget allows."""
+        orchestrator = self.make_orchestrator(tmp_path, artifact_limit=3, workers=4)
+        orchestrator._analyze = Mock(return_value=[{"gap_id": f"gap-{i}"} for i in range(8)])
+        started = []
+        lock = threading.Lock()
+
+        def build(gap):
+            with lock:
+                started.append(gap["gap_id"])
+            time.sleep(0.05)
+            return {"name": gap["gap_id"], "content": "content"}
+
+        orchestrator._build = build
+        orchestrator.run()
+
+        assert len(started) == 3
+        assert orchestrator.manifest.budget.artifacts.used == 3
+        assert orchestrator.manifest.budget.artifacts.reserved == 0
+        assert orchestrator.manifest.completion_reason == "budget_exhausted"
+
+    def test_failed_build_frees_its_slot(self, tmp_path: Path) -> None:
+        """A build that fails returns its reservation to the next gap."""
+        orchestrator = self.make_orchestrator(tmp_path, artifact_limit=2, workers=2)
+        orchestrator._analyze = Mock(return_value=[{"gap_id": f"gap-{i}"} for i in range(4)])
+        orchestrator._build = lambda gap: None if gap["gap_id"] == "gap-0" else {
+            "name": gap["gap_id"], "content": "content",
+        }
+
+        orchestrator.run()
+
+        assert orchestrator.manifest.progress.built == 2
+        assert orchestrator.build_queue == [{"gap_id": "gap-3"}]
+
+    def test_build_error_fails_run(self, tmp_path: Path) -> None:
+        """An exception in a build worker should fail the run."""
+        orchestrator = self.make_orchestrator(tmp_path, artifact_limit=2, workers=2)
+        orchestrator._analyze = Mock(return_value=[{"gap_id": "gap-0"}])
+        orchestrator._build = Mock(side_effect=OSError("disk full"))
+
+        with pytest.raises(OSError):
+            orchestrator.run()
+        assert orchestrator.manifest.status == "failed"
+
+
+class TestOrchestratorBudgetMetering:
+    """Tests for time, token and cost budgets."""
+
+    def test_elapsed_time_is_metered(self, tmp_path: Path) -> None:
+        """hours.used should reflect wall-clock time and be saved."""
+        state_manager = StateManager(state_dir=tmp_path / "state")
+        manifest = state_manager.create_run(artifact_limit=1)
+        orchestrator = Orchestrator(manifest=manifest, staging_dir=tmp_path / "staging")
+        orchestrator._analyze = Mock(return_value=[{"gap_id": "gap-1"}])
+        orchestrator._build = lambda gap: time.sleep(0.05) or {"name": "skill-1", "content": "c"}
+        orchestrator._validate = Mock(return_value=True)
+
+        orchestrator.run()
+
+        assert manifest.budget.hours.used >= 0.05 / 3600
+        assert RunManifest.load(manifest.run_dir).budget.hours.used == manifest.budget.hours.used
+
+    def test_exhausted_usage_prevents_builds(self, tmp_path: Path) -> None:
+        """No build starts once reported cost exceeds the budget."""
+        state_manager = StateManager(state_dir=tmp_path / "state")
+        manifest = state_manager.create_run(artifact_limit=3, cost_limit=1.0)
+        orchestrator = Orchestrator(manifest=manifest, staging_dir=tmp_path / "staging")
+        orchestrator._analyze = Mock(return_value=[{"gap_id": "gap-1"}])
+        orchestrator._build = Mock()
+
+        orchestrator.record_usage(tokens=1000, cost_usd=1.5)
+        orchestrator.run()
+
+        orchestrator._build.assert_not_called()
+        assert manifest.completion_reason == "budget_exhausted"
+
+    def test_time_budget_cancels_in_flight_builds(self, tmp_path: Path) -> None:
+        """Running out of time should abandon builds still running."""
+        state_manager = StateManager(state_dir=tmp_path / "state")
+        manifest = state_manager.create_run(artifact_limit=3, hour_limit=0.2 / 3600)
+        orchestrator = Orchestrator(manifest=manifest, staging_dir=tmp_path / "staging", build_workers=2)
+        gaps = [{"gap_id": f"gap-{i}"} for i in range(3)]
+        orchestrator._analyze = Mock(return_value=gaps)
+        release = threading.Event()
+        orchestrator._build = lambda gap: release.wait(5) and None
+        orchestrator._validate = Mock(return_value=True)
+
+        start = time.monotonic()
+        orchestrator.run()
+        release.set()
+
+        assert time.monotonic() - start < 2.0
+        assert manifest.completion_reason == "budget_exhausted"
+        assert manifest.progress.built == 0
+        assert manifest.budget.artifacts.used == manifest.budget.artifacts.reserved == 0
+        assert orchestrator.build_queue == gaps
+        assert "build_cancelled" in (manifest.run_dir / "log.jsonl").read_text()
+
+    def test_finished_work_is_kept_when_budget_runs_out(self, tmp_path: Path) -> None:
+        """Results already in are staged; only unfinished builds are cancelled."""
+        state_manager = StateManager(state_dir=tmp_path / "state")
+        manifest = state_manager.create_run(artifact_limit=3)
+        orchestrator = Orchestrator(manifest=manifest, staging_dir=tmp_path / "staging", build_workers=2)
+        orchestrator._analyze = Mock(return_value=[{"gap_id": "gap-0"}, {"gap_id": "gap-1"}])
+        release = threading.Event()
+
+        def build(gap):
+            if gap["gap_id"] == "gap-1":
+                release.wait(5)
+                return None
+            return {"name": "skill-0", "content": "c"}
+
+        orchestrator._build = build
+        orchestrator._validate = Mock(return_value=True)
+        orchestrator._usage_exhausted = Mock(return_value=True)
+
+        orchestrator.run()
+        release.set()
+
+        assert manifest.progress.passed == 1
+        assert manifest.budget.artifacts.used == 1
+        assert orchestrator.build_queue == [{"gap_id": "gap-1"}]
+        assert (tmp_path / "staging" / "skills" / "skill-0").exists()
+
+    def test_pending_validation_is_finished_when_budget_runs_out(self, tmp_path: Path) -> None:
+        """A built artifact still being validated is staged, not sent back to the queue."""
+        state_manager = StateManager(state_dir=tmp_path / "state")
+        manifest = state_manager.create_run(artifact_limit=3, cost_limit=1.0)
+        orchestrator = Orchestrator(manifest=manifest, staging_dir=tmp_path / "staging", build_workers=2)
+        orchestrator._analyze = Mock(return_value=[{"gap_id": "gap-0"}, {"gap_id": "gap-1"}])
+        validating, release = threading.Event(), threading.Event()
+
+        def build(gap):
+            if gap["gap_id"] == "gap-0":
+                return {"name": "skill-0", "content": "c"}
+            assert validating.wait(5)
+            orchestrator.record_usage(tokens=0, cost_usd=2.0)
+            release.wait(5)
+            return None
+
+        def validate(artifact):
+            validating.set()
+            time.sleep(0.1)
+            return True
+
+        orchestrator._build = build
+        orchestrator._validate = validate
+
+        orchestrator.run()
+        release.set()
+
+        progress = manifest.progress
+        assert progress.built == progress.passed + progress.failed == 1
+        assert manifest.budget.artifacts.used == 1
+        assert orchestrator.build_queue == [{"gap_id": "gap-1"}]
+        assert (tmp_path / "staging" / "skills" / "skill-0").exists()
+
+    def test_adapter_usage_is_metered(self, tmp_path: Path) -> None:
+        """Tokens and cost reported by the adapter count against the budget."""
+        state_manager = StateManager(state_dir=tmp_path / "state")
+        manifest = state_manager.create_run(artifact_limit=5, cost_limit=2.5)
+        server = MockSubagentServer(latency_s=0.02, tokens=100, cost_usd=1.0)
+        with SubagentAdapter(send=server.send) as adapter:
+            orchestrator = Orchestrator(
+                manifest=manifest,
+                staging_dir=tmp_path / "staging",
+                subagent_callable=adapter,
+            )
+            orchestrator._analyze = Mock(return_value=[
+                {
+                    "gap_id": f"gap-{i}",
+                    "gap_type": "workflow_hole",
+                    "title": f"workflow-{i}",
+                    "description": "Complex workflow",
+                    "source_agent": "workflow",
+                    "confidence": 0.5,
+                    "priority": 1,
+                }
+                for i in range(5)
+            ])
+            orchestrator._validate = Mock(return_value=True)
+            orchestrator.run()
+
+        assert manifest.completion_reason == "budget_exhausted"
+        assert manifest.budget.cost_usd.used == adapter.cost_usd
+        assert 2.5 <= manifest.budget.cost_usd.used < 5.0
+        assert manifest.budget.tokens.used == 100 * manifest.budget.cost_usd.used
+        # The build that tripped the limit is already paid for, so it is kept
+        assert manifest.progress.passed <= 3
+
+
 class TestOrchestratorAnalyze:
     """Tests for orchestrator analyze phase."""
 
@@ -0,0 +1,182 @@
+"""Tests for the persistent scan cache."""
+
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from lib.agents import AgentPanel
+from lib.orchestrator import Orchestrator
+from lib.scan_cache import ScanCache
+from lib.snapshot import EcosystemSnapshot
+from lib.state import StateManager
+
+
+def age(*paths: Path) -> None:
+    """Backdate paths so their timestamps are trusted by the cache."""
+    past = time.time() - 60
+    for path in paths:
+        os.utime(path, (past, past))
+
+
+def make_skill(skills_dir: Path, name: str, content: str) -> Path:
+    """Create a settled skill directory with a SKILL.md."""
+    skill_dir = skills_dir / name
+    skill_dir.mkdir(parents=True)
+    (skill_dir / "SKILL.md").write_text(content)
+    age(skill_dir / "SKILL.md", skill_dir)
+    return skill_dir
+
+
+@pytest.fixture
+def read_counter(monkeypatch: pytest.MonkeyPatch) -> list[Path]:
+    """Record every Path.read_text call."""
+    reads: list[Path] = []
+    original = Path.read_text
+
+    def counting_read_text(self: Path, *args, **kwargs) -> str:
+        reads.append(self)
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "read_text", counting_read_text)
+    return reads
+
+
+class TestScanCache:
+    """Tests for reusing scan results."""
+
+    def test_unchanged_skills_are_not_reread(self, tmp_path: Path, read_counter: list[Path]) -> None:
+        """A second scan should take unchanged skills from the cache."""
+        skills_dir = tmp_path / "skills"
+        for name in ["a", "b"]:
+            make_skill(skills_dir, name, f"---\nname: {name}\ndescription: D\n---\nBefore commit.")
+        cache_file = tmp_path / "scan-cache.json"
+
+        cache = ScanCache.load(cache_file)
+        first = EcosystemSnapshot.scan(skills_dir, tmp_path / "plugins", cache=cache)
+        cache.save()
+        skill_reads = [p for p in read_counter if p.name == "SKILL.md"]
+        assert len(skill_reads) == 2
+
+        read_counter.clear()
+        cache = ScanCache.load(cache_file)
+        second = EcosystemSnapshot.scan(skills_dir, tmp_path / "plugins", cache=cache)
+
+        assert not [p for p in read_counter if p.name == "SKILL.md"]
+        assert (cache.hits, cache.misses) == (2, 0)
+        assert second.user_skills == first.user_skills
+        assert second.user_skills[0].mentions_hook_trigger
+
+    def test_changed_skill_is_rescanned(self, tmp_path: Path) -> None:
+        """Edits to SKILL.md or the directory structure invalidate the entry."""
+        skills_dir = tmp_path / "skills"
+        skill_dir = make_skill(skills_dir, "a", "---\nname: a\n---\nShort")
+        cache_file = tmp_path / "scan-cache.json"
+        cache = ScanCache.load(cache_file)
+        EcosystemSnapshot.scan(skills_dir, tmp_path / "plugins", cache=cache)
+        cache.save()
+
+        (skill_dir / "SKILL.md").write_text("---\nname: a\ndescription: Now described\n---\nShort")
+        (skill_dir / "examples").mkdir()
+        age(skill_dir / "SKILL.md", skill_dir)
+
+        cache = ScanCache.load(cache_file)
+        skill = EcosystemSnapshot.scan(skills_dir, tmp_path / "plugins", cache=cache).user_skills[0]
+        assert cache.misses == 1
+        assert skill.frontmatter["description"] == "Now described"
+        assert skill.has_examples
+
+    def test_recent_timestamps_are_not_trusted(self, tmp_path: Path) -> None:
+        """Files modified moments ago are rescanned even if stamps match."""
+        skills_dir = tmp_path / "skills"
+        skill_dir = skills_dir / "a"
+        skill_dir.mkdir(parents=True)
+        (skill_dir / "SKILL.md").write_text("---\nname: a\n---\n")
+        cache = ScanCache(tmp_path / "scan-cache.json")
+        EcosystemSnapshot.scan(skills_dir, tmp_path / "plugins", cache=cache)
+        cache.save()
+
+        EcosystemSnapshot.scan(skills_dir, tmp_path / "plugins", cache=cache)
+        assert cache.hits == 0
+
+    def test_deleted_skills_are_pruned(self, tmp_path: Path) -> None:
+        """Entries for skills that no longer exist are dropped on save."""
+        skills_dir = tmp_path / "skills"
+        make_skill(skills_dir, "a", "---\nname: a\n---\n")
+        skill_b = make_skill(skills_dir, "b", "---\nname: b\n---\n")
+        cache = ScanCache(tmp_path / "scan-cache.json")
+        EcosystemSnapshot.scan(skills_dir, tmp_path / "plugins", cache=cache)
+        cache.save()
+
+        (skill_b / "SKILL.md").unlink()
+        skill_b.rmdir()
+        EcosystemSnapshot.scan(skills_dir, tmp_path / "plugins", cache=cache)
+        cache.save()
+
+        assert cache.get(str(skill_b)) is None
+        assert cache.get(str(skills_dir / "a")) is not None
+
+    def test_cached_frontmatter_matches_fresh_scan(self, tmp_path: Path) -> None:
+        """YAML dates and non-string keys look the same from the cache."""
+        skills_dir = tmp_path / "skills"
+        make_skill(skills_dir, "a", "---\nname: a\ncreated: 2024-01-01\n1: one\n---\n")
+        cache_file = tmp_path / "scan-cache.json"
+        cache = ScanCache.load(cache_file)
+        fresh = EcosystemSnapshot.scan(skills_dir, tmp_path / "plugins", cache=cache).user_skills[0]
+        cache.save()
+
+        cache = ScanCache.load(cache_file)
+        cached = EcosystemSnapshot.scan(skills_dir, tmp_path / "plugins", cache=cache).user_skills[0]
+
+        assert cache.hits == 1
+        assert dict(fresh.frontmatter) == {"name": "a", "created": "2024-01-01", "1": "one"}
+        assert cached == fresh
+
+    def test_save_failure_does_not_fail_scan(self, tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+        """An unwritable cache location is logged and the scan still returns."""
+        skills_dir = tmp_path / "skills"
+        make_skill(skills_dir, "a", "---\nname: a\n---\n")
+        (tmp_path / "not-a-dir").write_text("")
+        panel = AgentPanel(
+            user_skills_dir=skills_dir,
+            plugins_dir=tmp_path / "plugins",
+            scan_cache=ScanCache(tmp_path / "not-a-dir" / "scan-cache.json"),
+        )
+
+        snapshot = panel.scan()
+
+        assert [s.name for s in snapshot.user_skills] == ["a"]
+        assert "Continuing without saving the scan cache" in caplog.text
+
+    def test_corrupt_cache_starts_empty(self, tmp_path: Path) -> None:
+        """An unreadable cache file should be ignored, not fail the run."""
+        cache_file = tmp_path / "scan-cache.json"
+        cache_file.write_text("{not json")
+        assert ScanCache.load(cache_file).get("anything") is None
+
+
+class TestOrchestratorScanCache:
+    """Tests for the cache across orchestrator runs."""
+
+    def test_full_rescan_bypasses_cache(self, tmp_path: Path) -> None:
+        """full_rescan should re-read every skill but refresh the cache."""
+        skills_dir = tmp_path / "skills"
+        make_skill(skills_dir, "a", "---\nname: a\n---\n")
+        state_manager = StateManager(state_dir=tmp_path / "state")
+
+        def analyze(full_rescan: bool) -> ScanCache:
+            orchestrator = Orchestrator(
+                manifest=state_manager.create_run(artifact_limit=1),
+                staging_dir=tmp_path / "staging",
+                user_skills_dir=skills_dir,
+                plugins_dir=tmp_path / "plugins",
+                full_rescan=full_rescan,
+            )
+            orchestrator._analyze()
+            return orchestrator.scan_cache
+
+        assert analyze(full_rescan=False).misses == 1
+        assert analyze(full_rescan=False).hits == 1
+        assert analyze(full_rescan=True).hits == 0
+        assert (tmp_path / "state" / "scan-cache.json").exists()
@@ -0,0 +1,95 @@
+"""Tests for the shared ecosystem snapshot."""
+
+import dataclasses
+from pathlib import Path
+
+import pytest
+
+from lib.agents import AgentPanel
+from lib.snapshot import EcosystemSnapshot, parse_frontmatter
+
+
+def make_skill(skills_dir: Path, name: str, content: str, *subdirs: str) -> Path:
+    """Create a skill directory with SKILL.md and optional subdirectories."""
+    skill_dir = skills_dir / name
+    skill_dir.mkdir(parents=True)
+    (skill_dir / "SKILL.md").write_text(content)
+    for subdir in subdirs:
+        (skill_dir / subdir).mkdir()
+    return skill_dir
+
+
+class TestEcosystemSnapshot:
+    """Tests for EcosystemSnapshot.scan."""
+
+    def test_scan_collects_user_and_plugin_skills(self, tmp_path: Path) -> None:
+        """Scan should record structure, frontmatter and body for user skills."""
+        skills_dir = tmp_path / "skills"
+        make_skill(skills_dir, "alpha", "---\nname: alpha\ndescription: A\n---\n# Alpha body", "examples")
+        (skills_dir / "not-a-skill").mkdir()
+        plugins_dir = tmp_path / "plugins"
+        make_skill(plugins_dir / "plug" / "skills", "beta", "---\nname: beta\n---\n")
+        (plugins_dir / "plug" / "hooks").mkdir()
+        (plugins_dir / "plug" / "hooks" / "hooks.json").write_text("{}")
+
+        snapshot = EcosystemSnapshot.scan(skills_dir, plugins_dir)
+
+        assert [s.name for s in snapshot.user_skills] == ["alpha"]
+        alpha = snapshot.user_skills[0]
+        assert alpha.has_examples and not alpha.has_references and not alpha.has_scripts
+        assert alpha.frontmatter["description"] == "A"
+        assert alpha.body_length == len("# Alpha body")
+        assert alpha.size == alpha.skill_md.stat().st_size
+
+        beta = snapshot.plugin_skills[0]
+        assert beta.source == "plugin"
+        assert beta.has_hooks
+        assert not beta.readable  # plugin skills are catalogued, not read
+
+    def test_scan_missing_directories(self, tmp_path: Path) -> None:
+        """Missing directories should produce an empty snapshot."""
+        snapshot = EcosystemSnapshot.scan(tmp_path / "none", tmp_path / "nothing")
+        assert snapshot.all_skills == ()
+
+    def test_snapshot_is_immutable(self, tmp_path: Path) -> None:
+        """Agents share the snapshot, so it must not be modifiable."""
+        skills_dir = tmp_path / "skills"
+        make_skill(skills_dir, "alpha", "---\nname: alpha\n---\n")
+        skill = EcosystemSnapshot.scan(skills_dir, tmp_path / "plugins").user_skills[0]
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            skill.name = "other"  # type: ignore[misc]
+        with pytest.raises(TypeError):
+            skill.frontmatter["name"] = "other"  # type: ignore[index]
+
+    def test_parse_frontmatter_falls_back_on_bad_yaml(self) -> None:
+        """Malformed YAML should fall back to key:value parsing."""
+        assert parse_frontmatter("---\nname: x\ndescription: [unclosed\n---\n") == {
+            "name": "x",
+            "description": "[unclosed",
+        }
+
+
+class TestSharedSnapshot:
+    """Tests for agents sharing one scan."""
+
+    def test_each_skill_file_read_once(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """run_all_agents should read every SKILL.md a single time."""
+        skills_dir = tmp_path / "skills"
+        for name in ["a", "b", "c"]:
+            make_skill(skills_dir, name, f"---\nname: {name}\n---\nBefore commit, run checks.")
+
+        reads: list[Path] = []
+        original = Path.read_text
+
+        def counting_read_text(self: Path, *args, **kwargs) -> str:
+            reads.append(self)
+            return original(self, *args, **kwargs)
+
+        monkeypatch.setattr(Path, "read_text", counting_read_text)
+        panel = AgentPanel(user_skills_dir=skills_dir, plugins_dir=tmp_path / "plugins")
+        results = panel.run_all_agents()
+
+        assert sorted(p.parent.name for p in reads) == ["a", "b", "c"]
+        assert all(r.success for r in results)
+        assert any("Missing hook" in g.title for g in results[1].gaps)
@@ -1,12 +1,21 @@
 """Tests for Task tool adapter."""
 
+import asyncio
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
 import pytest
 
+from lib.skill_generator import SkillGeneratorAgent
 from lib.task_adapter import (
     create_dynamic_mock_callable,
     create_mock_callable,
     create_subagent_callable,
+    MockSubagentServer,
+    SubagentAdapter,
     SubagentConfig,
+    SubagentReply,
+    TransientSubagentError,
 )
 
 
@@ -131,3 +140,204 @@ class TestSubagentConfigValidation:
         # Maximum valid timeout
         config_max = SubagentConfig(timeout_ms=600000)
         assert config_max.timeout_ms == 600000
+
+    def test_batching_requires_batch_transport(self) -> None:
+        """batch_size > 1 needs a transport that accepts several prompts."""
+        with pytest.raises(ValueError, match="requires a send_batch transport"):
+            SubagentAdapter(send=MockSubagentServer().send, config=SubagentConfig(batch_size=2))
+
+
+class TestSubagentAdapter:
+    """Tests for the async subagent adapter."""
+
+    def test_plugs_into_skill_generator(self) -> None:
+        """The adapter is a drop-in llm_callable."""
+        server = MockSubagentServer()
+        with SubagentAdapter(send=server.send) as adapter:
+            agent = SkillGeneratorAgent(llm_callable=adapter)
+            result = agent.generate({
+                "gap_id": "gap-1",
+                "gap_type": "workflow_hole",
+                "title": "ci-cd-integration",
+                "description": "Complex CI/CD workflow",
+                "source_agent": "workflow",
+                "confidence": 0.5,
+                "priority": 1,
+            })
+
+        assert result.success
+        assert "name: ci-cd-integration" in result.content
+        assert len(server.requests) == 1
+
+    def test_limits_concurrency_across_threads(self) -> None:
+        """Synchronous callers share one concurrency limit."""
+        server = MockSubagentServer(latency_s=0.05)
+        with SubagentAdapter(send=server.send, config=SubagentConfig(max_concurrency=2)) as adapter:
+            with ThreadPoolExecutor(max_workers=6) as pool:
+                responses = list(pool.map(adapter, [f"Title: skill-{i}" for i in range(6)]))
+
+        assert len(responses) == 6
+        assert server.max_in_flight == 2
+
+    def test_retries_transient_failures(self) -> None:
+        """Transient failures are retried with backoff until they succeed."""
+        server = MockSubagentServer(failures=2)
+        config = SubagentConfig(max_retries=2, retry_backoff_ms=10)
+        with SubagentAdapter(send=server.send, config=config) as adapter:
+            assert "name: retried" in adapter("Title: retried")
+        assert len(server.requests) == 3
+
+    def test_gives_up_after_max_retries(self) -> None:
+        """The last failure is raised once retries are used up."""
+        server = MockSubagentServer(failures=5)
+        config = SubagentConfig(max_retries=1, retry_backoff_ms=10)
+        with SubagentAdapter(send=server.send, config=config) as adapter:
+            with pytest.raises(TransientSubagentError):
+                adapter("Title: x")
+        assert len(server.requests) == 2
+
+    def test_other_errors_are_not_retried(self) -> None:
+        """Errors that aren't transient fail at once."""
+        def respond(prompt: str) -> str:
+            raise ValueError("bad prompt")
+
+        server = MockSubagentServer(respond=respond)
+        with SubagentAdapter(send=server.send) as adapter:
+            with pytest.raises(ValueError, match="bad prompt"):
+                adapter("Title: x")
+        assert len(server.requests) == 1
+
+    def test_enforces_timeout(self) -> None:
+        """A request is abandoned after timeout_ms."""
+        server = MockSubagentServer(latency_s=5.0)
+        config = SubagentConfig(timeout_ms=1000, max_retries=0)
+        start = time.monotonic()
+        with SubagentAdapter(send=server.send, config=config) as adapter:
+            with pytest.raises(TimeoutError):
+                adapter("Title: slow")
+        assert time.monotonic() - start < 2.0
+
+    def test_rate_limits_requests(self) -> None:
+        """Requests are spaced by the token bucket."""
+        server = MockSubagentServer()
+        config = SubagentConfig(requests_per_minute=1200)  # one per 50ms
+        adapter = SubagentAdapter(send=server.send, config=config)
+
+        async def run() -> None:
+            await asyncio.gather(*(adapter.generate(f"Title: s{i}") for i in range(4)))
+
+        asyncio.run(run())
+        gaps = [b - a for a, b in zip(server.request_times, server.request_times[1:])]
+        assert len(gaps) == 3
+        assert all(gap >= 0.04 for gap in gaps)
+
+    def test_batches_prompts(self) -> None:
+        """Prompts arriving together are sent as one request."""
+        server = MockSubagentServer()
+        config = SubagentConfig(batch_size=3, batch_window_ms=200)
+        adapter = SubagentAdapter(send_batch=server.send_batch, config=config)
+
+        async def run() -> list[str]:
+            return await asyncio.gather(*(adapter.generate(f"Title: s{i}") for i in range(4)))
+
+        start = time.monotonic()
+        responses = asyncio.run(run())
+
+        assert [len(prompts) for prompts in server.requests] == [3, 1]
+        assert [r.split("\n")[1] for r in responses] == [f"name: s{i}" for i in range(4)]
+        assert time.monotonic() - start >= 0.2  # the partial batch waited for the window
+
+    def test_reports_usage(self) -> None:
+        """Usage from SubagentReply is totalled and passed to listeners."""
+        server = MockSubagentServer(tokens=250, cost_usd=0.01)
+        usage = []
+        with SubagentAdapter(send=server.send) as adapter:
+            adapter.add_usage_listener(lambda tokens, cost: usage.append((tokens, cost)))
+            adapter("Title: a")
+            adapter("Title: b")
+
+        assert usage == [(250, 0.01), (250, 0.01)]
+        assert adapter.tokens_used == 500
+
+    def test_reports_usage_of_failed_attempts(self) -> None:
+        """Billed usage carried by a failure is counted even though the request is retried."""
+        attempts = []
+
+        async def send(prompt: str) -> SubagentReply:
+            attempts.append(prompt)
+            if len(attempts) == 1:
+                raise TransientSubagentError("stream cut off", tokens=100, cost_usd=0.004)
+            return SubagentReply("ok", tokens=250, cost_usd=0.01)
+
+        usage = []
+        config = SubagentConfig(max_retries=1, retry_backoff_ms=10)
+        with SubagentAdapter(send=send, config=config) as adapter:
+            adapter.add_usage_listener(lambda tokens, cost: usage.append((tokens, cost)))
+            assert adapter("Title: a") == "ok"
+
+        assert usage == [(100, 0.004), (250, 0.01)]
+        assert adapter.tokens_used == 350
+
+    def test_reports_usage_of_timed_out_requests(self) -> None:
+        """Usage a transport reports before the timeout still reaches the listeners."""
+        async def send(prompt: str) -> str:
+            adapter.report_usage(40, 0.002)  # e.g. input tokens billed when the request starts
+            await asyncio.sleep(5)
+            return "late"
+
+        usage = []
+        config = SubagentConfig(timeout_ms=1000, max_retries=0)
+        with SubagentAdapter(send=send, config=config) as adapter:
+            adapter.add_usage_listener(lambda tokens, cost: usage.append((tokens, cost)))
+            with pytest.raises(TimeoutError):
+                adapter("Title: slow")
+
+        assert usage == [(40, 0.002)]
+        assert adapter.tokens_used == 40
+
+    def test_rejects_a_second_event_loop(self) -> None:
+        """The limits belong to the first loop; another loop gets a clear error."""
+        server = MockSubagentServer()
+        adapter = SubagentAdapter(send=server.send)
+
+        assert "name: a" in asyncio.run(adapter.generate("Title: a"))
+        with pytest.raises(RuntimeError, match="another event loop"):
+            asyncio.run(adapter.generate("Title: b"))
+        with pytest.raises(RuntimeError, match="another event loop"):
+            adapter("Title: c")
+        adapter.close()
+        assert len(server.requests) == 1
+
+    def test_async_callers_on_the_adapter_loop_share_limits(self) -> None:
+        """Synchronous calls bind the adapter to its own loop, so other loops are rejected."""
+        server = MockSubagentServer()
+        with SubagentAdapter(send=server.send) as adapter:
+            adapter("Title: a")
+            with pytest.raises(RuntimeError, match="another event loop"):
+                asyncio.run(adapter.generate("Title: b"))
+
+    def test_close_releases_calls_in_flight(self) -> None:
+        """close() cancels blocked callers instead of leaving them waiting, and later calls fail."""
+        server = MockSubagentServer(latency_s=5.0)
+        adapter = SubagentAdapter(send=server.send)
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            call = pool.submit(adapter, "Title: slow")
+            while not server.requests:
+                time.sleep(0.01)
+            adapter.close()
+            with pytest.raises(CancelledError):
+                call.result(timeout=1)
+
+        with pytest.raises(RuntimeError, match="closed"):
+            adapter("Title: again")
+
+    def test_cancel_abandons_calls_in_flight(self) -> None:
+        """cancel() releases callers blocked on slow requests."""
+        server = MockSubagentServer(latency_s=5.0)
+        with SubagentAdapter(send=server.send) as adapter, ThreadPoolExecutor(max_workers=1) as pool:
+            call = pool.submit(adapter, "Title: slow")
+            while not server.requests:
+                time.sleep(0.01)
+            adapter.cancel()
+            with pytest.raises(CancelledError):
+                call.result(timeout=1)
@@ -7,6 +7,9 @@ from persistent_tasks.storage import (
     Priority,
     get_tasks_file,
 )
+from persistent_tasks.journal import JournalTaskStore
+from persistent_tasks.sqlite_store import SqliteTaskStore
+from persistent_tasks.backends import open_store
 from persistent_tasks.server import create_server
 
 __version__ = "0.1.0"
@@ -16,5 +19,8 @@ __all__ = [
     "TaskStatus",
     "Priority",
     "get_tasks_file",
+    "JournalTaskStore",
+    "SqliteTaskStore",
+    "open_store",
     "create_server",
 ]
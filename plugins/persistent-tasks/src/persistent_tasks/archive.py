@@ -0,0 +1,103 @@
+"""Cold storage for finished tasks: an append-only, gzip-compressed archive."""
+
+from __future__ import annotations
+
+import gzip
+import os
+import zlib
+from bisect import bisect_right
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from persistent_tasks import codec
+
+ARCHIVE_ENV = "PERSISTENT_TASKS_ARCHIVE_DAYS"
+
+
+def archive_path_for(path: Path) -> Path:
+    """Get the archive file that belongs to a tasks file."""
+    return path.with_name(f"{path.stem}.archive.jsonl.gz")
+
+
+def archive_days_from_environment() -> float | None:
+    """Age in days after which finished tasks are archived automatically.
+
+    Raises:
+        ValueError: If PERSISTENT_TASKS_ARCHIVE_DAYS is not a number
+    """
+    value = os.environ.get(ARCHIVE_ENV)
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"{ARCHIVE_ENV} must be a number of days, got: {value!r}") from None
+
+
+def add_ranges(ranges: list[list[int]], ids: Iterable[int]) -> list[list[int]]:
+    """Merge IDs into a sorted list of inclusive [first, last] ranges."""
+    merged: list[list[int]] = []
+    points = [[task_id, task_id] for task_id in ids]
+    for first, last in sorted([*ranges, *points]):
+        if merged and first <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], last)
+        else:
+            merged.append([first, last])
+    return merged
+
+
+def in_ranges(ranges: list[list[int]], task_id: int) -> bool:
+    """Check whether an ID falls in one of the sorted ranges."""
+    i = bisect_right(ranges, task_id, key=lambda r: r[0]) - 1
+    return i >= 0 and ranges[i][1] >= task_id
+
+
+def append_archive(path: Path, records: list[dict], committed_size: int) -> int:
+    """Append records to the archive as one new gzip member.
+
+    The file is first cut back to ``committed_size``, the size recorded
+    by the last archive run that completed, dropping any member left by
+    a run that crashed before its tasks file was saved. The caller
+    records the returned size the same way once its own save succeeds.
+
+    Returns:
+        Size of the archive including the new member
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = b"".join(codec.dumps(record) + b"\n" for record in records)
+    with open(path, "ab") as f:
+        if f.tell() > committed_size:
+            f.truncate(committed_size)
+        f.write(gzip.compress(payload))
+        f.flush()
+        os.fsync(f.fileno())
+        return f.tell()
+
+
+def iter_archive(path: Path, ranges: list[list[int]]) -> Iterator[dict]:
+    """Stream archived task records in archive order.
+
+    Only records whose IDs are in ``ranges`` (the archived IDs the tasks
+    file knows about) are yielded, so an uncommitted or torn tail from a
+    crashed run is skipped.
+
+    Raises:
+        RuntimeError: If the archive cannot be read or is corrupt
+    """
+    try:
+        f = gzip.open(path, "rb")
+    except FileNotFoundError:
+        return
+    with f:
+        try:
+            for line in f:
+                record = codec.loads(line)
+                if in_ranges(ranges, record["id"]):
+                    yield record
+        except EOFError:
+            return  # member cut short by a crash; never committed
+        except (OSError, zlib.error, ValueError, KeyError) as e:
+            raise RuntimeError(
+                f"Failed to read archive {path}: {e}. "
+                "Archived tasks are treated as done either way; restore the file from a backup to list them."
+            ) from e
@@ -0,0 +1,50 @@
+"""Storage backend selection."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Optional
+
+from persistent_tasks.journal import JournalTaskStore, journal_path_for
+from persistent_tasks.sqlite_store import SqliteTaskStore
+from persistent_tasks.storage import TaskStore
+
+BACKEND_ENV = "PERSISTENT_TASKS_BACKEND"
+
+BACKENDS: dict[str, type[TaskStore] | type[SqliteTaskStore]] = {
+    "json": TaskStore,
+    "journal": JournalTaskStore,
+    "sqlite": SqliteTaskStore,
+}
+
+
+def open_store(path: Path, backend: Optional[str] = None) -> TaskStore | SqliteTaskStore:
+    """Open the task store at path.
+
+    Args:
+        path: Tasks file path
+        backend: Backend name; defaults to $PERSISTENT_TASKS_BACKEND, then "json"
+
+    Returns:
+        Loaded task store
+
+    Raises:
+        ValueError: If the backend name is unknown
+        RuntimeError: If stored data cannot be read
+    """
+    name = backend or os.environ.get(BACKEND_ENV) or "json"
+    if name not in BACKENDS:
+        raise ValueError(
+            f"Unknown storage backend '{name}'. Choose from: {', '.join(BACKENDS)}"
+        )
+
+    path = Path(path)
+    journal = journal_path_for(path)
+    if name != "journal" and journal.exists() and journal.stat().st_size:
+        # Fold records left by the journal backend into the snapshot first
+        store = JournalTaskStore(path)
+        store.compact()
+        store.close()
+
+    return BACKENDS[name](path)
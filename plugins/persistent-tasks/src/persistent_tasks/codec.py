@@ -0,0 +1,32 @@
+"""JSON encoding for the task files, using orjson when it is installed."""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # optional speedup: pip install persistent-tasks[fast]
+    orjson = None
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """Encode to UTF-8 JSON, two-space indented or without whitespace."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(obj, indent=2).encode()
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def loads(data: bytes | str) -> Any:
+    """Decode JSON.
+
+    Raises:
+        ValueError: If the data is not valid JSON (orjson's and json's
+            decode errors both subclass it)
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -0,0 +1,144 @@
+"""Dependency graph analytics: ordering, critical path and parallelism."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Iterable
+
+# Above this many tasks, transitive dependent counts are estimated rather
+# than exact: the exact bitsets cost O(tasks * dependencies / word size)
+EXACT_DEPENDENTS_LIMIT = 2000
+
+
+@dataclass
+class GraphAnalysis:
+    """Results of analyzing a task dependency graph.
+
+    Levels: a task with no (included) dependencies is at level 0, any
+    other task is one level above its deepest dependency. Tasks on the
+    same level can run in parallel once the levels below are done.
+
+    ``dependent_counts_exact`` is False when the graph was too large for
+    exact transitive dependent counts, and they were estimated instead.
+    """
+    order: list[int] = field(default_factory=list)
+    levels: dict[int, int] = field(default_factory=dict)
+    critical_path: list[int] = field(default_factory=list)
+    level_widths: list[int] = field(default_factory=list)
+    dependent_counts: dict[int, int] = field(default_factory=dict)
+    dependent_counts_exact: bool = True
+
+    @property
+    def critical_path_length(self) -> int:
+        """Number of tasks on the longest dependency chain."""
+        return len(self.critical_path)
+
+    @property
+    def max_width(self) -> int:
+        """Most tasks on any one level, i.e. the peak useful parallelism."""
+        return max(self.level_widths, default=0)
+
+
+def analyze_graph(
+    dependencies: dict[int, Iterable[int]],
+    exact_limit: int = EXACT_DEPENDENTS_LIMIT,
+) -> GraphAnalysis:
+    """Analyze a dependency graph given as task ID -> dependency IDs.
+
+    Dependencies on IDs that aren't keys are ignored (e.g. done tasks).
+    Ordering, levels, widths and the critical path come from one Kahn
+    topological pass, O(tasks + dependencies). Transitive dependent
+    counts are exact for up to exact_limit tasks, using integer bitsets
+    over the same order. Above that they are estimated in linear time by
+    summing over direct dependents, which counts a dependent reachable
+    along several paths more than once, capped at the number of other
+    tasks.
+
+    Raises:
+        ValueError: If the graph contains a cycle
+    """
+    deps = {
+        task_id: list(dict.fromkeys(d for d in task_deps if d in dependencies))
+        for task_id, task_deps in dependencies.items()
+    }
+    dependents: dict[int, list[int]] = {task_id: [] for task_id in deps}
+    remaining = {task_id: len(task_deps) for task_id, task_deps in deps.items()}
+    for task_id, task_deps in deps.items():
+        for dep_id in task_deps:
+            dependents[dep_id].append(task_id)
+
+    # Kahn's algorithm, first in first out: the tasks with no dependencies
+    # in ID order, then each task once its last dependency has been placed
+    order = sorted(task_id for task_id, n in remaining.items() if n == 0)
+    levels = {task_id: 0 for task_id in order}
+    via: dict[int, int] = {}
+    i = 0
+    while i < len(order):
+        task_id = order[i]
+        i += 1
+        for dependent_id in dependents[task_id]:
+            if levels[task_id] + 1 > levels.get(dependent_id, -1):
+                levels[dependent_id] = levels[task_id] + 1
+                via[dependent_id] = task_id
+            remaining[dependent_id] -= 1
+            if remaining[dependent_id] == 0:
+                order.append(dependent_id)
+
+    if len(order) < len(deps):
+        cyclic = sorted(task_id for task_id, n in remaining.items() if n > 0)
+        raise ValueError(f"Dependencies contain a cycle among tasks {cyclic}")
+
+    critical_path: list[int] = []
+    if order:
+        task_id = max(order, key=lambda t: (levels[t], -t))
+        while True:
+            critical_path.append(task_id)
+            if task_id not in via:
+                break
+            task_id = via[task_id]
+        critical_path.reverse()
+
+    level_widths = [0] * (max(levels.values(), default=-1) + 1)
+    for level in levels.values():
+        level_widths[level] += 1
+
+    exact = len(order) <= exact_limit
+    return GraphAnalysis(
+        order=order,
+        levels=levels,
+        critical_path=critical_path,
+        level_widths=level_widths,
+        dependent_counts=(exact_dependent_counts if exact else estimated_dependent_counts)(
+            order, dependents
+        ),
+        dependent_counts_exact=exact,
+    )
+
+
+def exact_dependent_counts(order: list[int], dependents: dict[int, list[int]]) -> dict[int, int]:
+    """Count each task's transitive dependents with one bitset per task."""
+    # Reverse topological order: each task's descendants are known
+    # before its dependencies are visited
+    bit = {task_id: 1 << n for n, task_id in enumerate(order)}
+    reach: dict[int, int] = {}
+    for task_id in reversed(order):
+        mask = 0
+        for dependent_id in dependents[task_id]:
+            mask |= reach[dependent_id] | bit[dependent_id]
+        reach[task_id] = mask
+    return {task_id: mask.bit_count() for task_id, mask in reach.items()}
+
+
+def estimated_dependent_counts(
+    order: list[int], dependents: dict[int, list[int]]
+) -> dict[int, int]:
+    """Estimate transitive dependents in O(tasks + dependencies).
+
+    Exact for trees; shared descendants are counted once per path.
+    """
+    cap = max(len(order) - 1, 0)
+    counts: dict[int, int] = {}
+    for task_id in reversed(order):
+        total = sum(counts[dependent_id] + 1 for dependent_id in dependents[task_id])
+        counts[task_id] = min(total, cap)
+    return counts
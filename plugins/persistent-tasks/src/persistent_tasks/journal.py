@@ -0,0 +1,252 @@
+"""Append-only journal storage backend."""
+
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Optional
+
+from persistent_tasks import codec
+from persistent_tasks.archive import add_ranges
+from persistent_tasks.storage import Task, TaskStore, WriteConflict, file_signature
+
+
+def journal_path_for(path: Path) -> Path:
+    """Get the journal file that belongs to a tasks file."""
+    return path.with_name(f"{path.stem}.journal.jsonl")
+
+
+@dataclass
+class JournalTaskStore(TaskStore):
+    """Task storage as a JSON snapshot plus an append-only JSONL journal.
+
+    The snapshot is the regular tasks.json. Each mutation appends one
+    record to tasks.journal.jsonl instead of rewriting the snapshot, and
+    loading replays the journal on top of the snapshot.
+
+    Records are flushed to the OS on every append, but fsync is batched:
+    it runs once ``sync_every`` records are pending or ``sync_interval``
+    seconds have passed since the last one (checked on append), and on
+    flush()/close(). A process crash loses nothing; a power failure can
+    lose the unsynced tail.
+
+    After ``compact_every`` records the journal is folded into a new
+    snapshot, written with the same temp-file-and-rename as TaskStore,
+    and truncated. Records carry increasing sequence numbers and the
+    snapshot stores the last one it includes (meta "journalSeq"), so a
+    crash between the rename and the truncation doesn't apply records
+    twice.
+
+    Journal records are only written by this package, so replayed tasks
+    skip validation unless ``validate=True``.
+    """
+    sync_every: int = 32
+    sync_interval: float = 1.0
+    compact_every: int = 1000
+    _journal_path: Path = field(init=False, repr=False)
+    _journal: Optional[IO[bytes]] = field(default=None, init=False, repr=False)
+    _seq: int = field(default=0, init=False, repr=False)
+    _journal_records: int = field(default=0, init=False, repr=False)
+    _unsynced: int = field(default=0, init=False, repr=False)
+    _last_sync: float = field(default=0.0, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        """Locate the journal, then load or initialize storage."""
+        self._journal_path = journal_path_for(Path(self.path))
+        super().__post_init__()
+
+    @property
+    def journal_path(self) -> Path:
+        """Path of the journal file."""
+        return self._journal_path
+
+    def signature(self) -> tuple:
+        """Identify the on-disk state of both snapshot and journal."""
+        return (file_signature(self.path), file_signature(self._journal_path))
+
+    def _disk_changed(self) -> bool:
+        """Check whether another writer touched the snapshot or journal."""
+        return self.signature() != self._synced
+
+    def _initialize(self) -> None:
+        """Create empty snapshot, keeping any journal written without one."""
+        super()._initialize()
+        self._replay()
+
+    def _load(self) -> None:
+        """Load the snapshot and replay the journal on top of it.
+
+        Raises:
+            RuntimeError: If either file cannot be read or contains invalid data.
+        """
+        super()._load()
+        self._replay()
+
+    def _replay(self) -> None:
+        """Apply journal records newer than the snapshot."""
+        self._seq = self.meta.get("journalSeq", 0)
+        self._journal_records = 0
+
+        try:
+            raw = self._journal_path.read_bytes()
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            raise RuntimeError(
+                f"Failed to read journal {self._journal_path}: {e}. "
+                "Check file permissions or delete the journal to fall back to the snapshot."
+            ) from e
+
+        lines = raw.splitlines()
+        by_id = {t.id: t for t in self.tasks}
+        applied = 0
+        torn_tail = False
+
+        for lineno, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                record = codec.loads(line)
+            except ValueError as e:
+                if lineno == len(lines) and not raw.endswith(b"\n"):
+                    # Partial last write from a crash; the mutation never completed
+                    torn_tail = True
+                    break
+                raise RuntimeError(
+                    f"Failed to parse journal {self._journal_path} line {lineno}: {e}. "
+                    "Fix the line or delete the journal to fall back to the snapshot."
+                ) from e
+
+            self._journal_records += 1
+            try:
+                seq = record["seq"]
+                if seq <= self._seq:
+                    continue
+                self._apply(record, by_id)
+            except (KeyError, ValueError, TypeError) as e:
+                raise RuntimeError(
+                    f"Invalid journal record in {self._journal_path} line {lineno}: {e}. "
+                    "Fix the record or delete the journal to fall back to the snapshot."
+                ) from e
+            self._seq = seq
+            applied += 1
+
+        if applied:
+            self.tasks = list(by_id.values())
+            self._reindex()
+        self._synced = self.signature()
+
+        if torn_tail:
+            # Appending after a partial line would corrupt the next record
+            self.compact()
+
+    def _apply(self, record: dict, by_id: dict[int, Task]) -> None:
+        """Apply one journal record to the tasks being replayed."""
+        op = record["op"]
+        if op == "put":
+            task = Task.from_dict(record["task"], validate=bool(self.validate))
+            by_id[task.id] = task
+            self.meta["nextId"] = max(self.meta.get("nextId", 1), record["nextId"])
+        elif op == "batch":
+            for inner in record["ops"]:
+                self._apply(inner, by_id)
+        elif op == "archive":
+            # Unlike remove, dependents keep their references
+            for task_id in record["ids"]:
+                by_id.pop(task_id, None)
+            self.meta["archived"] = add_ranges(self.meta.get("archived", []), record["ids"])
+            self.meta["archiveSize"] = record["archiveSize"]
+        elif op == "remove":
+            task_id = record["id"]
+            by_id.pop(task_id, None)
+            for t in by_id.values():
+                if task_id in t.dependencies:
+                    t.dependencies = [d for d in t.dependencies if d != task_id]
+        else:
+            raise ValueError(f"unknown op '{op}'")
+
+    def _record(
+        self,
+        changed: tuple[Task, ...] = (),
+        removed: tuple[int, ...] = (),
+        archived: tuple[int, ...] = (),
+    ) -> None:
+        """Append the mutation to the journal, compacting when it grows too long.
+
+        A mutation touching several tasks is written as one "batch"
+        record, so a torn write can't leave it half applied.
+        """
+        records = [{"op": "remove", "id": task_id} for task_id in removed]
+        for task in changed:
+            records.append({"op": "put", "task": task.to_dict(), "nextId": self.meta["nextId"]})
+        if archived:
+            records.append({"op": "archive", "ids": list(archived), "archiveSize": self.meta["archiveSize"]})
+        if not records:
+            return
+
+        if len(records) > 1:
+            records = [{"op": "batch", "ops": records}]
+        self._append(records)
+        if self._journal_records >= self.compact_every:
+            self.compact()
+
+    def _append(self, records: list[dict]) -> None:
+        """Write records as JSON lines, syncing when the batch is full.
+
+        Raises:
+            WriteConflict: If the snapshot or journal changed since loaded
+        """
+        if self._disk_changed():
+            raise WriteConflict(self._journal_path)
+
+        if self._journal is None:
+            self._journal_path.parent.mkdir(parents=True, exist_ok=True)
+            self._journal = open(self._journal_path, "ab")
+            self._last_sync = time.monotonic()
+
+        lines = []
+        for record in records:
+            self._seq += 1
+            lines.append(codec.dumps({"seq": self._seq, **record}))
+        self._journal.write(b"\n".join(lines) + b"\n")
+        self._journal.flush()
+        self._synced = self.signature()
+
+        self._journal_records += len(records)
+        self._unsynced += len(records)
+        if (
+            self._unsynced >= self.sync_every
+            or time.monotonic() - self._last_sync >= self.sync_interval
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """Fsync any journal records not yet on disk."""
+        if self._journal is not None and self._unsynced:
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def compact(self) -> None:
+        """Fold the journal into a new snapshot and truncate it."""
+        self.meta["journalSeq"] = self._seq
+        self._save()
+
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        if self._journal_path.exists():
+            self._journal_path.write_text("")
+        self._synced = self.signature()
+        self._journal_records = 0
+        self._unsynced = 0
+
+    def close(self) -> None:
+        """Sync and close the journal."""
+        if self._journal is not None:
+            self.flush()
+            self._journal.close()
+            self._journal = None
@@ -1,20 +1,140 @@
 """MCP server for persistent task management."""
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Optional
+
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent
 
+from persistent_tasks.archive import in_ranges
+from persistent_tasks.backends import open_store
+from persistent_tasks.graph import GraphAnalysis
 from persistent_tasks.storage import (
-    TaskStore,
     TaskStatus,
     Priority,
     get_tasks_file,
 )
 
 
-def create_server() -> Server:
-    """Create and configure the MCP server."""
+# analyze_tasks output limits
+ANALYSIS_ORDER_LIMIT = 50
+ANALYSIS_TOP_TASKS = 5
+
+# Tools that may modify tasks; the store's signature is re-recorded after them
+WRITE_TOOLS = {
+    "add_task", "update_task", "next_task", "remove_task",
+    "add_tasks", "update_tasks", "remove_tasks", "archive_tasks",
+}
+
+
+class StoreCache:
+    """Keeps one open store per tasks file for the life of the server.
+
+    Reusing a store avoids re-reading and re-validating every task on
+    each call. Before a store is reused, the signature of its files
+    (mtime, inode, size) is compared with the one recorded after it was
+    loaded or last written by this process. A difference means someone
+    else changed the tasks, and the store is reopened.
+
+    Tool calls go through run(), which executes them one at a time on a
+    single worker thread. The blocking file lock and file I/O stay off
+    the event loop, and calls never touch a shared store concurrently.
+    """
+
+    def __init__(self) -> None:
+        self._stores: dict[Path, tuple] = {}
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="task-store")
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run fn(*args) on the store worker thread."""
+        return await asyncio.get_running_loop().run_in_executor(self._worker, fn, *args)
+
+    def get(self, path: Path):
+        """Get the store for a tasks file, reopening it if changed on disk.
+
+        Raises:
+            RuntimeError: If stored data cannot be read
+            ValueError: If the configured backend is unknown
+        """
+        path = Path(path).resolve()
+        entry = self._stores.get(path)
+        if entry is not None:
+            store, seen = entry
+            if store.signature() == seen:
+                return store
+            del self._stores[path]
+            store.close()
+
+        store = open_store(path)
+        self._stores[path] = (store, store.signature())
+        return store
+
+    def mark_written(self, store) -> None:
+        """Record a store's own writes so they aren't taken for outside edits."""
+        self._stores[store.path] = (store, store.signature())
+
+    def close(self) -> None:
+        """Close all stores and stop the worker thread."""
+        self._worker.shutdown()
+        for store, _ in self._stores.values():
+            store.close()
+        self._stores.clear()
+
+
+def format_analysis(store, analysis: GraphAnalysis, task_id: Optional[int] = None) -> str:
+    """Render a graph analysis for the analyze_tasks tool."""
+    if task_id is not None:
+        task = store.get_task(task_id)
+        if not task:
+            return f"Task #{task_id} not found"
+        if task_id not in analysis.levels:
+            return f"#{task.id} {task.title}: done (not part of remaining work)"
+        on_path = "yes" if task_id in analysis.critical_path else "no"
+        return (
+            f"#{task.id} {task.title}\n"
+            f"Level: {analysis.levels[task_id]}\n"
+            f"Transitive dependents: {analysis.dependent_counts[task_id]}\n"
+            f"On critical path: {on_path}"
+        )
+
+    if not analysis.order:
+        return "No tasks to analyze."
+
+    path = " -> ".join(f"#{t}" for t in analysis.critical_path)
+    widths = ", ".join(str(w) for w in analysis.level_widths)
+    order = ", ".join(str(t) for t in analysis.order[:ANALYSIS_ORDER_LIMIT])
+    if len(analysis.order) > ANALYSIS_ORDER_LIMIT:
+        order += f", ... ({len(analysis.order) - ANALYSIS_ORDER_LIMIT} more)"
+
+    lines = [
+        f"Tasks: {len(analysis.order)}",
+        f"Critical path ({analysis.critical_path_length} tasks): {path}",
+        f"Levels: {len(analysis.level_widths)} (widths: {widths}; max parallel: {analysis.max_width})",
+        f"Topological order: {order}",
+    ]
+
+    top = sorted(analysis.dependent_counts.items(), key=lambda item: (-item[1], item[0]))
+    top = [(t, n) for t, n in top[:ANALYSIS_TOP_TASKS] if n > 0]
+    if top:
+        estimated = "" if analysis.dependent_counts_exact else " (estimated dependent counts)"
+        lines.append(f"Unblocks the most work{estimated}:")
+        for t, n in top:
+            task = store.get_task(t)
+            lines.append(f"  #{t} {task.title if task else ''} ({n} dependents)")
+    return "\n".join(lines)
+
+
+def create_server(stores: Optional[StoreCache] = None) -> Server:
+    """Create and configure the MCP server.
+
+    Args:
+        stores: Store cache to use; the caller is responsible for closing it
+    """
     server = Server("persistent-tasks")
+    stores = stores if stores is not None else StoreCache()
 
     @server.list_tools()
     async def list_tools() -> list[Tool]:
@@ -42,6 +162,7 @@ def create_server() -> Server:
                     "properties": {
                         "status": {"type": "string", "enum": ["pending", "in-progress", "review", "done", "deferred", "cancelled"]},
                         "blocked": {"type": "boolean", "description": "Only show blocked tasks"},
+                        "include_archived": {"type": "boolean", "description": "Also list tasks moved to the archive"},
                     },
                 },
             ),
@@ -52,6 +173,7 @@ def create_server() -> Server:
                     "type": "object",
                     "properties": {
                         "task_id": {"type": "integer", "description": "Task ID"},
+                        "include_archived": {"type": "boolean", "description": "Also look in the archive"},
                     },
                     "required": ["task_id"],
                 },
@@ -79,6 +201,8 @@ def create_server() -> Server:
                     "type": "object",
                     "properties": {
                         "start": {"type": "boolean", "description": "Mark task as in-progress"},
+                        "count": {"type": "integer", "minimum": 1, "default": 1, "description": "Number of tasks to return, for parallel workers"},
+                        "prefer_unblocking": {"type": "boolean", "description": "Break priority ties by how much downstream work a task unblocks"},
                     },
                 },
             ),
@@ -93,14 +217,99 @@ def create_server() -> Server:
                     "required": ["task_id"],
                 },
             ),
+            Tool(
+                name="add_tasks",
+                description="Add several tasks at once (all or nothing). Dependencies may use aliases of earlier tasks in the batch",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "tasks": {
+                            "type": "array",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "title": {"type": "string", "description": "Task title"},
+                                    "alias": {"type": "string", "description": "Name for referring to this task from later tasks in the batch"},
+                                    "priority": {"type": "string", "enum": ["high", "medium", "low"], "default": "medium"},
+                                    "dependencies": {"type": "array", "items": {"type": ["integer", "string"]}, "default": [], "description": "Task IDs or batch aliases"},
+                                    "description": {"type": "string", "default": ""},
+                                },
+                                "required": ["title"],
+                            },
+                        },
+                    },
+                    "required": ["tasks"],
+                },
+            ),
+            Tool(
+                name="update_tasks",
+                description="Update several tasks at once (all or nothing)",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "updates": {
+                            "type": "array",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "task_id": {"type": "integer", "description": "Task ID"},
+                                    "status": {"type": "string", "enum": ["pending", "in-progress", "review", "done", "deferred", "cancelled"]},
+                                    "priority": {"type": "string", "enum": ["high", "medium", "low"]},
+                                    "title": {"type": "string"},
+                                    "description": {"type": "string"},
+                                    "dependencies": {"type": "array", "items": {"type": "integer"}},
+                                },
+                                "required": ["task_id"],
+                            },
+                        },
+                    },
+                    "required": ["updates"],
+                },
+            ),
+            Tool(
+                name="remove_tasks",
+                description="Remove several tasks at once (all or nothing)",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "task_ids": {"type": "array", "items": {"type": "integer"}, "description": "Task IDs"},
+                    },
+                    "required": ["task_ids"],
+                },
+            ),
+            Tool(
+                name="analyze_tasks",
+                description="Analyze the dependency graph: critical path, parallel width per level, topological order, and which tasks unblock the most work",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "task_id": {"type": "integer", "description": "Show level and downstream impact of one task"},
+                        "include_done": {"type": "boolean", "description": "Include done tasks (default: remaining work only)"},
+                    },
+                },
+            ),
+            Tool(
+                name="archive_tasks",
+                description="Move done and cancelled tasks into the compressed archive; dependencies on them still count as done",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "older_than_days": {"type": "number", "minimum": 0, "description": "Only archive tasks closed at least this many days ago (default: configured age, else all)"},
+                    },
+                },
+            ),
         ]
 
     @server.call_tool()
     async def call_tool(name: str, arguments: dict) -> list[TextContent]:
         """Handle tool calls."""
+        return await stores.run(handle_tool, name, arguments, name in WRITE_TOOLS)
+
+    def handle_tool(name: str, arguments: dict, write: bool) -> list[TextContent]:
+        """Run a tool against the cached store."""
         try:
-            store = TaskStore(get_tasks_file())
-        except RuntimeError as e:
+            store = stores.get(get_tasks_file())
+        except (RuntimeError, ValueError) as e:
             return [TextContent(type="text", text=f"Storage error: {e}")]
 
         try:
@@ -114,29 +323,34 @@ def create_server() -> Server:
                 return [TextContent(type="text", text=f"Added task #{task.id}: {task.title}")]
 
             elif name == "list_tasks":
-                tasks = store.tasks
                 status_filter = arguments.get("status")
-                if status_filter:
-                    tasks = [t for t in tasks if t.status.value == status_filter]
-                if arguments.get("blocked"):
-                    tasks = [t for t in tasks if store.is_blocked(t)]
+                tasks = store.list_tasks(
+                    status=TaskStatus(status_filter) if status_filter else None,
+                    blocked=bool(arguments.get("blocked")),
+                    include_archived=bool(arguments.get("include_archived")),
+                )
 
                 if not tasks:
                     return [TextContent(type="text", text="No tasks found.")]
 
+                # Flags for every row from one query each, not one per row
+                blocked_ids = store.blocked_ids()
+                archived_ranges = store.meta.get("archived", [])
                 lines = []
                 for t in tasks:
-                    blocked = " [BLOCKED]" if store.is_blocked(t) else ""
+                    blocked = " [BLOCKED]" if t.id in blocked_ids else ""
+                    archived = " [archived]" if in_ranges(archived_ranges, t.id) else ""
                     deps = f" (deps: {t.dependencies})" if t.dependencies else ""
-                    lines.append(f"#{t.id} [{t.status.value}] [{t.priority.value}] {t.title}{deps}{blocked}")
+                    lines.append(f"#{t.id} [{t.status.value}] [{t.priority.value}] {t.title}{deps}{blocked}{archived}")
                 return [TextContent(type="text", text="\n".join(lines))]
 
             elif name == "get_task":
-                task = store.get_task(arguments["task_id"])
+                task = store.get_task(arguments["task_id"], include_archived=bool(arguments.get("include_archived")))
                 if not task:
                     return [TextContent(type="text", text=f"Task #{arguments['task_id']} not found")]
                 blocked = " [BLOCKED]" if store.is_blocked(task) else ""
-                return [TextContent(type="text", text=f"#{task.id} [{task.status.value}] [{task.priority.value}] {task.title}{blocked}\n{task.description or '(no description)'}")]
+                archived = " [archived]" if store.is_archived(task.id) else ""
+                return [TextContent(type="text", text=f"#{task.id} [{task.status.value}] [{task.priority.value}] {task.title}{blocked}{archived}\n{task.description or '(no description)'}")]
 
             elif name == "update_task":
                 task_id = arguments["task_id"]
@@ -153,12 +367,19 @@ def create_server() -> Server:
                 return [TextContent(type="text", text=f"Updated task #{task.id}: {task.title}")]
 
             elif name == "next_task":
-                task = store.find_next_task()
-                if not task:
+                count = arguments.get("count", 1)
+                if count < 1:
+                    raise ValueError("count must be at least 1")
+                tasks = store.next_tasks(count, prefer_unblocking=bool(arguments.get("prefer_unblocking")))
+                if not tasks:
                     return [TextContent(type="text", text="No actionable tasks. All done or blocked.")]
                 if arguments.get("start"):
-                    task = store.update_task(task.id, status=TaskStatus.IN_PROGRESS) or task
-                return [TextContent(type="text", text=f"Next: #{task.id} [{task.status.value}] {task.title}\n{task.description or ''}")]
+                    tasks = [store.update_task(t.id, status=TaskStatus.IN_PROGRESS) or t for t in tasks]
+                if count == 1:
+                    task = tasks[0]
+                    return [TextContent(type="text", text=f"Next: #{task.id} [{task.status.value}] {task.title}\n{task.description or ''}")]
+                lines = [f"#{t.id} [{t.status.value}] [{t.priority.value}] {t.title}" for t in tasks]
+                return [TextContent(type="text", text=f"Next {len(tasks)} tasks:\n" + "\n".join(lines))]
 
             elif name == "remove_task":
                 task = store.get_task(arguments["task_id"])
@@ -168,23 +389,51 @@ def create_server() -> Server:
                 store.remove_task(arguments["task_id"])
                 return [TextContent(type="text", text=f"Removed #{arguments['task_id']}: {title}")]
 
+            elif name == "add_tasks":
+                tasks = store.add_tasks(arguments["tasks"])
+                lines = [f"#{t.id}: {t.title}" for t in tasks]
+                return [TextContent(type="text", text=f"Added {len(tasks)} tasks:\n" + "\n".join(lines))]
+
+            elif name == "update_tasks":
+                tasks = store.update_tasks(arguments["updates"])
+                lines = [f"#{t.id}: {t.title}" for t in tasks]
+                return [TextContent(type="text", text=f"Updated {len(tasks)} tasks:\n" + "\n".join(lines))]
+
+            elif name == "remove_tasks":
+                count = store.remove_tasks(arguments["task_ids"])
+                return [TextContent(type="text", text=f"Removed {count} tasks")]
+
+            elif name == "analyze_tasks":
+                analysis = store.analyze(include_done=bool(arguments.get("include_done")))
+                return [TextContent(type="text", text=format_analysis(store, analysis, arguments.get("task_id")))]
+
+            elif name == "archive_tasks":
+                count = store.archive_tasks(arguments.get("older_than_days"))
+                return [TextContent(type="text", text=f"Archived {count} tasks")]
+
             return [TextContent(type="text", text=f"Unknown tool: {name}")]
 
         except ValueError as e:
             return [TextContent(type="text", text=f"Error: {e}")]
         except Exception as e:
             return [TextContent(type="text", text=f"Internal error: {type(e).__name__}: {e}")]
+        finally:
+            if write:
+                stores.mark_written(store)
 
     return server
 
 
 async def main() -> None:
     """Run the MCP server."""
-    server = create_server()
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(read_stream, write_stream, server.create_initialization_options())
+    stores = StoreCache()
+    server = create_server(stores)
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(read_stream, write_stream, server.create_initialization_options())
+    finally:
+        stores.close()
 
 
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(main())
@@ -0,0 +1,613 @@
+"""SQLite storage backend."""
+
+from __future__ import annotations
+
+import heapq
+import json
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from persistent_tasks.archive import (
+    add_ranges,
+    append_archive,
+    archive_days_from_environment,
+    archive_path_for,
+    in_ranges,
+    iter_archive,
+)
+from persistent_tasks.graph import GraphAnalysis, analyze_graph
+from persistent_tasks.journal import JournalTaskStore
+from persistent_tasks.storage import (
+    ACTIONABLE_STATUSES,
+    CLOSED_STATUSES,
+    Priority,
+    Task,
+    TaskStatus,
+    prepare_batch_task,
+    unblocking_key,
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    status TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    closed_at TEXT
+);
+CREATE TABLE IF NOT EXISTS dependencies (
+    task_id INTEGER NOT NULL REFERENCES tasks(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    depends_on INTEGER NOT NULL,
+    PRIMARY KEY (task_id, position)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_status_priority ON tasks(status, priority);
+CREATE INDEX IF NOT EXISTS tasks_priority ON tasks(priority);
+CREATE INDEX IF NOT EXISTS dependencies_depends_on ON dependencies(depends_on);
+"""
+
+# A task is blocked if any existing dependency is not done
+BLOCKED_SQL = """EXISTS (
+    SELECT 1 FROM dependencies d JOIN tasks p ON p.id = d.depends_on
+    WHERE d.task_id = t.id AND p.status != 'done'
+)"""
+
+# Same ordering as TaskStore._schedule_key
+SCHEDULE_ORDER_SQL = """
+    t.status != 'in-progress',
+    CASE t.priority WHEN 'high' THEN 0 WHEN 'medium' THEN 1 ELSE 2 END,
+    (SELECT COUNT(*) FROM dependencies d WHERE d.task_id = t.id),
+    t.id
+"""
+
+# Closed tasks that can be archived (parameters: cutoff). A cancelled
+# task stays while an unfinished task depends on it, as in TaskStore.
+ARCHIVABLE_SQL = f"""
+    t.status IN ({",".join(f"'{s.value}'" for s in CLOSED_STATUSES)})
+    AND (t.closed_at IS NULL OR t.closed_at <= ?)
+    AND (t.status = 'done' OR NOT EXISTS (
+        SELECT 1 FROM dependencies d JOIN tasks c ON c.id = d.task_id
+        WHERE d.depends_on = t.id
+        AND c.status NOT IN ({",".join(f"'{s.value}'" for s in CLOSED_STATUSES)})
+    ))
+"""
+
+# Stay well below SQLite's bound-parameter limit
+MAX_PARAMS = 500
+
+
+def database_path_for(path: Path) -> Path:
+    """Get the SQLite database that belongs to a tasks file."""
+    return path.with_suffix(".db")
+
+
+class SqliteTaskStore:
+    """Task storage in a SQLite database next to the tasks file.
+
+    Implements the TaskStore API without holding tasks in memory: every
+    query and mutation runs against the database, so opening the store
+    is cheap and filters such as status or blocked run in SQL. Each
+    mutation is one BEGIN IMMEDIATE transaction, so its reads (next ID,
+    dependency checks, current status) and writes are atomic across
+    processes sharing the database.
+
+    ``path`` is the tasks.json path the other backends use; the database
+    lives beside it as tasks.db. If tasks.db doesn't exist yet, the
+    tasks in tasks.json (and its journal, if any) are imported once.
+    tasks.json is left in place but no longer updated.
+
+    Archiving works as in TaskStore and shares its archive file, so
+    archives made by either backend carry over: archived IDs count as
+    done dependencies and include_archived reads them.
+    """
+
+    def __init__(self, path: Path, archive_after_days: Optional[float] = None) -> None:
+        """Open (creating or migrating if needed) the database."""
+        self.path = Path(path)
+        self.db_path = database_path_for(self.path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._in_transaction = False
+
+        try:
+            # Autocommit mode: transactions are begun explicitly by _transaction.
+            # Callers such as the server's worker thread may use the store
+            # from a thread other than the one that opened it, one at a time.
+            self._conn = sqlite3.connect(
+                self.db_path, timeout=5.0, isolation_level=None, check_same_thread=False
+            )
+            self._conn.execute("PRAGMA foreign_keys = ON")
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.executescript(SCHEMA)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(tasks)")}
+            if "closed_at" not in columns:
+                self._conn.execute("ALTER TABLE tasks ADD COLUMN closed_at TEXT")
+            with self._transaction():
+                # Meta is written last, so an empty table means not yet populated
+                if self._conn.execute("SELECT COUNT(*) FROM meta").fetchone()[0] == 0:
+                    self._initialize()
+        except sqlite3.Error as e:
+            raise RuntimeError(
+                f"Failed to open task database {self.db_path}: {e}. "
+                "Check file permissions or delete the database to start fresh."
+            ) from e
+
+        self.archive_after_days = archive_after_days
+        if self.archive_after_days is None:
+            self.archive_after_days = archive_days_from_environment()
+        if self.archive_after_days is not None:
+            self.archive_tasks()
+
+    def _initialize(self) -> None:
+        """Populate a new database, importing tasks.json if it exists.
+
+        Runs inside the transaction that found the database empty.
+        """
+        if self.path.exists():
+            source = JournalTaskStore(self.path)
+            source.close()
+            tasks, meta = source.tasks, dict(source.meta)
+            meta.pop("journalSeq", None)
+        else:
+            tasks = []
+            meta = {
+                "nextId": 1,
+                "project": self.path.parent.parent.name,
+                "created": datetime.now().isoformat()
+            }
+
+        for task in tasks:
+            self._insert(task)
+        self._conn.executemany(
+            "INSERT INTO meta (key, value) VALUES (?, ?)",
+            [(key, json.dumps(value)) for key, value in meta.items()],
+        )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """Run as one write transaction, or join the enclosing one.
+
+        BEGIN IMMEDIATE takes the database write lock before anything is
+        read, so no other process can commit between this transaction's
+        reads and its writes. Commits on success and rolls back on error.
+        """
+        if self._in_transaction:
+            yield
+            return
+        self._conn.execute("BEGIN IMMEDIATE")
+        self._in_transaction = True
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        else:
+            self._conn.execute("COMMIT")
+        finally:
+            self._in_transaction = False
+
+    def _set_meta(self, key: str, value: object) -> None:
+        """Write one metadata value."""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value))
+        )
+
+    # Row conversion
+
+    def _insert(self, task: Task) -> None:
+        """Insert a task and its dependencies."""
+        self._conn.execute(
+            "INSERT INTO tasks (id, title, status, priority, description, closed_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (task.id, task.title, task.status.value, task.priority.value, task.description, task.closed_at),
+        )
+        self._insert_dependencies(task.id, task.dependencies)
+
+    def _insert_dependencies(self, task_id: int, dependencies: list[int]) -> None:
+        """Insert a task's dependency list, preserving its order."""
+        self._conn.executemany(
+            "INSERT INTO dependencies (task_id, position, depends_on) VALUES (?, ?, ?)",
+            [(task_id, i, dep_id) for i, dep_id in enumerate(dependencies)],
+        )
+
+    def _query(
+        self,
+        where: str = "",
+        params: Iterable = (),
+        order: str = "t.id",
+        limit: Optional[int] = None,
+    ) -> list[Task]:
+        """Select tasks with their dependencies."""
+        sql = "SELECT t.id, t.title, t.status, t.priority, t.description, t.closed_at FROM tasks t"
+        if where:
+            sql += f" WHERE {where}"
+        sql += f" ORDER BY {order}"
+        params = list(params)
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        rows = self._conn.execute(sql, params).fetchall()
+
+        # Rows were validated when inserted
+        dependencies = self._dependencies_for([row[0] for row in rows])
+        return [
+            Task._unchecked(
+                id=task_id,
+                title=title,
+                status=TaskStatus(status),
+                priority=Priority(priority),
+                dependencies=dependencies.get(task_id, []),
+                description=description,
+                closed_at=closed_at,
+            )
+            for task_id, title, status, priority, description, closed_at in rows
+        ]
+
+    def _dependencies_for(self, task_ids: list[int]) -> dict[int, list[int]]:
+        """Fetch dependency lists for a set of tasks."""
+        result: dict[int, list[int]] = {}
+        for start in range(0, len(task_ids), MAX_PARAMS):
+            chunk = task_ids[start:start + MAX_PARAMS]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT task_id, depends_on FROM dependencies WHERE task_id IN ({placeholders}) "
+                "ORDER BY task_id, position",
+                chunk,
+            )
+            for task_id, dep_id in rows:
+                result.setdefault(task_id, []).append(dep_id)
+        return result
+
+    def _missing(self, task_ids: list[int]) -> list[int]:
+        """Return the IDs (in input order) that don't exist or were archived."""
+        existing: set[int] = set()
+        unique = list(dict.fromkeys(task_ids))
+        for start in range(0, len(unique), MAX_PARAMS):
+            chunk = unique[start:start + MAX_PARAMS]
+            placeholders = ",".join("?" * len(chunk))
+            existing.update(
+                row[0] for row in self._conn.execute(
+                    f"SELECT id FROM tasks WHERE id IN ({placeholders})", chunk
+                )
+            )
+        archived = self.meta.get("archived", [])
+        return [
+            task_id for task_id in task_ids
+            if task_id not in existing and not in_ranges(archived, task_id)
+        ]
+
+    # TaskStore API
+
+    @property
+    def tasks(self) -> list[Task]:
+        """All tasks in ID order. Loads every row; prefer list_tasks."""
+        return self._query()
+
+    @property
+    def meta(self) -> dict:
+        """Store metadata (read-only copy)."""
+        return {key: json.loads(value) for key, value in self._conn.execute("SELECT key, value FROM meta")}
+
+    def get_task(self, task_id: int, include_archived: bool = False) -> Optional[Task]:
+        """Get task by ID, searching the archive too if asked."""
+        tasks = self._query("t.id = ?", (task_id,))
+        if not tasks and include_archived and self.is_archived(task_id):
+            return next((t for t in self.iter_archived() if t.id == task_id), None)
+        return tasks[0] if tasks else None
+
+    def list_tasks(
+        self,
+        status: Optional[TaskStatus] = None,
+        blocked: bool = False,
+        include_archived: bool = False,
+    ) -> list[Task]:
+        """List tasks in ID order, optionally filtered by status and/or blocked."""
+        clauses, params = [], []
+        if status is not None:
+            status = TaskStatus(status)
+            clauses.append("t.status = ?")
+            params.append(status.value)
+        if blocked:
+            clauses.append(BLOCKED_SQL)
+        tasks = self._query(" AND ".join(clauses), params)
+        if include_archived and not blocked:
+            archived = (t for t in self.iter_archived() if status is None or t.status == status)
+            tasks = sorted([*tasks, *archived], key=lambda t: t.id)
+        return tasks
+
+    def is_archived(self, task_id: int) -> bool:
+        """Check whether a task ID was moved to the archive."""
+        return in_ranges(self.meta.get("archived", []), task_id)
+
+    def iter_archived(self) -> Iterator[Task]:
+        """Stream archived tasks from the archive file, oldest archive first."""
+        for record in iter_archive(archive_path_for(self.path), self.meta.get("archived", [])):
+            yield Task.from_dict(record, validate=False)
+
+    def archive_tasks(self, older_than_days: Optional[float] = None) -> int:
+        """Move finished tasks out of the database into the archive.
+
+        Same selection and archive format as TaskStore.archive_tasks. The
+        archive member is written before the transaction commits; if the
+        commit fails, the next run cuts it off using archiveSize.
+
+        Returns:
+            Number of tasks archived
+        """
+        if older_than_days is None:
+            older_than_days = self.archive_after_days or 0
+        cutoff = (datetime.now() - timedelta(days=older_than_days)).isoformat()
+
+        with self._transaction():
+            tasks = self._query(ARCHIVABLE_SQL, (cutoff,))
+            if not tasks:
+                return 0
+
+            meta = self.meta
+            archived_at = datetime.now().isoformat()
+            archive_size = append_archive(
+                archive_path_for(self.path),
+                [{**t.to_dict(), "archivedAt": archived_at} for t in tasks],
+                meta.get("archiveSize", 0),
+            )
+            ids = [t.id for t in tasks]
+            for start in range(0, len(ids), MAX_PARAMS):
+                chunk = ids[start:start + MAX_PARAMS]
+                placeholders = ",".join("?" * len(chunk))
+                # Their own dependency rows cascade; dependents keep theirs
+                self._conn.execute(f"DELETE FROM tasks WHERE id IN ({placeholders})", chunk)
+            self._set_meta("archiveSize", archive_size)
+            self._set_meta("archived", add_ranges(meta.get("archived", []), ids))
+        return len(ids)
+
+    def add_task(
+        self,
+        title: str,
+        priority: Priority = Priority.MEDIUM,
+        dependencies: Optional[list[int]] = None,
+        description: str = "",
+    ) -> Task:
+        """Add a new task with auto-assigned ID.
+
+        Raises:
+            ValueError: If any dependency ID doesn't exist
+        """
+        deps = dependencies or []
+        with self._transaction():
+            missing = self._missing(deps)
+            if missing:
+                raise ValueError(f"Dependency {missing[0]} does not exist")
+
+            (next_id,) = self._conn.execute("SELECT value FROM meta WHERE key = 'nextId'").fetchone()
+            task = Task(
+                id=json.loads(next_id),
+                title=title,
+                priority=priority,
+                dependencies=deps,
+                description=description,
+            )
+            self._insert(task)
+            self._conn.execute(
+                "UPDATE meta SET value = ? WHERE key = 'nextId'", (json.dumps(task.id + 1),)
+            )
+        return task
+
+    def _validate_dependencies(self, task_id: int, dependencies: list[int]) -> None:
+        """Validate dependencies for update operation.
+
+        Raises:
+            ValueError: If validation fails (self-ref, nonexistent, cycle)
+        """
+        if task_id in dependencies:
+            raise ValueError(f"Task {task_id} cannot have self-reference dependency")
+
+        missing = self._missing(dependencies)
+        if missing:
+            raise ValueError(f"Dependency {missing[0]} does not exist")
+
+        if self._would_create_cycle(task_id, dependencies):
+            raise ValueError("Dependencies would create a cycle")
+
+    def _would_create_cycle(self, task_id: int, new_deps: list[int]) -> bool:
+        """Check whether task_id is reachable from new_deps via dependencies."""
+        if not new_deps:
+            return False
+        seeds = ",".join("(?)" for _ in new_deps)
+        row = self._conn.execute(
+            f"""
+            WITH RECURSIVE reach(id) AS (
+                VALUES {seeds}
+                UNION
+                SELECT d.depends_on FROM dependencies d JOIN reach r ON d.task_id = r.id
+            )
+            SELECT 1 FROM reach WHERE id = ? LIMIT 1
+            """,
+            [*new_deps, task_id],
+        ).fetchone()
+        return row is not None
+
+    def update_task(self, task_id: int, **updates) -> Optional[Task]:
+        """Update task fields.
+
+        Args:
+            task_id: ID of task to update
+            **updates: Fields to update (status, priority, title, description, dependencies)
+
+        Returns:
+            Updated task, or None if not found
+
+        Raises:
+            ValueError: If dependency validation fails
+        """
+        with self._transaction():
+            task = self.get_task(task_id)
+            if not task:
+                return None
+
+            columns: dict[str, object] = {}
+            if "status" in updates:
+                status = TaskStatus(updates["status"])
+                columns["status"] = status.value
+                if (task.status in CLOSED_STATUSES) != (status in CLOSED_STATUSES):
+                    columns["closed_at"] = datetime.now().isoformat() if status in CLOSED_STATUSES else None
+            if "priority" in updates:
+                columns["priority"] = Priority(updates["priority"]).value
+            for name in ("title", "description"):
+                if name in updates:
+                    columns[name] = updates[name]
+
+            if "dependencies" in updates:
+                self._validate_dependencies(task_id, updates["dependencies"])
+                self._conn.execute("DELETE FROM dependencies WHERE task_id = ?", (task_id,))
+                self._insert_dependencies(task_id, updates["dependencies"])
+            # Only the given columns, so concurrent updates to other fields survive
+            if columns:
+                assignments = ", ".join(f"{name} = ?" for name in columns)
+                self._conn.execute(
+                    f"UPDATE tasks SET {assignments} WHERE id = ?", [*columns.values(), task_id]
+                )
+            return self.get_task(task_id)
+
+    def is_blocked(self, task: Task) -> bool:
+        """Check if task is blocked by incomplete dependencies."""
+        deps = list(dict.fromkeys(task.dependencies))
+        for start in range(0, len(deps), MAX_PARAMS):
+            chunk = deps[start:start + MAX_PARAMS]
+            placeholders = ",".join("?" * len(chunk))
+            row = self._conn.execute(
+                f"SELECT 1 FROM tasks WHERE status != 'done' AND id IN ({placeholders}) LIMIT 1",
+                chunk,
+            ).fetchone()
+            if row:
+                return True
+        return False
+
+    def blocked_tasks(self) -> list[Task]:
+        """Get all tasks blocked by incomplete dependencies, in ID order."""
+        return self._query(BLOCKED_SQL)
+
+    def blocked_ids(self) -> set[int]:
+        """Get the IDs of all tasks blocked by incomplete dependencies, in one query."""
+        return {row[0] for row in self._conn.execute(f"SELECT t.id FROM tasks t WHERE {BLOCKED_SQL}")}
+
+    def ready_tasks(self) -> list[Task]:
+        """Get all actionable (pending/in-progress, unblocked) tasks, in ID order."""
+        return self._query(self._ready_where(), [s.value for s in ACTIONABLE_STATUSES])
+
+    @staticmethod
+    def _ready_where() -> str:
+        """WHERE clause for actionable tasks (parameters: actionable statuses)."""
+        placeholders = ",".join("?" * len(ACTIONABLE_STATUSES))
+        return f"t.status IN ({placeholders}) AND NOT {BLOCKED_SQL}"
+
+    def find_next_task(self, prefer_unblocking: bool = False) -> Optional[Task]:
+        """Find the next task to work on, ordered as in TaskStore."""
+        tasks = self.next_tasks(1, prefer_unblocking=prefer_unblocking)
+        return tasks[0] if tasks else None
+
+    def next_tasks(self, n: int, prefer_unblocking: bool = False) -> list[Task]:
+        """Find the top n tasks to work on, best first."""
+        if n < 1:
+            return []
+        if prefer_unblocking:
+            counts = self.analyze().dependent_counts
+            return heapq.nsmallest(n, self.ready_tasks(), key=lambda t: unblocking_key(t, counts))
+        return self._query(
+            self._ready_where(),
+            [s.value for s in ACTIONABLE_STATUSES],
+            order=SCHEDULE_ORDER_SQL,
+            limit=n,
+        )
+
+    def analyze(self, include_done: bool = False) -> GraphAnalysis:
+        """Analyze the dependency graph, reading only IDs and edges.
+
+        See TaskStore.analyze.
+        """
+        where = "" if include_done else "WHERE status != 'done'"
+        graph: dict[int, list[int]] = {
+            row[0]: [] for row in self._conn.execute(f"SELECT id FROM tasks {where} ORDER BY id")
+        }
+        for task_id, dep_id in self._conn.execute(
+            "SELECT task_id, depends_on FROM dependencies ORDER BY task_id, position"
+        ):
+            if task_id in graph:
+                graph[task_id].append(dep_id)
+        return analyze_graph(graph)
+
+    def mark_done(self, task_id: int) -> Optional[Task]:
+        """Mark a task as done."""
+        return self.update_task(task_id, status=TaskStatus.DONE)
+
+    def remove_task(self, task_id: int) -> bool:
+        """Remove a task and clean up dependencies.
+
+        Returns:
+            True if removed, False if not found
+        """
+        with self._transaction():
+            cursor = self._conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+            if cursor.rowcount == 0:
+                return False
+            self._conn.execute("DELETE FROM dependencies WHERE depends_on = ?", (task_id,))
+        return True
+
+    def add_tasks(self, specs: list[dict]) -> list[Task]:
+        """Add several tasks in one transaction, all or nothing.
+
+        See TaskStore.add_tasks for the item format.
+        """
+        aliases: dict[str, int] = {}
+        tasks = []
+        with self._transaction():
+            for i, spec in enumerate(specs, 1):
+                try:
+                    alias, kwargs = prepare_batch_task(spec, aliases)
+                    task = self.add_task(**kwargs)
+                except (ValueError, TypeError) as e:
+                    raise ValueError(f"Task {i} in batch: {e}") from e
+                if alias is not None:
+                    aliases[alias] = task.id
+                tasks.append(task)
+        return tasks
+
+    def update_tasks(self, updates: list[dict]) -> list[Task]:
+        """Update several tasks in one transaction, all or nothing.
+
+        See TaskStore.update_tasks for the item format.
+        """
+        tasks = []
+        with self._transaction():
+            for i, update in enumerate(updates, 1):
+                fields = dict(update)
+                task_id = fields.pop("task_id", None)
+                try:
+                    task = self.update_task(task_id, **fields)
+                    if task is None:
+                        raise ValueError(f"Task {task_id} does not exist")
+                except (ValueError, TypeError) as e:
+                    raise ValueError(f"Update {i} in batch: {e}") from e
+                tasks.append(task)
+        return tasks
+
+    def remove_tasks(self, task_ids: list[int]) -> int:
+        """Remove several tasks in one transaction, all or nothing."""
+        with self._transaction():
+            for task_id in task_ids:
+                if not self.remove_task(task_id):
+                    raise ValueError(f"Task {task_id} does not exist")
+        return len(task_ids)
+
+    def signature(self) -> tuple:
+        """Always the same: every call reads the database, so it never goes stale."""
+        return ()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
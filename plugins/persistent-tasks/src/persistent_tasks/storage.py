@@ -2,12 +2,35 @@
 
 from __future__ import annotations
 
-import json
+import functools
+import heapq
+import os
+import secrets
+import time
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterator, Optional, TypeVar
+
+from persistent_tasks import codec
+from persistent_tasks.archive import (
+    add_ranges,
+    append_archive,
+    archive_days_from_environment,
+    archive_path_for,
+    in_ranges,
+    iter_archive,
+)
+from persistent_tasks.graph import GraphAnalysis, analyze_graph
+
+try:
+    import fcntl
+except ImportError:  # Windows: rely on the version check alone
+    fcntl = None
+
+T = TypeVar("T")
 
 
 class TaskStatus(str, Enum):
@@ -27,7 +50,47 @@ class Priority(str, Enum):
     LOW = "low"
 
 
-@dataclass
+# Statuses that find_next_task may pick
+ACTIONABLE_STATUSES = (TaskStatus.PENDING, TaskStatus.IN_PROGRESS)
+
+# Finished statuses; tasks in them can be archived
+CLOSED_STATUSES = (TaskStatus.DONE, TaskStatus.CANCELLED)
+
+PRIORITY_ORDER = {Priority.HIGH: 3, Priority.MEDIUM: 2, Priority.LOW: 1}
+
+# Attempts at a mutation before giving up on a file that keeps changing
+MAX_WRITE_ATTEMPTS = 5
+
+FORMAT_ENV = "PERSISTENT_TASKS_FORMAT"
+FILE_FORMATS = ("pretty", "compact")
+COMPACT_FORMAT = "compact-v1"
+
+
+def unblocking_key(task: Task, dependent_counts: dict[int, int]) -> tuple:
+    """Next-task sort key that breaks priority ties by downstream impact.
+
+    In-progress first, then priority, then the most transitive
+    dependents, then fewer dependencies and lower ID as usual.
+    """
+    return (
+        0 if task.status == TaskStatus.IN_PROGRESS else 1,
+        -PRIORITY_ORDER[task.priority],
+        -dependent_counts.get(task.id, 0),
+        len(task.dependencies),
+        task.id,
+    )
+
+
+def remaining_work_graph(tasks: list[Task], include_done: bool = False) -> dict[int, list[int]]:
+    """Dependency mapping for analyze_graph; done tasks count as satisfied."""
+    return {
+        t.id: t.dependencies
+        for t in tasks
+        if include_done or t.status != TaskStatus.DONE
+    }
+
+
+@dataclass(slots=True)
 class Task:
     """A task with dependencies."""
     id: int
@@ -36,6 +99,7 @@ class Task:
     priority: Priority = Priority.MEDIUM
     dependencies: list[int] = field(default_factory=list)
     description: str = ""
+    closed_at: Optional[str] = None  # ISO time the task became done/cancelled
 
     def __post_init__(self) -> None:
         """Validate task fields after initialization."""
@@ -58,47 +122,305 @@ class Task:
             "priority": self.priority.value,
             "dependencies": self.dependencies,
             "description": self.description,
+            **({"closedAt": self.closed_at} if self.closed_at else {}),
         }
 
+    def to_compact(self) -> dict:
+        """Convert to the compact on-disk form: short keys, defaults omitted."""
+        data = {"i": self.id, "t": self.title}
+        if self.status != TaskStatus.PENDING:
+            data["s"] = self.status.value
+        if self.priority != Priority.MEDIUM:
+            data["p"] = self.priority.value
+        if self.dependencies:
+            data["d"] = self.dependencies
+        if self.description:
+            data["x"] = self.description
+        if self.closed_at:
+            data["c"] = self.closed_at
+        return data
+
     @classmethod
-    def from_dict(cls, data: dict) -> Task:
-        """Create Task from dict."""
-        return cls(
+    def from_dict(cls, data: dict, validate: bool = True) -> Task:
+        """Create Task from dict.
+
+        With validate=False the field checks in __post_init__ are skipped;
+        only use that for data this package wrote itself.
+        """
+        build = cls if validate else cls._unchecked
+        return build(
             id=data["id"],
             title=data["title"],
             status=TaskStatus(data.get("status", "pending")),
             priority=Priority(data.get("priority", "medium")),
             dependencies=data.get("dependencies", []),
             description=data.get("description", ""),
+            closed_at=data.get("closedAt"),
         )
 
+    @classmethod
+    def from_compact(cls, data: dict, validate: bool = True) -> Task:
+        """Create Task from its compact form (see to_compact)."""
+        build = cls if validate else cls._unchecked
+        return build(
+            id=data["i"],
+            title=data["t"],
+            status=TaskStatus(data.get("s", "pending")),
+            priority=Priority(data.get("p", "medium")),
+            dependencies=data.get("d", []),
+            description=data.get("x", ""),
+            closed_at=data.get("c"),
+        )
+
+    @classmethod
+    def _unchecked(
+        cls,
+        id: int,
+        title: str,
+        status: TaskStatus,
+        priority: Priority,
+        dependencies: list[int],
+        description: str,
+        closed_at: Optional[str] = None,
+    ) -> Task:
+        """Create Task without running __post_init__ validation."""
+        task = object.__new__(cls)
+        task.id = id
+        task.title = title
+        task.status = status
+        task.priority = priority
+        task.dependencies = dependencies
+        task.description = description
+        task.closed_at = closed_at
+        return task
+
+
+def prepare_batch_task(spec: dict, aliases: dict[str, int]) -> tuple[Optional[str], dict]:
+    """Turn one add_tasks item into its alias and add_task keyword arguments.
+
+    String dependencies are aliases of tasks added earlier in the batch
+    and are replaced by their IDs.
+
+    Raises:
+        ValueError: If the alias is reused or a dependency alias is unknown
+    """
+    spec = dict(spec)
+    alias = spec.pop("alias", None)
+    if alias is not None and alias in aliases:
+        raise ValueError(f"Duplicate alias '{alias}'")
+
+    dependencies = []
+    for dep in spec.get("dependencies") or []:
+        if isinstance(dep, str):
+            if dep not in aliases:
+                raise ValueError(f"Unknown alias '{dep}' (aliases must refer to earlier tasks in the batch)")
+            dep = aliases[dep]
+        dependencies.append(dep)
+    spec["dependencies"] = dependencies
+
+    if "priority" in spec:
+        spec["priority"] = Priority(spec["priority"])
+    return alias, spec
+
 
 def get_tasks_file() -> Path:
     """Get the tasks file path for current project.
 
     Resolution order:
-    1. Project-local: .claude/tasks/tasks.json (if exists)
+    1. Project-local: .claude/tasks/tasks.json (if it or the SQLite
+       backend's tasks.db exists)
     2. Global: ~/.claude/tasks/tasks.json
     """
     local = Path.cwd() / ".claude" / "tasks" / "tasks.json"
-    if local.exists():
+    if local.exists() or local.with_suffix(".db").exists():
         return local
     return Path.home() / ".claude" / "tasks" / "tasks.json"
 
 
+def check_file_format(name: str) -> str:
+    """Normalize a tasks file format name.
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    name = name.lower()
+    if name not in FILE_FORMATS:
+        raise ValueError(f"Unknown tasks file format '{name}'. Choose from: {', '.join(FILE_FORMATS)}")
+    return name
+
+
+def file_signature(path: Path) -> Optional[tuple[int, int, int]]:
+    """Get (mtime_ns, inode, size) of a file, or None if it doesn't exist."""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_ino, st.st_size)
+
+
+class WriteConflict(Exception):
+    """The tasks file changed on disk since it was loaded."""
+
+
+def mutation(method: Callable[..., T]) -> Callable[..., T]:
+    """Run a TaskStore method as a locked, compare-and-swap mutation.
+
+    The method runs under the store's file lock, on top of the latest
+    saved state. If the save still finds the file changed (a writer that
+    doesn't take the lock), the store reloads and the method is retried.
+    Nested mutations run inside the outer one.
+    """
+    @functools.wraps(method)
+    def wrapper(self: TaskStore, *args, **kwargs):
+        if self._lock_depth:
+            return method(self, *args, **kwargs)
+
+        for attempt in range(MAX_WRITE_ATTEMPTS):
+            with self._locked():
+                self._sync_from_disk()
+                try:
+                    return method(self, *args, **kwargs)
+                except WriteConflict:
+                    pass
+            time.sleep(0.01 * (attempt + 1))
+
+        raise RuntimeError(
+            f"Failed to write {self.path}: it kept changing during "
+            f"{MAX_WRITE_ATTEMPTS} attempts. Another process may be writing it."
+        )
+
+    return wrapper
+
+
 @dataclass
 class TaskStore:
-    """Persistent task storage backed by JSON file."""
+    """Persistent task storage backed by JSON file.
+
+    Besides the task list, the store keeps indexes that are updated on
+    every mutation so lookups and scheduling don't scan all tasks:
+
+    - ``_by_id``: task id -> Task
+    - ``_dependents``: task id -> ids of tasks that depend on it
+    - ``_pending_deps``: task id -> number of its dependencies not done
+    - ``_blocked``: ids of tasks with at least one dependency not done
+    - ``_ready``: ids of pending/in-progress tasks that are not blocked
+    - ``_ready_heap``: heap of (schedule key, id) entries for ready tasks;
+      ``_ready_entries`` holds each ready task's live entry, and entries
+      that are no longer live are discarded lazily when they surface
+
+    Mutate tasks through the store methods; changing Task fields directly
+    leaves these indexes stale.
+
+    Several processes may share one tasks file. Mutations hold an
+    advisory fcntl lock on ``<tasks file>.lock`` while they reload (if
+    the file changed), apply and save. ``meta["version"]`` is bumped on
+    every save; a save that finds a different version on disk than the
+    one loaded raises WriteConflict and the mutation is retried.
+
+    The file is written as indented JSON meant to be readable and
+    hand-editable, or with ``file_format="compact"`` (default from the
+    PERSISTENT_TASKS_FORMAT environment variable, else "pretty") as
+    unindented JSON with short keys and default values omitted. Either
+    format is read back regardless of the setting. Tasks loaded from
+    a pretty file are validated; a compact file is only written by this
+    package, so its tasks are trusted and skip validation unless
+    ``validate=True``.
+
+    Done and cancelled tasks can be moved out of the tasks file into
+    tasks.archive.jsonl.gz with archive_tasks(), or automatically when
+    the store is opened with ``archive_after_days`` (default from the
+    PERSISTENT_TASKS_ARCHIVE_DAYS environment variable). Archived IDs are
+    kept as ranges in ``meta["archived"]``, so dependencies on them
+    count as done without reading the archive; queries read it only
+    with ``include_archived=True``.
+    """
     path: Path
     tasks: list[Task] = field(default_factory=list)
     meta: dict = field(default_factory=dict)
+    file_format: Optional[str] = None
+    validate: Optional[bool] = None
+    archive_after_days: Optional[float] = None
+    _by_id: dict[int, Task] = field(default_factory=dict, init=False, repr=False)
+    _dependents: dict[int, set[int]] = field(default_factory=dict, init=False, repr=False)
+    _pending_deps: dict[int, int] = field(default_factory=dict, init=False, repr=False)
+    _blocked: set[int] = field(default_factory=set, init=False, repr=False)
+    _ready: set[int] = field(default_factory=set, init=False, repr=False)
+    _ready_heap: list[tuple] = field(default_factory=list, init=False, repr=False)
+    _ready_entries: dict[int, tuple] = field(default_factory=dict, init=False, repr=False)
+    _synced: Optional[tuple] = field(default=None, init=False, repr=False)
+    _lock_depth: int = field(default=0, init=False, repr=False)
+    _pending: Optional[tuple[dict[int, Task], list[int]]] = field(default=None, init=False, repr=False)
+    _analysis: Optional[GraphAnalysis] = field(default=None, init=False, repr=False)
 
     def __post_init__(self) -> None:
         """Load or initialize storage."""
         self.path = Path(self.path)
+        self.file_format = check_file_format(
+            self.file_format or os.environ.get(FORMAT_ENV, "pretty")
+        )
+        with self._locked():
+            if self.path.exists():
+                self._load()
+            else:
+                self._synced = self.signature()
+                self._initialize()
+            if self.archive_after_days is None:
+                self.archive_after_days = archive_days_from_environment()
+            if self.archive_after_days is not None:
+                self.archive_tasks()
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold the exclusive advisory lock shared by all stores on this file."""
+        if self._lock_depth or fcntl is None:
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+            return
+
+        lock_path = self.path.with_name(self.path.name + ".lock")
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _disk_changed(self) -> bool:
+        """Check whether the file changed since we loaded or saved it.
+
+        Any change counts, including hand edits that keep meta.version.
+        """
+        return self.signature() != self._synced
+
+    def _version_changed(self) -> bool:
+        """Check whether another writer saved since we loaded or saved.
+
+        The file signature is a cheap first check; only when it differs
+        is the file read to compare versions.
+        """
+        if not self._disk_changed():
+            return False
+        try:
+            data = codec.loads(self.path.read_bytes())
+            disk_version = data.get("meta", {}).get("version", 0)
+        except (OSError, ValueError, AttributeError):
+            return True
+        return disk_version != self.meta.get("version", 0)
+
+    def _sync_from_disk(self) -> None:
+        """Reload if the file changed, whether or not its version did."""
+        if not self._disk_changed():
+            return
         if self.path.exists():
             self._load()
         else:
+            self._synced = self.signature()
             self._initialize()
 
     def _initialize(self) -> None:
@@ -108,6 +430,7 @@ class TaskStore:
             "project": self.path.parent.parent.name,
             "created": datetime.now().isoformat()
         }
+        self._reindex()
         self._save()
 
     def _load(self) -> None:
@@ -117,7 +440,7 @@ class TaskStore:
             RuntimeError: If file cannot be read or contains invalid JSON/data.
         """
         try:
-            text = self.path.read_text()
+            raw = self.path.read_bytes()
         except OSError as e:
             raise RuntimeError(
                 f"Failed to read tasks from {self.path}: {e}. "
@@ -125,46 +448,334 @@ class TaskStore:
             ) from e
 
         try:
-            data = json.loads(text)
-        except json.JSONDecodeError as e:
+            data = codec.loads(raw)
+        except ValueError as e:
             raise RuntimeError(
                 f"Failed to parse tasks from {self.path}: {e}. "
                 "Fix the JSON syntax or delete the file to start fresh."
             ) from e
 
         try:
-            self.tasks = [Task.from_dict(t) for t in data.get("tasks", [])]
-        except (KeyError, ValueError, TypeError) as e:
+            if data.get("format") == COMPACT_FORMAT:
+                validate = bool(self.validate)
+                self.tasks = [Task.from_compact(t, validate) for t in data.get("tasks", [])]
+            else:
+                validate = self.validate is not False
+                self.tasks = [Task.from_dict(t, validate) for t in data.get("tasks", [])]
+        except (KeyError, ValueError, TypeError, AttributeError) as e:
             raise RuntimeError(
                 f"Invalid task data in {self.path}: {e}. "
                 "Fix the task data or delete the file to start fresh."
             ) from e
 
         self.meta = data.get("meta", {"nextId": 1})
+        self._reindex()
+        self._synced = self.signature()
+
+    def _reindex(self) -> None:
+        """Rebuild all indexes from the task list in O(tasks + dependencies)."""
+        self._analysis = None
+        self._by_id = {t.id: t for t in self.tasks}
+        self._dependents = {t.id: set() for t in self.tasks}
+        self._pending_deps = {}
+        self._blocked = set()
+        self._ready = set()
+        self._ready_heap = []
+        self._ready_entries = {}
+
+        for task in self.tasks:
+            self._link_dependencies(task)
+        for task in self.tasks:
+            self._refresh(task.id)
+
+    def _link_dependencies(self, task: Task) -> None:
+        """Add task's dependency edges and count its unfinished dependencies.
+
+        Dependencies on missing tasks are ignored, as in is_blocked.
+        """
+        pending = 0
+        for dep_id in set(task.dependencies):
+            dep = self._by_id.get(dep_id)
+            if dep is None:
+                continue
+            self._dependents[dep_id].add(task.id)
+            if dep.status != TaskStatus.DONE:
+                pending += 1
+        self._pending_deps[task.id] = pending
+
+    def _unlink_dependencies(self, task: Task) -> None:
+        """Remove task's dependency edges."""
+        for dep_id in set(task.dependencies):
+            if dep_id in self._dependents:
+                self._dependents[dep_id].discard(task.id)
+        self._pending_deps[task.id] = 0
+
+    @staticmethod
+    def _schedule_key(task: Task) -> tuple:
+        """Sort key for next-task selection: lower sorts first.
+
+        In-progress first, then priority (high > medium > low), then
+        fewer dependencies, then lower ID.
+        """
+        in_progress = 0 if task.status == TaskStatus.IN_PROGRESS else 1
+        priority = -PRIORITY_ORDER[task.priority]  # Negative for descending
+        return (in_progress, priority, len(task.dependencies), task.id)
+
+    def _refresh(self, task_id: int) -> None:
+        """Update a task's membership in the blocked and ready sets.
+
+        Called after any change to a task's status, priority or
+        dependencies, so it also keeps the ready heap current.
+        """
+        task = self._by_id[task_id]
+        blocked = self._pending_deps.get(task_id, 0) > 0
+
+        if blocked:
+            self._blocked.add(task_id)
+        else:
+            self._blocked.discard(task_id)
+
+        if task.status in ACTIONABLE_STATUSES and not blocked:
+            self._ready.add(task_id)
+            key = self._schedule_key(task)
+            entry = self._ready_entries.get(task_id)
+            if entry is None or entry[0] != key:
+                entry = (key, task_id)
+                self._ready_entries[task_id] = entry
+                heapq.heappush(self._ready_heap, entry)
+                self._maybe_compact_heap()
+        else:
+            self._ready.discard(task_id)
+            self._ready_entries.pop(task_id, None)
+
+    def _maybe_compact_heap(self) -> None:
+        """Drop dead heap entries once they outnumber the live ones."""
+        if len(self._ready_heap) > 64 and len(self._ready_heap) > 2 * len(self._ready_entries):
+            self._ready_heap = list(self._ready_entries.values())
+            heapq.heapify(self._ready_heap)
+
+    def _is_live(self, entry: tuple) -> bool:
+        """Check whether a heap entry is its task's current entry."""
+        return self._ready_entries.get(entry[1]) is entry
+
+    def _index_task(self, task: Task) -> None:
+        """Add a new task to the indexes."""
+        self._by_id[task.id] = task
+        self._dependents.setdefault(task.id, set())
+        self._link_dependencies(task)
+        self._refresh(task.id)
+
+    def _unindex_task(self, task: Task) -> None:
+        """Remove a task from the indexes.
+
+        Dependents stop counting it as an unfinished dependency; their
+        dependency lists are cleaned up by the caller.
+        """
+        self._unlink_dependencies(task)
+        if task.status != TaskStatus.DONE:
+            for dependent_id in self._dependents.get(task.id, ()):
+                self._pending_deps[dependent_id] -= 1
+                self._refresh(dependent_id)
+
+        del self._by_id[task.id]
+        self._dependents.pop(task.id, None)
+        self._pending_deps.pop(task.id, None)
+        self._blocked.discard(task.id)
+        self._ready.discard(task.id)
+        self._ready_entries.pop(task.id, None)
+
+    def _set_dependencies(self, task: Task, dependencies: list[int]) -> None:
+        """Replace a task's dependencies and update the indexes."""
+        self._unlink_dependencies(task)
+        task.dependencies = dependencies
+        self._link_dependencies(task)
+        self._refresh(task.id)
+
+    def _set_status(self, task: Task, status: TaskStatus) -> None:
+        """Change a task's status, unblocking or re-blocking its dependents."""
+        was_done = task.status == TaskStatus.DONE
+        if (task.status in CLOSED_STATUSES) != (status in CLOSED_STATUSES):
+            task.closed_at = datetime.now().isoformat() if status in CLOSED_STATUSES else None
+        task.status = status
+        is_done = status == TaskStatus.DONE
+
+        if was_done != is_done:
+            delta = -1 if is_done else 1
+            for dependent_id in self._dependents.get(task.id, ()):
+                self._pending_deps[dependent_id] += delta
+                self._refresh(dependent_id)
+
+        self._refresh(task.id)
 
     def _save(self) -> None:
         """Persist tasks to file atomically.
 
-        Writes to a temporary file first, then renames to target.
-        This prevents file corruption if the process crashes mid-write.
+        Writes to a uniquely named temporary file first, then renames to
+        target. This prevents file corruption if the process crashes
+        mid-write, and concurrent writers never share a temp file.
+
+        Raises:
+            WriteConflict: If the file changed since it was loaded
         """
+        if self._version_changed():
+            raise WriteConflict(self.path)
+
         self.path.parent.mkdir(parents=True, exist_ok=True)
-        data = {
-            "tasks": [t.to_dict() for t in self.tasks],
-            "meta": self.meta
-        }
+        self.meta["version"] = self.meta.get("version", 0) + 1
+        compact = self.file_format == "compact"
+        if compact:
+            data = {
+                "format": COMPACT_FORMAT,
+                "tasks": [t.to_compact() for t in self.tasks],
+                "meta": self.meta
+            }
+        else:
+            data = {
+                "tasks": [t.to_dict() for t in self.tasks],
+                "meta": self.meta
+            }
+        payload = codec.dumps(data, indent=not compact)
         # Atomic write: write to temp file, then rename
-        temp_path = self.path.with_suffix(".tmp")
-        temp_path.write_text(json.dumps(data, indent=2))
-        temp_path.replace(self.path)  # atomic on POSIX
+        temp_path = self.path.with_name(
+            f".{self.path.name}.{os.getpid()}-{secrets.token_hex(4)}.tmp"
+        )
+        try:
+            with open(temp_path, "xb") as f:
+                f.write(payload)
+            temp_path.replace(self.path)  # atomic on POSIX
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+        self._synced = self.signature()
+
+    def _commit(self, changed: tuple[Task, ...] = (), removed: tuple[int, ...] = ()) -> None:
+        """Persist a mutation now, or at the end of the enclosing batch."""
+        self._analysis = None
+        if self._pending is None:
+            self._record(changed=changed, removed=removed)
+            return
+
+        pending_changed, pending_removed = self._pending
+        for task_id in removed:
+            pending_changed.pop(task_id, None)
+            pending_removed.append(task_id)
+        for task in changed:
+            pending_changed[task.id] = task
+
+    @contextmanager
+    def _batch(self) -> Iterator[None]:
+        """Group mutations into one all-or-nothing save.
+
+        Must run inside a mutation, so the file on disk is still the state
+        from before the batch; if any step fails it is reloaded, undoing
+        the steps already applied in memory.
+        """
+        self._pending = ({}, [])
+        try:
+            yield
+        except BaseException:
+            self._pending = None
+            self._load()
+            raise
 
-    def get_task(self, task_id: int) -> Optional[Task]:
-        """Get task by ID."""
-        for task in self.tasks:
-            if task.id == task_id:
-                return task
-        return None
+        changed, removed = self._pending
+        self._pending = None
+        if changed or removed:
+            self._record(changed=tuple(changed.values()), removed=tuple(removed))
+
+    def _record(
+        self,
+        changed: tuple[Task, ...] = (),
+        removed: tuple[int, ...] = (),
+        archived: tuple[int, ...] = (),
+    ) -> None:
+        """Persist a mutation.
+
+        Called once per mutation (or batch) with the tasks it added or
+        updated and the IDs it removed or archived. The JSON store ignores
+        the details and rewrites the whole file; other backends persist
+        only the change.
+        """
+        self._save()
+
+    def signature(self) -> tuple:
+        """Identify the on-disk state backing this store.
+
+        Changes whenever the files are modified or replaced, so a caller
+        keeping the store open can tell when to reload it.
+        """
+        return (file_signature(self.path),)
+
+    def close(self) -> None:
+        """Release resources held by the store. The JSON store holds none."""
 
+    def get_task(self, task_id: int, include_archived: bool = False) -> Optional[Task]:
+        """Get task by ID, searching the archive too if asked."""
+        task = self._by_id.get(task_id)
+        if task is None and include_archived and self.is_archived(task_id):
+            return next((t for t in self.iter_archived() if t.id == task_id), None)
+        return task
+
+    def is_archived(self, task_id: int) -> bool:
+        """Check whether a task ID was moved to the archive."""
+        return in_ranges(self.meta.get("archived", []), task_id)
+
+    def iter_archived(self) -> Iterator[Task]:
+        """Stream archived tasks from the archive file, oldest archive first.
+
+        Raises:
+            RuntimeError: If the archive cannot be read
+        """
+        for record in iter_archive(archive_path_for(self.path), self.meta.get("archived", [])):
+            yield Task.from_dict(record, validate=bool(self.validate))
+
+    @mutation
+    def archive_tasks(self, older_than_days: Optional[float] = None) -> int:
+        """Move finished tasks out of the tasks file into the archive.
+
+        Done and cancelled tasks closed at least ``older_than_days`` ago
+        (default: archive_after_days, else 0) are appended to the archive
+        as one compressed member and removed from the store. Tasks closed
+        before close times were recorded count as old enough. Dependents
+        keep their dependency IDs, which then count as done; a cancelled
+        task is therefore kept while an unfinished task depends on it.
+
+        Returns:
+            Number of tasks archived
+        """
+        if older_than_days is None:
+            older_than_days = self.archive_after_days or 0
+        cutoff = (datetime.now() - timedelta(days=older_than_days)).isoformat()
+
+        tasks = [
+            t for t in self.tasks
+            if t.status in CLOSED_STATUSES
+            and (t.closed_at is None or t.closed_at <= cutoff)  # ISO times sort in order
+            and (
+                t.status == TaskStatus.DONE
+                or all(self._by_id[d].status in CLOSED_STATUSES for d in self._dependents.get(t.id, ()))
+            )
+        ]
+        if not tasks:
+            return 0
+
+        archived_at = datetime.now().isoformat()
+        self.meta["archiveSize"] = append_archive(
+            archive_path_for(self.path),
+            [{**t.to_dict(), "archivedAt": archived_at} for t in tasks],
+            self.meta.get("archiveSize", 0),
+        )
+        ids = {t.id for t in tasks}
+        for task in tasks:
+            self._unindex_task(task)
+        self.tasks = [t for t in self.tasks if t.id not in ids]
+        self.meta["archived"] = add_ranges(self.meta.get("archived", []), ids)
+
+        self._analysis = None
+        self._record(archived=tuple(sorted(ids)))
+        return len(ids)
+
+    @mutation
     def add_task(
         self,
         title: str,
@@ -189,11 +800,9 @@ class TaskStore:
         deps = dependencies or []
 
         # Validate dependencies exist
-        if deps:
-            existing_ids = {t.id for t in self.tasks}
-            for dep_id in deps:
-                if dep_id not in existing_ids:
-                    raise ValueError(f"Dependency {dep_id} does not exist")
+        for dep_id in deps:
+            if dep_id not in self._by_id and not self.is_archived(dep_id):
+                raise ValueError(f"Dependency {dep_id} does not exist")
 
         task = Task(
             id=self.meta["nextId"],
@@ -203,8 +812,9 @@ class TaskStore:
             description=description,
         )
         self.tasks.append(task)
+        self._index_task(task)
         self.meta["nextId"] += 1
-        self._save()
+        self._commit(changed=(task,))
         return task
 
     def _validate_dependencies(
@@ -222,9 +832,8 @@ class TaskStore:
             raise ValueError(f"Task {task_id} cannot have self-reference dependency")
 
         # Existence check
-        existing_ids = {t.id for t in self.tasks}
         for dep_id in dependencies:
-            if dep_id not in existing_ids:
+            if dep_id not in self._by_id and not self.is_archived(dep_id):
                 raise ValueError(f"Dependency {dep_id} does not exist")
 
         # Cycle check: would task_id appear in the dependency chain?
@@ -235,32 +844,28 @@ class TaskStore:
         """Check if setting dependencies would create a cycle.
 
         A cycle exists if task_id appears anywhere in the transitive
-        dependencies of any task in new_deps.
+        dependencies of any task in new_deps. Uses an iterative DFS with
+        one visited set, so each task is expanded at most once and deep
+        chains can't hit the recursion limit.
         """
+        stack = list(new_deps)
         visited: set[int] = set()
 
-        def has_path_to(from_id: int, to_id: int) -> bool:
-            """Check if there's a dependency path from from_id to to_id."""
-            if from_id == to_id:
+        while stack:
+            current = stack.pop()
+            if current == task_id:
                 return True
-            if from_id in visited:
-                return False
-            visited.add(from_id)
+            if current in visited:
+                continue
+            visited.add(current)
 
-            task = self.get_task(from_id)
+            task = self._by_id.get(current)
             if task:
-                for dep_id in task.dependencies:
-                    if has_path_to(dep_id, to_id):
-                        return True
-            return False
+                stack.extend(task.dependencies)
 
-        # Check if any new dependency has a path back to task_id
-        for dep_id in new_deps:
-            visited.clear()
-            if has_path_to(dep_id, task_id):
-                return True
         return False
 
+    @mutation
     def update_task(
         self,
         task_id: int,
@@ -276,23 +881,31 @@ class TaskStore:
             Updated task, or None if not found
 
         Raises:
-            ValueError: If dependency validation fails
+            ValueError: If dependency validation fails or a status or
+                priority is invalid; then the task is left unchanged
         """
         task = self.get_task(task_id)
         if not task:
             return None
 
+        # Validate every field before changing any, so a rejected update
+        # leaves nothing behind for the next save to write
+        if "status" in updates:
+            status = TaskStatus(updates["status"])
+        if "priority" in updates:
+            priority = Priority(updates["priority"])
         if "dependencies" in updates:
             self._validate_dependencies(task_id, updates["dependencies"])
-            task.dependencies = updates["dependencies"]
+
+        if "dependencies" in updates:
+            self._set_dependencies(task, updates["dependencies"])
 
         if "status" in updates:
-            status = updates["status"]
-            task.status = TaskStatus(status) if isinstance(status, str) else status
+            self._set_status(task, status)
 
         if "priority" in updates:
-            priority = updates["priority"]
-            task.priority = Priority(priority) if isinstance(priority, str) else priority
+            task.priority = priority
+            self._refresh(task.id)
 
         if "title" in updates:
             task.title = updates["title"]
@@ -300,51 +913,134 @@ class TaskStore:
         if "description" in updates:
             task.description = updates["description"]
 
-        self._save()
+        self._commit(changed=(task,))
         return task
 
     def is_blocked(self, task: Task) -> bool:
         """Check if task is blocked by incomplete dependencies."""
+        if self._by_id.get(task.id) is task:
+            return task.id in self._blocked
+
+        # Task object not owned by this store: check its own dependencies
         for dep_id in task.dependencies:
             dep = self.get_task(dep_id)
             if dep and dep.status != TaskStatus.DONE:
                 return True
         return False
 
-    def find_next_task(self) -> Optional[Task]:
+    def list_tasks(
+        self,
+        status: Optional[TaskStatus] = None,
+        blocked: bool = False,
+        include_archived: bool = False,
+    ) -> list[Task]:
+        """List tasks in ID order, optionally filtered by status and/or blocked.
+
+        With include_archived, archived tasks matching the filters are
+        streamed from the archive and merged in.
+        """
+        tasks = self.blocked_tasks() if blocked else self.tasks
+        if status is not None:
+            status = TaskStatus(status)
+            tasks = [t for t in tasks if t.status == status]
+        if include_archived and not blocked:  # archived tasks are never blocked
+            archived = (t for t in self.iter_archived() if status is None or t.status == status)
+            tasks = sorted([*tasks, *archived], key=lambda t: t.id)
+        return tasks
+
+    def blocked_tasks(self) -> list[Task]:
+        """Get all tasks blocked by incomplete dependencies, in ID order."""
+        return [self._by_id[task_id] for task_id in sorted(self._blocked)]
+
+    def blocked_ids(self) -> set[int]:
+        """Get the IDs of all tasks blocked by incomplete dependencies."""
+        return set(self._blocked)
+
+    def ready_tasks(self) -> list[Task]:
+        """Get all actionable (pending/in-progress, unblocked) tasks, in ID order."""
+        return [self._by_id[task_id] for task_id in sorted(self._ready)]
+
+    def find_next_task(self, prefer_unblocking: bool = False) -> Optional[Task]:
         """Find the next task to work on.
 
         Selection algorithm:
         1. Filter to actionable tasks (pending/in-progress, not blocked)
         2. Prioritize in-progress over pending
         3. Sort by priority (high > medium > low)
-        4. Then by dependency count (fewer first)
-        5. Then by ID (lower first)
+        4. With prefer_unblocking, then by transitive dependents (more first)
+        5. Then by dependency count (fewer first)
+        6. Then by ID (lower first)
+
+        Actionable tasks are kept in a heap, so this is O(log n) amortized
+        without prefer_unblocking.
+
+        Args:
+            prefer_unblocking: Break priority ties in favour of tasks that
+                unblock the most downstream work
 
         Returns:
             Next task to work on, or None if no actionable tasks
         """
-        priority_order = {Priority.HIGH: 3, Priority.MEDIUM: 2, Priority.LOW: 1}
+        if prefer_unblocking:
+            tasks = self.next_tasks(1, prefer_unblocking=True)
+            return tasks[0] if tasks else None
 
-        # Get actionable tasks
-        actionable = [
-            t for t in self.tasks
-            if t.status in (TaskStatus.PENDING, TaskStatus.IN_PROGRESS)
-            and not self.is_blocked(t)
-        ]
+        heap = self._ready_heap
+        while heap and not self._is_live(heap[0]):
+            heapq.heappop(heap)
 
-        if not actionable:
+        if not heap:
             return None
+        return self._by_id[heap[0][1]]
+
+    def next_tasks(self, n: int, prefer_unblocking: bool = False) -> list[Task]:
+        """Find the top n tasks to work on, e.g. for parallel workers.
+
+        Uses the same ordering as find_next_task, whose result is always
+        first. Costs O(n log n) on top of discarding dead heap entries;
+        prefer_unblocking instead ranks all ready tasks using the graph
+        analysis.
+
+        Args:
+            n: Maximum number of tasks to return
+            prefer_unblocking: Break priority ties in favour of tasks that
+                unblock the most downstream work
+
+        Returns:
+            Up to n actionable tasks, best first
+        """
+        if prefer_unblocking:
+            counts = self.analyze().dependent_counts
+            ready = [self._by_id[task_id] for task_id in self._ready]
+            return heapq.nsmallest(n, ready, key=lambda t: unblocking_key(t, counts))
+
+        heap = self._ready_heap
+        taken: list[tuple] = []
+
+        while heap and len(taken) < n:
+            entry = heapq.heappop(heap)
+            if self._is_live(entry):
+                taken.append(entry)
+
+        for entry in taken:
+            heapq.heappush(heap, entry)
+
+        return [self._by_id[task_id] for _, task_id in taken]
 
-        # Sort: in-progress first, then priority, then deps, then id
-        def sort_key(task: Task) -> tuple:
-            in_progress = 0 if task.status == TaskStatus.IN_PROGRESS else 1
-            priority = -priority_order[task.priority]  # Negative for descending
-            dep_count = len(task.dependencies)
-            return (in_progress, priority, dep_count, task.id)
+    def analyze(self, include_done: bool = False) -> GraphAnalysis:
+        """Analyze the dependency graph: order, levels, critical path, widths.
 
-        actionable.sort(key=sort_key)
-        return actionable[0]
+        By default only remaining (not done) tasks are analyzed; that
+        result is cached until the next change.
+
+        Raises:
+            ValueError: If stored dependencies contain a cycle
+        """
+        if include_done:
+            return analyze_graph(remaining_work_graph(self.tasks, include_done=True))
+        if self._analysis is None:
+            self._analysis = analyze_graph(remaining_work_graph(self.tasks))
+        return self._analysis
 
     def mark_done(self, task_id: int) -> Optional[Task]:
         """Mark a task as done.
@@ -357,6 +1053,7 @@ class TaskStore:
         """
         return self.update_task(task_id, status=TaskStatus.DONE)
 
+    @mutation
     def remove_task(self, task_id: int) -> bool:
         """Remove a task and clean up dependencies.
 
@@ -373,13 +1070,94 @@ class TaskStore:
         if not task:
             return False
 
+        dependent_ids = list(self._dependents.get(task_id, ()))
+
         # Remove from store
+        self._unindex_task(task)
         self.tasks = [t for t in self.tasks if t.id != task_id]
 
-        # Clean up references in other tasks' dependencies
-        for t in self.tasks:
-            if task_id in t.dependencies:
-                t.dependencies = [d for d in t.dependencies if d != task_id]
+        # Clean up references in dependents' dependency lists
+        for dependent_id in dependent_ids:
+            t = self._by_id[dependent_id]
+            t.dependencies = [d for d in t.dependencies if d != task_id]
+            self._refresh(dependent_id)  # dependency count is part of the schedule key
 
-        self._save()
+        self._commit(removed=(task_id,))
         return True
+
+    @mutation
+    def add_tasks(self, specs: list[dict]) -> list[Task]:
+        """Add several tasks with one save, all or nothing.
+
+        Args:
+            specs: add_task arguments per task (title, priority, dependencies,
+                description) plus an optional "alias". Dependencies may be
+                task IDs or aliases of tasks earlier in the batch.
+
+        Returns:
+            The created tasks, in batch order
+
+        Raises:
+            ValueError: If any task is invalid; then no task is added
+        """
+        aliases: dict[str, int] = {}
+        tasks = []
+        with self._batch():
+            for i, spec in enumerate(specs, 1):
+                try:
+                    alias, kwargs = prepare_batch_task(spec, aliases)
+                    task = self.add_task(**kwargs)
+                except (ValueError, TypeError) as e:
+                    raise ValueError(f"Task {i} in batch: {e}") from e
+                if alias is not None:
+                    aliases[alias] = task.id
+                tasks.append(task)
+        return tasks
+
+    @mutation
+    def update_tasks(self, updates: list[dict]) -> list[Task]:
+        """Update several tasks with one save, all or nothing.
+
+        Updates apply in order, so later ones are validated against the
+        earlier ones (e.g. two dependency changes that together form a
+        cycle are rejected).
+
+        Args:
+            updates: update_task fields per task, each with a "task_id"
+
+        Returns:
+            The updated tasks, in batch order
+
+        Raises:
+            ValueError: If a task doesn't exist or an update is invalid;
+                then no task is changed
+        """
+        tasks = []
+        with self._batch():
+            for i, update in enumerate(updates, 1):
+                fields = dict(update)
+                task_id = fields.pop("task_id", None)
+                try:
+                    task = self.update_task(task_id, **fields)
+                    if task is None:
+                        raise ValueError(f"Task {task_id} does not exist")
+                except (ValueError, TypeError) as e:
+                    raise ValueError(f"Update {i} in batch: {e}") from e
+                tasks.append(task)
+        return tasks
+
+    @mutation
+    def remove_tasks(self, task_ids: list[int]) -> int:
+        """Remove several tasks with one save, all or nothing.
+
+        Returns:
+            Number of tasks removed
+
+        Raises:
+            ValueError: If any task doesn't exist; then none are removed
+        """
+        with self._batch():
+            for task_id in task_ids:
+                if not self.remove_task(task_id):
+                    raise ValueError(f"Task {task_id} does not exist")
+        return len(task_ids)
@@ -0,0 +1,207 @@
+"""Tests for archiving finished tasks."""
+
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from persistent_tasks.archive import add_ranges, archive_path_for, in_ranges
+from persistent_tasks.journal import JournalTaskStore
+from persistent_tasks.sqlite_store import SqliteTaskStore
+from persistent_tasks.storage import TaskStore, TaskStatus
+
+
+def build(store) -> None:
+    """Two finished tasks, one of them a dependency of open work."""
+    t1 = store.add_task("Done")                               # 1
+    store.add_task("Open", dependencies=[t1.id])              # 2
+    t3 = store.add_task("Cancelled")                          # 3
+    store.mark_done(t1.id)
+    store.update_task(t3.id, status=TaskStatus.CANCELLED)
+
+
+class TestRanges:
+    """Tests for the archived-ID ranges."""
+
+    def test_merge_and_lookup(self) -> None:
+        """Adjacent and overlapping IDs collapse into ranges."""
+        ranges = add_ranges([[1, 3]], [4, 5, 9, 7])
+        assert ranges == [[1, 5], [7, 7], [9, 9]]
+        assert add_ranges(ranges, [8]) == [[1, 5], [7, 9]]
+        assert [i for i in range(11) if in_ranges(ranges, i)] == [1, 2, 3, 4, 5, 7, 9]
+
+
+class TestArchiveTasks:
+    """Tests for moving tasks into the archive."""
+
+    def test_moves_closed_tasks(self, tmp_path: Path) -> None:
+        """Closed tasks leave the tasks file; their dependents stay unblocked."""
+        tasks_file = tmp_path / "tasks.json"
+        store = TaskStore(tasks_file)
+        build(store)
+
+        assert store.archive_tasks() == 2
+        assert [t.id for t in store.tasks] == [2]
+        assert store.get_task(2).dependencies == [1]
+        assert not store.is_blocked(store.get_task(2))
+        assert archive_path_for(tasks_file).exists()
+
+        data = json.loads(tasks_file.read_text())
+        assert data["meta"]["archived"] == [[1, 1], [3, 3]]
+        reloaded = TaskStore(tasks_file)
+        assert reloaded.find_next_task().id == 2
+        assert reloaded.archive_tasks() == 0
+
+    def test_respects_age(self, tmp_path: Path) -> None:
+        """Only tasks closed before the cutoff are archived."""
+        tasks_file = tmp_path / "tasks.json"
+        store = TaskStore(tasks_file)
+        build(store)
+        data = json.loads(tasks_file.read_text())
+        data["tasks"][0]["closedAt"] = (datetime.now() - timedelta(days=10)).isoformat()
+        tasks_file.write_text(json.dumps(data))
+
+        store = TaskStore(tasks_file)
+        assert store.archive_tasks(older_than_days=7) == 1
+        assert [t.id for t in store.tasks] == [2, 3]
+
+    def test_keeps_cancelled_task_with_open_dependents(self, tmp_path: Path) -> None:
+        """Archiving must not unblock work waiting on a cancelled task."""
+        store = TaskStore(tmp_path / "tasks.json")
+        t1 = store.add_task("Cancelled")
+        store.add_task("Waiting", dependencies=[t1.id])
+        store.update_task(t1.id, status=TaskStatus.CANCELLED)
+
+        assert store.archive_tasks() == 0
+        assert store.find_next_task() is None
+
+    def test_reopening_clears_close_time(self, tmp_path: Path) -> None:
+        """Tasks moved back to an open status aren't archived."""
+        store = TaskStore(tmp_path / "tasks.json")
+        t1 = store.add_task("Task")
+        store.mark_done(t1.id)
+        assert store.get_task(t1.id).closed_at is not None
+
+        store.update_task(t1.id, status=TaskStatus.PENDING)
+        assert store.get_task(t1.id).closed_at is None
+        assert store.archive_tasks() == 0
+
+    def test_archive_after_days_from_environment(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """PERSISTENT_TASKS_ARCHIVE_DAYS archives when the store is opened."""
+        tasks_file = tmp_path / "tasks.json"
+        build(TaskStore(tasks_file))
+
+        monkeypatch.setenv("PERSISTENT_TASKS_ARCHIVE_DAYS", "0")
+        assert [t.id for t in TaskStore(tasks_file).tasks] == [2]
+
+
+class TestArchivedQueries:
+    """Tests for reading archived tasks back."""
+
+    def test_include_archived(self, tmp_path: Path) -> None:
+        """Archived tasks are found only when asked for."""
+        store = TaskStore(tmp_path / "tasks.json")
+        build(store)
+        store.archive_tasks()
+
+        assert store.get_task(1) is None
+        assert store.get_task(1, include_archived=True).title == "Done"
+        assert [t.id for t in store.list_tasks(include_archived=True)] == [1, 2, 3]
+        assert [t.id for t in store.list_tasks(status=TaskStatus.CANCELLED, include_archived=True)] == [3]
+
+    def test_dependencies_on_archived_tasks(self, tmp_path: Path) -> None:
+        """New tasks may depend on archived tasks, which count as done."""
+        store = TaskStore(tmp_path / "tasks.json")
+        build(store)
+        store.archive_tasks()
+
+        t4 = store.add_task("Follow-up", dependencies=[1])
+        assert not store.is_blocked(t4)
+        assert store.update_task(2, dependencies=[1, 3]).dependencies == [1, 3]
+        with pytest.raises(ValueError, match="does not exist"):
+            store.add_task("Bad", dependencies=[99])
+
+    def test_uncommitted_member_is_ignored_and_replaced(self, tmp_path: Path) -> None:
+        """Archive data from a run that never saved the tasks file is dropped."""
+        tasks_file = tmp_path / "tasks.json"
+        store = TaskStore(tasks_file)
+        build(store)
+        store.archive_tasks()
+        with open(archive_path_for(tasks_file), "ab") as f:
+            f.write(b"\x1f\x8b\x08\x00torn")
+
+        store.add_task("Later")
+        store.mark_done(4)
+        assert store.archive_tasks() == 1
+        assert [t.id for t in store.list_tasks(include_archived=True)] == [1, 2, 3, 4]
+
+
+class TestArchiveBackends:
+    """Tests for archives with the other backends."""
+
+    def test_journal_replays_archive(self, tmp_path: Path) -> None:
+        """The journal records archiving without rewriting the snapshot."""
+        tasks_file = tmp_path / "tasks.json"
+        store = JournalTaskStore(tasks_file)
+        build(store)
+        store.archive_tasks()
+        store.close()
+
+        reloaded = JournalTaskStore(tasks_file)
+        assert [t.id for t in reloaded.tasks] == [2]
+        assert reloaded.get_task(2).dependencies == [1]
+        assert reloaded.is_archived(3)
+        assert [t.id for t in reloaded.iter_archived()] == [1, 3]
+
+    def test_sqlite_reads_migrated_archive(self, tmp_path: Path) -> None:
+        """SQLite honours an archive made before migrating and keeps extending it."""
+        tasks_file = tmp_path / "tasks.json"
+        store = TaskStore(tasks_file)
+        build(store)
+        store.archive_tasks()
+
+        db = SqliteTaskStore(tasks_file)
+        assert [t.id for t in db.tasks] == [2]
+        assert db.add_task("Follow-up", dependencies=[1]).id == 4
+        assert db.get_task(3, include_archived=True).status == TaskStatus.CANCELLED
+        assert [t.id for t in db.list_tasks(include_archived=True)] == [1, 2, 3, 4]
+
+        db.mark_done(2)
+        assert db.archive_tasks() == 1
+        assert [t.id for t in db.tasks] == [4]
+        assert db.meta["archived"] == [[1, 3]]
+        assert [t.id for t in db.iter_archived()] == [1, 3, 2]
+        db.close()
+
+    def test_sqlite_archives_like_json_store(self, tmp_path: Path) -> None:
+        """Same selection, ranges and dependency handling as TaskStore."""
+        db = SqliteTaskStore(tmp_path / "tasks.json")
+        build(db)
+        t4 = db.add_task("Cancelled with open dependent")
+        db.add_task("Waiting", dependencies=[t4.id])
+        db.update_task(t4.id, status=TaskStatus.CANCELLED)
+
+        assert db.get_task(1).closed_at is not None
+        assert db.archive_tasks() == 2
+        assert [t.id for t in db.tasks] == [2, 4, 5]
+        assert db.meta["archived"] == [[1, 1], [3, 3]]
+        assert db.get_task(2).dependencies == [1]
+        assert not db.is_blocked(db.get_task(2))
+        assert db.meta["archiveSize"] == archive_path_for(tmp_path / "tasks.json").stat().st_size
+        db.close()
+
+    def test_sqlite_respects_age_and_keeps_close_times(self, tmp_path: Path) -> None:
+        """Close times survive migration and limit what is archived."""
+        tasks_file = tmp_path / "tasks.json"
+        build(TaskStore(tasks_file))
+        data = json.loads(tasks_file.read_text())
+        data["tasks"][0]["closedAt"] = (datetime.now() - timedelta(days=10)).isoformat()
+        tasks_file.write_text(json.dumps(data))
+
+        db = SqliteTaskStore(tasks_file, archive_after_days=7)
+        assert [t.id for t in db.tasks] == [2, 3]
+        assert db.get_task(3).closed_at == data["tasks"][2]["closedAt"]
+        db.update_task(3, status=TaskStatus.PENDING)
+        assert db.get_task(3).closed_at is None
+        db.close()
@@ -0,0 +1,115 @@
+"""Tests for dependency graph analytics."""
+
+from pathlib import Path
+
+import pytest
+
+from persistent_tasks.graph import analyze_graph
+from persistent_tasks.sqlite_store import SqliteTaskStore
+from persistent_tasks.storage import TaskStore, Priority
+
+
+class TestAnalyzeGraph:
+    """Tests for the graph analysis itself."""
+
+    def test_diamond(self) -> None:
+        """Levels, widths, critical path and dependents of a diamond."""
+        #   1
+        #  / \
+        # 2   3
+        #  \ /
+        #   4     5 (independent)
+        analysis = analyze_graph({1: [], 2: [1], 3: [1], 4: [2, 3], 5: []})
+
+        assert analysis.order == [1, 5, 2, 3, 4]
+        assert analysis.levels == {1: 0, 5: 0, 2: 1, 3: 1, 4: 2}
+        assert analysis.level_widths == [2, 2, 1]
+        assert analysis.max_width == 2
+        assert analysis.critical_path == [1, 2, 4]
+        assert analysis.critical_path_length == 3
+        assert analysis.dependent_counts == {1: 3, 2: 1, 3: 1, 4: 0, 5: 0}
+
+    def test_order_respects_dependencies(self) -> None:
+        """Every task comes after its dependencies."""
+        graph = {i: [j for j in range(1, i) if i % j == 0] for i in range(1, 60)}
+        analysis = analyze_graph(graph)
+
+        position = {task_id: n for n, task_id in enumerate(analysis.order)}
+        for task_id, deps in graph.items():
+            assert all(position[d] < position[task_id] for d in deps)
+        assert analysis.dependent_counts[1] == 58
+
+    def test_ignores_dependencies_outside_graph(self) -> None:
+        """Dependencies on missing (e.g. done) tasks are satisfied."""
+        analysis = analyze_graph({2: [1], 3: [2]})
+        assert analysis.levels == {2: 0, 3: 1}
+
+    def test_cycle_raises(self) -> None:
+        """Cyclic data is reported, not looped on."""
+        with pytest.raises(ValueError, match=r"cycle among tasks \[1, 2\]"):
+            analyze_graph({1: [2], 2: [1], 3: []})
+
+    def test_large_graph_estimates_dependent_counts(self) -> None:
+        """Above the exact limit, counts are estimated: exact on chains, capped with overlap."""
+        chain = {i: [i - 1] if i > 1 else [] for i in range(1, 6)}
+        estimated = analyze_graph(chain, exact_limit=4)
+        assert not estimated.dependent_counts_exact
+        assert estimated.dependent_counts == analyze_graph(chain).dependent_counts
+
+        diamond = {1: [], 2: [1], 3: [1], 4: [2, 3]}
+        estimated = analyze_graph(diamond, exact_limit=3)
+        assert estimated.dependent_counts[1] == 3  # 4 counted twice, then capped
+        assert estimated.critical_path == [1, 2, 4]
+        assert analyze_graph(diamond).dependent_counts_exact
+
+    def test_empty(self) -> None:
+        """An empty graph has no critical path or width."""
+        analysis = analyze_graph({})
+        assert analysis.critical_path_length == 0
+        assert analysis.max_width == 0
+
+
+class TestStoreAnalysis:
+    """Tests for analytics on the stores."""
+
+    def build(self, store) -> None:
+        """A priority tie where the higher-ID task unblocks more work."""
+        store.add_task("Leaf")                          # 1
+        store.add_task("Hub")                           # 2
+        store.add_task("Needs hub", dependencies=[2])   # 3
+        store.add_task("Needs both", dependencies=[2, 3])  # 4
+        store.add_task("Done", priority=Priority.HIGH)  # 5
+        store.mark_done(5)
+
+    @pytest.mark.parametrize("backend", [TaskStore, SqliteTaskStore])
+    def test_prefer_unblocking_breaks_ties(self, tmp_path: Path, backend) -> None:
+        """prefer_unblocking picks the task with more dependents."""
+        store = backend(tmp_path / "tasks.json")
+        self.build(store)
+
+        assert store.find_next_task().id == 1
+        assert store.find_next_task(prefer_unblocking=True).id == 2
+        assert [t.id for t in store.next_tasks(5, prefer_unblocking=True)] == [2, 1]
+        store.close()
+
+    @pytest.mark.parametrize("backend", [TaskStore, SqliteTaskStore])
+    def test_analyze_remaining_work(self, tmp_path: Path, backend) -> None:
+        """Done tasks are excluded unless asked for."""
+        store = backend(tmp_path / "tasks.json")
+        self.build(store)
+
+        analysis = store.analyze()
+        assert 5 not in analysis.levels
+        assert analysis.critical_path == [2, 3, 4]
+        assert analysis.dependent_counts[2] == 2
+        assert 5 in store.analyze(include_done=True).levels
+        store.close()
+
+    def test_cache_invalidated_by_changes(self, tmp_path: Path) -> None:
+        """The cached analysis is refreshed after a mutation."""
+        store = TaskStore(tmp_path / "tasks.json")
+        self.build(store)
+
+        assert store.analyze() is store.analyze()
+        store.mark_done(2)
+        assert 2 not in store.analyze().levels
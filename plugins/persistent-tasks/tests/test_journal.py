@@ -0,0 +1,159 @@
+"""Tests for the journal storage backend."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from persistent_tasks.backends import open_store
+from persistent_tasks.journal import JournalTaskStore, journal_path_for
+from persistent_tasks.storage import TaskStore, TaskStatus, Priority
+
+
+def journal_lines(tasks_file: Path) -> list[dict]:
+    """Read journal records for a tasks file."""
+    text = journal_path_for(tasks_file).read_text()
+    return [json.loads(line) for line in text.splitlines() if line]
+
+
+class TestJournalWrites:
+    """Tests for appending mutations."""
+
+    def test_mutations_append_without_rewriting_snapshot(self, tmp_path: Path) -> None:
+        """Mutations go to the journal; the snapshot stays as created."""
+        tasks_file = tmp_path / "tasks.json"
+        store = JournalTaskStore(tasks_file)
+        snapshot = tasks_file.read_text()
+
+        t1 = store.add_task("Task 1")
+        store.update_task(t1.id, priority=Priority.HIGH)
+        store.remove_task(t1.id)
+        store.close()
+
+        assert tasks_file.read_text() == snapshot
+        assert [r["op"] for r in journal_lines(tasks_file)] == ["put", "put", "remove"]
+        assert [r["seq"] for r in journal_lines(tasks_file)] == [1, 2, 3]
+
+    def test_replay_restores_state(self, tmp_path: Path) -> None:
+        """Reloading replays the journal on top of the snapshot."""
+        tasks_file = tmp_path / "tasks.json"
+        store = JournalTaskStore(tasks_file)
+        t1 = store.add_task("Task 1")
+        t2 = store.add_task("Task 2", dependencies=[t1.id])
+        t3 = store.add_task("Task 3", dependencies=[t1.id])
+        store.mark_done(t2.id)
+        store.remove_task(t1.id)
+        store.close()
+
+        store2 = JournalTaskStore(tasks_file)
+        assert [t.id for t in store2.tasks] == [t2.id, t3.id]
+        assert store2.get_task(t2.id).status == TaskStatus.DONE
+        assert store2.get_task(t3.id).dependencies == []
+        assert store2.add_task("Task 4").id == 4
+
+
+class TestJournalCompaction:
+    """Tests for folding the journal into the snapshot."""
+
+    def test_compacts_after_threshold(self, tmp_path: Path) -> None:
+        """Journal is folded into the snapshot and truncated."""
+        tasks_file = tmp_path / "tasks.json"
+        store = JournalTaskStore(tasks_file, compact_every=3)
+        for i in range(4):
+            store.add_task(f"Task {i}")
+        store.close()
+
+        data = json.loads(tasks_file.read_text())
+        assert len(data["tasks"]) == 3
+        assert data["meta"]["journalSeq"] == 3
+        assert [r["seq"] for r in journal_lines(tasks_file)] == [4]
+        assert len(JournalTaskStore(tasks_file).tasks) == 4
+
+    def test_skips_records_already_in_snapshot(self, tmp_path: Path) -> None:
+        """A crash between snapshot and truncation doesn't replay twice."""
+        tasks_file = tmp_path / "tasks.json"
+        store = JournalTaskStore(tasks_file)
+        t1 = store.add_task("Task 1")
+        store.add_task("Task 2", dependencies=[t1.id])
+        store.remove_task(t1.id)
+        store.close()
+        journal = journal_path_for(tasks_file).read_text()
+
+        store.compact()
+        journal_path_for(tasks_file).write_text(journal)  # truncation "lost"
+
+        store2 = JournalTaskStore(tasks_file)
+        assert [t.id for t in store2.tasks] == [2]
+
+    def test_torn_last_line_is_discarded(self, tmp_path: Path) -> None:
+        """A partial final record from a crash is ignored and cleaned up."""
+        tasks_file = tmp_path / "tasks.json"
+        store = JournalTaskStore(tasks_file)
+        store.add_task("Task 1")
+        store.close()
+        with open(journal_path_for(tasks_file), "a") as f:
+            f.write('{"seq": 2, "op": "pu')
+
+        store2 = JournalTaskStore(tasks_file)
+        assert [t.title for t in store2.tasks] == ["Task 1"]
+        assert journal_path_for(tasks_file).read_text() == ""
+
+        store2.add_task("Task 2")
+        store2.close()
+        assert len(JournalTaskStore(tasks_file).tasks) == 2
+
+    def test_corrupt_middle_line_raises_runtime_error(self, tmp_path: Path) -> None:
+        """A bad record before the end is an error, not silently skipped."""
+        tasks_file = tmp_path / "tasks.json"
+        store = JournalTaskStore(tasks_file)
+        store.add_task("Task 1")
+        store.close()
+        journal = journal_path_for(tasks_file)
+        journal.write_text("{not json}\n" + journal.read_text())
+
+        with pytest.raises(RuntimeError, match="Failed to parse journal"):
+            JournalTaskStore(tasks_file)
+
+
+class TestOpenStore:
+    """Tests for backend selection."""
+
+    def test_backend_from_environment(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """PERSISTENT_TASKS_BACKEND selects the backend."""
+        monkeypatch.setenv("PERSISTENT_TASKS_BACKEND", "journal")
+        store = open_store(tmp_path / "tasks.json")
+        assert isinstance(store, JournalTaskStore)
+        store.close()
+
+    def test_unknown_backend_raises(self, tmp_path: Path) -> None:
+        """Unknown backend names are rejected."""
+        with pytest.raises(ValueError, match="Unknown storage backend"):
+            open_store(tmp_path / "tasks.json", backend="nope")
+
+    def test_json_backend_folds_leftover_journal(self, tmp_path: Path) -> None:
+        """Switching back to JSON keeps journaled changes."""
+        tasks_file = tmp_path / "tasks.json"
+        store = open_store(tasks_file, backend="journal")
+        store.add_task("Task 1")
+        store.close()
+
+        store2 = open_store(tasks_file, backend="json")
+        assert type(store2) is TaskStore
+        assert [t.title for t in store2.tasks] == ["Task 1"]
+        assert journal_path_for(tasks_file).read_text() == ""
+
+
+class TestJournalBatches:
+    """Tests for batch mutations in the journal."""
+
+    def test_batch_is_one_record(self, tmp_path: Path) -> None:
+        """A batch is appended as a single record and replays fully."""
+        tasks_file = tmp_path / "tasks.json"
+        store = JournalTaskStore(tasks_file)
+        store.add_tasks([{"title": "A", "alias": "a"}, {"title": "B", "dependencies": ["a"]}])
+        store.remove_tasks([1])
+        store.close()
+
+        assert [r["op"] for r in journal_lines(tasks_file)] == ["batch", "remove"]
+        store2 = JournalTaskStore(tasks_file)
+        assert [(t.id, t.dependencies) for t in store2.tasks] == [(2, [])]
@@ -0,0 +1,141 @@
+"""Tests for the MCP server's store handling."""
+
+import asyncio
+import json
+import threading
+from pathlib import Path
+
+import pytest
+from mcp.types import CallToolRequest, CallToolRequestParams
+
+from persistent_tasks.server import StoreCache, create_server
+from persistent_tasks.storage import TaskStore
+
+
+async def call(server, name: str, arguments: dict) -> str:
+    """Invoke a tool through the server's request handler."""
+    handler = server.request_handlers[CallToolRequest]
+    request = CallToolRequest(
+        method="tools/call",
+        params=CallToolRequestParams(name=name, arguments=arguments),
+    )
+    result = await handler(request)
+    return result.root.content[0].text
+
+
+class TestStoreCache:
+    """Tests for reusing stores across calls."""
+
+    def test_reuses_store_when_unchanged(self, tmp_path: Path) -> None:
+        """The same store object is returned while files are unchanged."""
+        stores = StoreCache()
+        store = stores.get(tmp_path / "tasks.json")
+        assert stores.get(tmp_path / "tasks.json") is store
+        stores.close()
+
+    def test_own_writes_do_not_reload(self, tmp_path: Path) -> None:
+        """Writes recorded with mark_written keep the cached store."""
+        stores = StoreCache()
+        store = stores.get(tmp_path / "tasks.json")
+        store.add_task("Task")
+        stores.mark_written(store)
+
+        assert stores.get(tmp_path / "tasks.json") is store
+        stores.close()
+
+    def test_reloads_after_external_edit(self, tmp_path: Path) -> None:
+        """Another writer's changes are picked up."""
+        tasks_file = tmp_path / "tasks.json"
+        stores = StoreCache()
+        store = stores.get(tasks_file)
+
+        TaskStore(tasks_file).add_task("From elsewhere")
+
+        reloaded = stores.get(tasks_file)
+        assert reloaded is not store
+        assert [t.title for t in reloaded.tasks] == ["From elsewhere"]
+        stores.close()
+
+
+class TestServerCalls:
+    """Tests for tool calls sharing one store."""
+
+    @pytest.fixture
+    def project(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+        """Project directory with a local tasks file."""
+        tasks_file = tmp_path / ".claude" / "tasks" / "tasks.json"
+        tasks_file.parent.mkdir(parents=True)
+        tasks_file.write_text(json.dumps({"tasks": [], "meta": {"nextId": 1}}))
+        monkeypatch.chdir(tmp_path)
+        return tasks_file
+
+    async def test_calls_share_store_and_see_external_edits(self, project: Path) -> None:
+        """Writes are visible to later calls, as are outside edits."""
+        stores = StoreCache()
+        server = create_server(stores)
+
+        assert await call(server, "add_task", {"title": "First"}) == "Added task #1: First"
+        store = stores.get(project)
+
+        TaskStore(project).add_task("Second")
+        listing = await call(server, "list_tasks", {})
+
+        assert "#1 [pending] [medium] First" in listing
+        assert "#2 [pending] [medium] Second" in listing
+        assert stores.get(project) is not store
+        stores.close()
+
+    async def test_calls_run_off_the_event_loop(self, project: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Tool calls run on the worker thread, one at a time."""
+        stores = StoreCache()
+        server = create_server(stores)
+        threads = set()
+        original = TaskStore.add_task
+
+        def recording_add_task(self, *args, **kwargs):
+            threads.add(threading.current_thread())
+            return original(self, *args, **kwargs)
+
+        monkeypatch.setattr(TaskStore, "add_task", recording_add_task)
+        results = await asyncio.gather(*(call(server, "add_task", {"title": f"T{i}"}) for i in range(20)))
+
+        assert sorted(int(r.split("#")[1].split(":")[0]) for r in results) == list(range(1, 21))
+        assert len(threads) == 1 and threading.main_thread() not in threads
+        stores.close()
+
+    async def test_sqlite_store_used_from_worker(
+        self, project: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """The SQLite backend works from the worker thread and closes from the main one."""
+        monkeypatch.setenv("PERSISTENT_TASKS_BACKEND", "sqlite")
+        stores = StoreCache()
+        server = create_server(stores)
+
+        assert await call(server, "add_task", {"title": "First"}) == "Added task #1: First"
+        assert "First" in await call(server, "list_tasks", {})
+        stores.close()
+
+    async def test_list_tasks_flags_rows_without_per_row_queries(
+        self, project: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Blocked and archived flags cost a fixed number of SQLite queries."""
+        monkeypatch.setenv("PERSISTENT_TASKS_BACKEND", "sqlite")
+        stores = StoreCache()
+        server = create_server(stores)
+        await call(server, "add_task", {"title": "Old"})
+        await call(server, "update_task", {"task_id": 1, "status": "done"})
+        await call(server, "archive_tasks", {"older_than_days": 0})
+        await call(server, "add_task", {"title": "Root"})
+        for i in range(20):
+            await call(server, "add_task", {"title": f"Child {i}", "dependencies": [2]})
+
+        statements = []
+        stores.get(project)._conn.set_trace_callback(statements.append)
+        listing = await call(server, "list_tasks", {"include_archived": True})
+
+        assert "#1 [done] [medium] Old [archived]" in listing
+        assert "#3 [pending] [medium] Child 0 (deps: [2]) [BLOCKED]" in listing
+        assert "#2 [pending] [medium] Root\n" in listing
+        assert sum("FROM meta" in s for s in statements) <= 3
+        assert len(statements) < 15
+        stores.close()
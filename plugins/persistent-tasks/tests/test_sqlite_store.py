@@ -0,0 +1,209 @@
+"""Tests for the SQLite storage backend."""
+
+import json
+import multiprocessing
+from pathlib import Path
+
+import pytest
+
+from persistent_tasks.backends import open_store
+from persistent_tasks.journal import JournalTaskStore
+from persistent_tasks.sqlite_store import SqliteTaskStore, database_path_for
+from persistent_tasks.storage import TaskStore, TaskStatus, Priority
+
+
+def add_from_process(tasks_file: Path, count: int) -> None:
+    """Add tasks from a separate process, each depending on task 1."""
+    store = SqliteTaskStore(tasks_file)
+    for i in range(count):
+        store.add_task(f"Task {i}", dependencies=[1])
+    store.close()
+
+
+def update_from_process(tasks_file: Path, field: str, count: int) -> None:
+    """Repeatedly set one field of task 1 from a separate process."""
+    store = SqliteTaskStore(tasks_file)
+    for i in range(count):
+        store.update_task(1, **{field: f"{field} {i}"})
+    store.close()
+
+
+def run_processes(target, args_list: list[tuple]) -> None:
+    """Run target in one forked process per argument tuple and wait for all."""
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=target, args=args) for args in args_list]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=60)
+        assert process.exitcode == 0
+
+
+@pytest.fixture
+def store(tmp_path: Path):
+    """SQLite store in a temporary directory."""
+    store = SqliteTaskStore(tmp_path / "tasks.json")
+    yield store
+    store.close()
+
+
+class TestSqliteBasics:
+    """Tests for the TaskStore API on SQLite."""
+
+    def test_creates_database_not_json(self, tmp_path: Path, store: SqliteTaskStore) -> None:
+        """Store creates tasks.db and leaves tasks.json alone."""
+        assert database_path_for(tmp_path / "tasks.json").exists()
+        assert not (tmp_path / "tasks.json").exists()
+        assert store.meta["nextId"] == 1
+
+    def test_add_and_get_round_trip(self, store: SqliteTaskStore) -> None:
+        """Added tasks come back with all fields and dependency order."""
+        t1 = store.add_task("Task 1")
+        t2 = store.add_task("Task 2")
+        t3 = store.add_task("Task 3", priority=Priority.HIGH, dependencies=[t2.id, t1.id], description="Desc")
+
+        assert store.get_task(t3.id) == t3
+        assert store.get_task(t3.id).dependencies == [t2.id, t1.id]
+        assert store.get_task(99) is None
+
+    def test_persists_across_connections(self, tmp_path: Path, store: SqliteTaskStore) -> None:
+        """Tasks and next ID survive reopening."""
+        store.add_task("Task 1")
+        store.remove_task(1)
+
+        store2 = SqliteTaskStore(tmp_path / "tasks.json")
+        assert store2.tasks == []
+        assert store2.add_task("Task 2").id == 2
+        store2.close()
+
+    def test_dependency_validation_matches_json_store(self, store: SqliteTaskStore) -> None:
+        """Same validation errors as TaskStore."""
+        t1 = store.add_task("Task 1")
+        t2 = store.add_task("Task 2", dependencies=[t1.id])
+        t3 = store.add_task("Task 3", dependencies=[t2.id])
+
+        with pytest.raises(ValueError, match="does not exist"):
+            store.add_task("Bad", dependencies=[99])
+        with pytest.raises(ValueError, match="self-reference"):
+            store.update_task(t1.id, dependencies=[t1.id])
+        with pytest.raises(ValueError, match="cycle"):
+            store.update_task(t1.id, dependencies=[t3.id])
+
+    def test_remove_clears_from_dependents(self, store: SqliteTaskStore) -> None:
+        """Removing a task removes it from dependency lists."""
+        t1 = store.add_task("Task 1")
+        t2 = store.add_task("Task 2")
+        t3 = store.add_task("Task 3", dependencies=[t1.id, t2.id])
+
+        assert store.remove_task(t1.id)
+        assert not store.remove_task(t1.id)
+        assert store.get_task(t3.id).dependencies == [t2.id]
+
+
+class TestSqliteQueries:
+    """Tests for SQL-side filtering and scheduling."""
+
+    def test_list_filters(self, store: SqliteTaskStore) -> None:
+        """Status and blocked filters run in SQL."""
+        t1 = store.add_task("Task 1")
+        t2 = store.add_task("Task 2", dependencies=[t1.id])
+        t3 = store.add_task("Task 3")
+        store.mark_done(t3.id)
+
+        assert [t.id for t in store.list_tasks(status=TaskStatus.PENDING)] == [t1.id, t2.id]
+        assert [t.id for t in store.list_tasks(blocked=True)] == [t2.id]
+        assert store.is_blocked(store.get_task(t2.id))
+
+        store.mark_done(t1.id)
+        assert store.list_tasks(blocked=True) == []
+        assert not store.is_blocked(store.get_task(t2.id))
+
+    def test_next_task_ordering_matches_json_store(self, tmp_path: Path, store: SqliteTaskStore) -> None:
+        """find_next_task and next_tasks agree with TaskStore."""
+        json_store = TaskStore(tmp_path / "other" / "tasks.json")
+        for s in (store, json_store):
+            s.add_task("Low", priority=Priority.LOW)
+            s.add_task("High", priority=Priority.HIGH)
+            s.add_task("High with dep", priority=Priority.HIGH, dependencies=[1])
+            s.mark_done(1)
+            s.add_task("Blocked", priority=Priority.HIGH, dependencies=[2])
+            s.add_task("Started", priority=Priority.LOW)
+            s.update_task(5, status=TaskStatus.IN_PROGRESS)
+
+        expected = [t.id for t in json_store.next_tasks(10)]
+        assert expected == [5, 2, 3]
+        assert [t.id for t in store.next_tasks(10)] == expected
+        assert store.find_next_task().id == 5
+
+
+class TestSqliteMigration:
+    """Tests for importing tasks.json."""
+
+    def test_imports_json_and_journal(self, tmp_path: Path) -> None:
+        """Existing tasks (including journaled changes) are imported once."""
+        tasks_file = tmp_path / "tasks.json"
+        source = JournalTaskStore(tasks_file)
+        t1 = source.add_task("Task 1", priority=Priority.HIGH)
+        source.add_task("Task 2", dependencies=[t1.id])
+        source.close()
+
+        store = open_store(tasks_file, backend="sqlite")
+        assert [t.title for t in store.tasks] == ["Task 1", "Task 2"]
+        assert store.get_task(2).dependencies == [1]
+        assert store.add_task("Task 3").id == 3
+        store.close()
+
+        assert len(json.loads(tasks_file.read_text())["tasks"]) == 2
+        store2 = SqliteTaskStore(tasks_file)
+        assert len(store2.tasks) == 3
+        store2.close()
+
+
+class TestSqliteBatches:
+    """Tests for batch operations in one transaction."""
+
+    def test_add_tasks_with_aliases(self, store: SqliteTaskStore) -> None:
+        """Aliases resolve to IDs assigned inside the transaction."""
+        tasks = store.add_tasks([
+            {"title": "A", "alias": "a"},
+            {"title": "B", "dependencies": ["a"]},
+        ])
+        assert store.get_task(tasks[1].id).dependencies == [tasks[0].id]
+
+    def test_failed_batch_rolls_back(self, store: SqliteTaskStore) -> None:
+        """Nothing from a failed batch is committed."""
+        t1 = store.add_task("Task 1")
+
+        with pytest.raises(ValueError, match="Task 2 in batch"):
+            store.add_tasks([{"title": "A"}, {"title": "B", "dependencies": [99]}])
+        with pytest.raises(ValueError, match="does not exist"):
+            store.remove_tasks([t1.id, 99])
+
+        assert [t.id for t in store.tasks] == [t1.id]
+        assert store.add_task("Next").id == 2
+
+
+class TestSqliteConcurrency:
+    """Tests for several processes writing to one database."""
+
+    def test_concurrent_adds_get_unique_ids(self, tmp_path: Path, store: SqliteTaskStore) -> None:
+        """Reading nextId and inserting happen in one write transaction."""
+        tasks_file = tmp_path / "tasks.json"
+        store.add_task("Root")
+
+        run_processes(add_from_process, [(tasks_file, 100) for _ in range(4)])
+
+        ids = [t.id for t in store.tasks]
+        assert ids == list(range(1, 402))
+        assert store.meta["nextId"] == 402
+
+    def test_concurrent_updates_to_different_fields(self, tmp_path: Path, store: SqliteTaskStore) -> None:
+        """An update writes only its own fields, so neither writer's change is lost."""
+        tasks_file = tmp_path / "tasks.json"
+        store.add_task("Root")
+
+        run_processes(update_from_process, [(tasks_file, "title", 200), (tasks_file, "description", 200)])
+
+        task = store.get_task(1)
+        assert task.title == "title 199"
+        assert task.description == "description 199"
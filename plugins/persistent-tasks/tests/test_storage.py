@@ -168,6 +168,21 @@ class TestUpdateTask:
         with pytest.raises(ValueError, match="cycle"):
             store.update_task(t1.id, dependencies=[t3.id])
 
+    def test_rejected_update_changes_nothing(self, tmp_path: Path) -> None:
+        """An invalid field rejects the whole update, so no change reaches disk later."""
+        tasks_file = tmp_path / "tasks.json"
+        store = TaskStore(tasks_file)
+        a = store.add_task("A")
+        b = store.add_task("B")
+
+        with pytest.raises(ValueError):
+            store.update_task(b.id, dependencies=[a.id], status="bogus")
+        assert store.get_task(b.id).dependencies == []
+        assert not store.is_blocked(b)
+
+        store.add_task("C")
+        assert TaskStore(tasks_file).get_task(b.id).dependencies == []
+
 
 class TestFindNextTask:
     """Tests for intelligent next task selection."""
@@ -409,3 +424,434 @@ class TestCorruptFileHandling:
 
         assert tasks_file.exists()
         assert not temp_file.exists()
+
+
+class TestDependencyIndexes:
+    """Tests for the incrementally maintained lookup and scheduling indexes."""
+
+    def test_blocked_and_ready_sets_follow_status(self, tmp_path: Path) -> None:
+        """Blocked/ready sets update as dependencies complete and reopen."""
+        store = TaskStore(tmp_path / "tasks.json")
+        t1 = store.add_task("Task 1")
+        t2 = store.add_task("Task 2", dependencies=[t1.id])
+
+        assert store.blocked_tasks() == [t2]
+        assert store.ready_tasks() == [t1]
+
+        store.mark_done(t1.id)
+        assert store.blocked_tasks() == []
+        assert store.ready_tasks() == [t2]
+
+        store.update_task(t1.id, status=TaskStatus.PENDING)
+        assert store.blocked_tasks() == [t2]
+        assert store.ready_tasks() == [t1]
+
+    def test_update_dependencies_reindexes(self, tmp_path: Path) -> None:
+        """Replacing dependencies moves edges in the reverse index."""
+        store = TaskStore(tmp_path / "tasks.json")
+        t1 = store.add_task("Task 1")
+        t2 = store.add_task("Task 2")
+        t3 = store.add_task("Task 3", dependencies=[t1.id])
+
+        store.mark_done(t2.id)
+        store.update_task(t3.id, dependencies=[t2.id])
+
+        assert not store.is_blocked(t3)
+        store.update_task(t1.id, status=TaskStatus.DONE)
+        store.update_task(t1.id, status=TaskStatus.PENDING)
+        assert not store.is_blocked(t3)
+
+    def test_remove_unblocks_dependents(self, tmp_path: Path) -> None:
+        """Removing an unfinished dependency unblocks its dependents."""
+        store = TaskStore(tmp_path / "tasks.json")
+        t1 = store.add_task("Task 1")
+        t2 = store.add_task("Task 2", dependencies=[t1.id])
+
+        store.remove_task(t1.id)
+        assert not store.is_blocked(t2)
+        assert store.find_next_task() == t2
+
+    def test_duplicate_dependency_counted_once(self, tmp_path: Path) -> None:
+        """A dependency listed twice unblocks when it is done."""
+        tasks_file = tmp_path / "tasks.json"
+        tasks_file.write_text(json.dumps({
+            "tasks": [
+                {"id": 1, "title": "A", "status": "pending", "dependencies": []},
+                {"id": 2, "title": "B", "status": "pending", "dependencies": [1, 1]},
+            ],
+            "meta": {"nextId": 3}
+        }))
+        store = TaskStore(tasks_file)
+
+        store.mark_done(1)
+        assert not store.is_blocked(store.get_task(2))
+
+    def test_indexes_rebuilt_on_load(self, tmp_path: Path) -> None:
+        """Reloaded store reports the same blocked tasks."""
+        tasks_file = tmp_path / "tasks.json"
+        store = TaskStore(tasks_file)
+        t1 = store.add_task("Task 1")
+        store.add_task("Task 2", dependencies=[t1.id])
+
+        store2 = TaskStore(tasks_file)
+        assert [t.id for t in store2.blocked_tasks()] == [2]
+        assert store2.find_next_task().id == 1
+
+    def test_cycle_check_handles_deep_chain(self, tmp_path: Path) -> None:
+        """Cycle detection works on chains deeper than the recursion limit."""
+        tasks_file = tmp_path / "tasks.json"
+        depth = 5000
+        tasks_file.write_text(json.dumps({
+            "tasks": [
+                {"id": i, "title": f"T{i}", "status": "pending",
+                 "dependencies": [i - 1] if i > 1 else []}
+                for i in range(1, depth + 1)
+            ],
+            "meta": {"nextId": depth + 1}
+        }))
+        store = TaskStore(tasks_file)
+
+        with pytest.raises(ValueError, match="cycle"):
+            store.update_task(1, dependencies=[depth])
+
+
+class TestNextTasks:
+    """Tests for heap-based scheduling of multiple tasks."""
+
+    def test_returns_top_n_in_order(self, tmp_path: Path) -> None:
+        """next_tasks returns actionable tasks in find_next_task order."""
+        store = TaskStore(tmp_path / "tasks.json")
+        low = store.add_task("Low", priority=Priority.LOW)
+        high = store.add_task("High", priority=Priority.HIGH)
+        medium = store.add_task("Medium")
+        started = store.add_task("Started", priority=Priority.LOW)
+        store.update_task(started.id, status=TaskStatus.IN_PROGRESS)
+
+        assert store.next_tasks(3) == [started, high, medium]
+        assert store.next_tasks(10) == [started, high, medium, low]
+        assert store.find_next_task() == started
+
+    def test_excludes_blocked_and_done(self, tmp_path: Path) -> None:
+        """Blocked and done tasks are never returned."""
+        store = TaskStore(tmp_path / "tasks.json")
+        t1 = store.add_task("Task 1")
+        t2 = store.add_task("Task 2", dependencies=[t1.id])
+        t3 = store.add_task("Task 3")
+        store.mark_done(t3.id)
+
+        assert store.next_tasks(5) == [t1]
+
+        store.mark_done(t1.id)
+        assert store.next_tasks(5) == [t2]
+
+    def test_priority_change_reorders(self, tmp_path: Path) -> None:
+        """Changing priority back and forth doesn't duplicate tasks."""
+        store = TaskStore(tmp_path / "tasks.json")
+        t1 = store.add_task("Task 1")
+        t2 = store.add_task("Task 2")
+
+        store.update_task(t2.id, priority=Priority.HIGH)
+        assert store.find_next_task() == t2
+        store.update_task(t2.id, priority=Priority.MEDIUM)
+        store.update_task(t2.id, priority=Priority.HIGH)
+
+        assert store.next_tasks(5) == [t2, t1]
+
+    def test_remove_dependency_updates_order(self, tmp_path: Path) -> None:
+        """Removing a done dependency lowers the dependent's dependency count."""
+        store = TaskStore(tmp_path / "tasks.json")
+        t1 = store.add_task("Task 1")
+        store.mark_done(t1.id)
+        t2 = store.add_task("Task 2", dependencies=[t1.id])
+        t3 = store.add_task("Task 3")
+
+        assert store.find_next_task() == t3
+        store.remove_task(t1.id)
+        assert store.find_next_task() == t2
+
+    def test_zero_returns_empty(self, tmp_path: Path) -> None:
+        """Asking for no tasks returns an empty list."""
+        store = TaskStore(tmp_path / "tasks.json")
+        store.add_task("Task")
+        assert store.next_tasks(0) == []
+
+
+def _add_tasks_in_process(tasks_file: str, prefix: str, count: int) -> None:
+    """Worker for multiprocess tests: add tasks through a fresh store."""
+    store = TaskStore(Path(tasks_file))
+    for i in range(count):
+        store.add_task(f"{prefix}-{i}")
+
+
+class TestConcurrentWriters:
+    """Tests for several stores sharing one tasks file."""
+
+    def test_stale_store_does_not_lose_updates(self, tmp_path: Path) -> None:
+        """A store reloads before mutating if another store saved."""
+        tasks_file = tmp_path / "tasks.json"
+        store1 = TaskStore(tasks_file)
+        store2 = TaskStore(tasks_file)
+
+        t1 = store1.add_task("From store 1")
+        t2 = store2.add_task("From store 2")
+
+        assert t1.id != t2.id
+        titles = [t.title for t in TaskStore(tasks_file).tasks]
+        assert titles == ["From store 1", "From store 2"]
+
+    def test_version_increments_on_save(self, tmp_path: Path) -> None:
+        """Each save bumps meta.version."""
+        tasks_file = tmp_path / "tasks.json"
+        store = TaskStore(tasks_file)
+        start = store.meta["version"]
+        store.add_task("Task")
+        store.mark_done(1)
+
+        assert json.loads(tasks_file.read_text())["meta"]["version"] == start + 2
+
+    def test_hand_edit_keeping_version_is_reloaded(self, tmp_path: Path) -> None:
+        """An edit that leaves meta.version alone is not overwritten by the next save."""
+        tasks_file = tmp_path / "tasks.json"
+        store = TaskStore(tasks_file)
+        store.add_task("Original")
+
+        data = json.loads(tasks_file.read_text())
+        data["tasks"][0]["title"] = "Edited by hand"
+        tasks_file.write_text(json.dumps(data, indent=2))
+        store.add_task("Second")
+
+        titles = [t.title for t in TaskStore(tasks_file).tasks]
+        assert titles == ["Edited by hand", "Second"]
+
+    def test_no_temp_files_left(self, tmp_path: Path) -> None:
+        """Uniquely named temp files are renamed away."""
+        store = TaskStore(tmp_path / "tasks.json")
+        store.add_task("Task")
+        assert list(tmp_path.glob("*.tmp")) == []
+        assert list(tmp_path.glob(".*.tmp")) == []
+
+    def test_conflict_from_unlocked_writer_is_retried(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """A save that races a writer without the lock reloads and retries."""
+        from persistent_tasks import storage
+
+        monkeypatch.setattr(storage, "fcntl", None)
+        tasks_file = tmp_path / "tasks.json"
+        store = TaskStore(tasks_file)
+        raced = []
+
+        original_record = store._record
+
+        def racing_record(*args, **kwargs):
+            if not raced:
+                raced.append(True)
+                TaskStore(tasks_file).add_task("Sneaky")
+            original_record(*args, **kwargs)
+
+        store._record = racing_record
+        task = store.add_task("Mine")
+
+        assert task.id == 2
+        assert [t.title for t in TaskStore(tasks_file).tasks] == ["Sneaky", "Mine"]
+
+    def test_parallel_processes(self, tmp_path: Path) -> None:
+        """Processes adding tasks concurrently keep every task with unique IDs."""
+        import multiprocessing
+
+        tasks_file = tmp_path / "tasks.json"
+        TaskStore(tasks_file)
+        ctx = multiprocessing.get_context("fork")
+        workers = [
+            ctx.Process(target=_add_tasks_in_process, args=(str(tasks_file), f"w{n}", 20))
+            for n in range(4)
+        ]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+
+        tasks = TaskStore(tasks_file).tasks
+        assert len(tasks) == 80
+        assert sorted(t.id for t in tasks) == list(range(1, 81))
+
+
+class TestBatchOperations:
+    """Tests for all-or-nothing bulk operations."""
+
+    def test_add_tasks_resolves_aliases(self, tmp_path: Path) -> None:
+        """Dependencies may refer to earlier batch items by alias."""
+        store = TaskStore(tmp_path / "tasks.json")
+        existing = store.add_task("Existing")
+
+        tasks = store.add_tasks([
+            {"title": "Schema", "alias": "schema", "priority": "high"},
+            {"title": "Migration", "alias": "migration", "dependencies": ["schema"]},
+            {"title": "Docs", "dependencies": ["schema", "migration", existing.id]},
+        ])
+
+        assert [t.id for t in tasks] == [2, 3, 4]
+        assert tasks[0].priority == Priority.HIGH
+        assert tasks[2].dependencies == [2, 3, existing.id]
+        assert store.is_blocked(tasks[2])
+
+    def test_add_tasks_saves_once(self, tmp_path: Path) -> None:
+        """The whole batch is written with a single save."""
+        tasks_file = tmp_path / "tasks.json"
+        store = TaskStore(tasks_file)
+        version = store.meta["version"]
+
+        store.add_tasks([{"title": f"Task {i}"} for i in range(50)])
+
+        assert store.meta["version"] == version + 1
+        assert len(TaskStore(tasks_file).tasks) == 50
+
+    def test_add_tasks_all_or_nothing(self, tmp_path: Path) -> None:
+        """An invalid item rejects the whole batch."""
+        tasks_file = tmp_path / "tasks.json"
+        store = TaskStore(tasks_file)
+
+        with pytest.raises(ValueError, match="Task 2 in batch: Unknown alias 'nope'"):
+            store.add_tasks([{"title": "Good"}, {"title": "Bad", "dependencies": ["nope"]}])
+
+        assert store.tasks == []
+        assert store.find_next_task() is None
+        assert store.add_task("Next").id == 1
+        assert len(TaskStore(tasks_file).tasks) == 1
+
+    def test_add_tasks_rejects_duplicate_alias(self, tmp_path: Path) -> None:
+        """Aliases must be unique within a batch."""
+        store = TaskStore(tmp_path / "tasks.json")
+        with pytest.raises(ValueError, match="Duplicate alias"):
+            store.add_tasks([{"title": "A", "alias": "x"}, {"title": "B", "alias": "x"}])
+
+    def test_update_tasks_rejects_combined_cycle(self, tmp_path: Path) -> None:
+        """Updates are validated in order, so a cycle across them fails."""
+        store = TaskStore(tmp_path / "tasks.json")
+        t1 = store.add_task("Task 1")
+        t2 = store.add_task("Task 2")
+
+        with pytest.raises(ValueError, match="Update 2 in batch: .*cycle"):
+            store.update_tasks([
+                {"task_id": t1.id, "dependencies": [t2.id], "title": "Renamed"},
+                {"task_id": t2.id, "dependencies": [t1.id]},
+            ])
+
+        assert store.get_task(t1.id).dependencies == []
+        assert store.get_task(t1.id).title == "Task 1"
+
+    def test_update_tasks_applies_all(self, tmp_path: Path) -> None:
+        """Valid updates apply together."""
+        tasks_file = tmp_path / "tasks.json"
+        store = TaskStore(tasks_file)
+        t1 = store.add_task("Task 1")
+        t2 = store.add_task("Task 2", dependencies=[t1.id])
+
+        store.update_tasks([
+            {"task_id": t1.id, "status": "done"},
+            {"task_id": t2.id, "priority": "high"},
+        ])
+
+        reloaded = TaskStore(tasks_file)
+        assert reloaded.get_task(t1.id).status == TaskStatus.DONE
+        assert reloaded.get_task(t2.id).priority == Priority.HIGH
+        assert reloaded.find_next_task().id == t2.id
+
+    def test_remove_tasks_all_or_nothing(self, tmp_path: Path) -> None:
+        """A missing ID leaves every task in place."""
+        store = TaskStore(tmp_path / "tasks.json")
+        t1 = store.add_task("Task 1")
+        t2 = store.add_task("Task 2", dependencies=[t1.id])
+
+        with pytest.raises(ValueError, match="does not exist"):
+            store.remove_tasks([t1.id, 99])
+        assert store.get_task(t2.id).dependencies == [t1.id]
+
+        assert store.remove_tasks([t1.id, t2.id]) == 2
+        assert store.tasks == []
+
+
+class TestFileFormats:
+    """Tests for the compact file format and trusted loads."""
+
+    def build(self, store: TaskStore) -> None:
+        """Tasks covering default and non-default field values."""
+        t1 = store.add_task("Plain")
+        store.add_task("Full", priority=Priority.HIGH, dependencies=[t1.id], description="Notes")
+        store.mark_done(t1.id)
+
+    def test_compact_round_trip(self, tmp_path: Path) -> None:
+        """Compact files use short keys, omit defaults and reload intact."""
+        tasks_file = tmp_path / "tasks.json"
+        store = TaskStore(tasks_file, file_format="compact")
+        self.build(store)
+
+        text = tasks_file.read_text()
+        data = json.loads(text)
+        assert "\n" not in text
+        assert data["format"] == "compact-v1"
+        assert data["tasks"][1] == {"i": 2, "t": "Full", "p": "high", "d": [1], "x": "Notes"}
+
+        reloaded = TaskStore(tasks_file)
+        assert [t.to_dict() for t in reloaded.tasks] == [t.to_dict() for t in store.tasks]
+
+    def test_format_switches_on_next_save(self, tmp_path: Path) -> None:
+        """Either format is readable; saves use the store's setting."""
+        tasks_file = tmp_path / "tasks.json"
+        self.build(TaskStore(tasks_file, file_format="compact"))
+
+        store = TaskStore(tasks_file)
+        store.add_task("Third")
+
+        data = json.loads(tasks_file.read_text())
+        assert "format" not in data
+        assert [t["title"] for t in data["tasks"]] == ["Plain", "Full", "Third"]
+
+    def test_format_from_environment(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """PERSISTENT_TASKS_FORMAT selects the format; unknown names fail."""
+        monkeypatch.setenv("PERSISTENT_TASKS_FORMAT", "compact")
+        assert TaskStore(tmp_path / "a.json").file_format == "compact"
+
+        monkeypatch.setenv("PERSISTENT_TASKS_FORMAT", "yaml")
+        with pytest.raises(ValueError, match="Unknown tasks file format"):
+            TaskStore(tmp_path / "b.json")
+
+    def test_compact_loads_are_trusted(self, tmp_path: Path) -> None:
+        """Compact files skip field validation unless validate=True."""
+        tasks_file = tmp_path / "tasks.json"
+        tasks_file.write_text(json.dumps({
+            "format": "compact-v1",
+            "tasks": [{"i": 1, "t": ""}],
+            "meta": {"nextId": 2},
+        }))
+
+        assert TaskStore(tasks_file).get_task(1).title == ""
+        with pytest.raises(RuntimeError, match="Invalid task data"):
+            TaskStore(tasks_file, validate=True)
+
+    def test_pretty_loads_are_validated(self, tmp_path: Path) -> None:
+        """Hand-editable files are validated unless validate=False."""
+        tasks_file = tmp_path / "tasks.json"
+        tasks_file.write_text(json.dumps({
+            "tasks": [{"id": 1, "title": ""}],
+            "meta": {"nextId": 2},
+        }))
+
+        with pytest.raises(RuntimeError, match="Invalid task data"):
+            TaskStore(tasks_file)
+        assert TaskStore(tasks_file, validate=False).get_task(1).title == ""
+
+    @pytest.mark.parametrize("file_format", ["pretty", "compact"])
+    def test_without_orjson(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, file_format: str) -> None:
+        """The standard json module is used when orjson isn't installed."""
+        monkeypatch.setattr("persistent_tasks.codec.orjson", None)
+        tasks_file = tmp_path / "tasks.json"
+        self.build(TaskStore(tasks_file, file_format=file_format))
+
+        reloaded = TaskStore(tasks_file)
+        assert reloaded.get_task(2).dependencies == [1]
+        assert reloaded.get_task(1).status == TaskStatus.DONE
+
+    def test_task_has_slots(self) -> None:
+        """Tasks don't carry a per-instance __dict__."""
+        assert not hasattr(Task(id=1, title="Task"), "__dict__")